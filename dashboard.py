@@ -4,22 +4,37 @@ Y UNIVERSE AWARDS 2025 Vote Dashboard
 """
 
 from flask import Flask, render_template_string, jsonify, request
-import json
 from pathlib import Path
 from datetime import datetime
 import os
 import requests
 from bs4 import BeautifulSoup
-import re
+import sqlite3
 import threading
 import time
+from vote_engine import (
+    engine, format_time, format_times, parse_date, parse_time_arg,
+    BAHT_PER_POINT, POINTS_PER_PERCENT, SECONDS_PER_DAY,
+)
+from vote_analytics import (
+    series_payload, projection_payload, projection_from_args, simulate_from_args,
+    overtake_payload, plan_from_args, whatif_from_args,
+)
+from vote_detector import surges_payload, surges_from_args, events_from_args
+from vote_extract import extract_chart_data, extract_couples
+from vote_store import CandidateTable, SnapshotEncoder, write_snapshot
 
 app = Flask(__name__)
 
 # โฟลเดอร์เก็บข้อมูล
-DATA_DIR = Path('data_yna2025')
+DATA_DIR = engine.data_dir
 DATA_DIR.mkdir(exist_ok=True)
 
+# ชื่อคู่/ซีรีส์ของแต่ละ code (เติมตอนตอบ request)
+candidates = CandidateTable(DATA_DIR)
+# ไฟล์เต็มทุก KEYFRAME_EVERY snapshot ระหว่างนั้นเขียนเฉพาะ code ที่เปลี่ยน (อิง latest.json บนดิสก์)
+encoder = SnapshotEncoder()
+
 # ========== SCRAPER ==========
 
 class VoteScraper:
@@ -91,8 +106,8 @@ class VoteScraper:
             html = response.text
             soup = BeautifulSoup(html, 'html.parser')
             
-            vote_data = self._extract_chart_data(html)
-            couples = self._extract_couple_names(soup)
+            vote_data = extract_chart_data(soup)
+            couples = extract_couples(soup)
             
             result = {
                 'timestamp': datetime.now().isoformat(),
@@ -125,57 +140,21 @@ class VoteScraper:
             print(f"❌ Error fetching data: {e}")
             return None
     
-    def _extract_chart_data(self, html: str) -> dict:
-        result = {'labels': [], 'data': []}
-        
-        soup = BeautifulSoup(html, 'html.parser')
-        scripts = soup.find_all('script')
-        
-        for script in scripts:
-            if script.string and 'Chart' in script.string:
-                script_text = script.string
-                
-                labels_match = re.search(r'labels\s*:\s*\[(.*?)\]', script_text, re.DOTALL)
-                if labels_match:
-                    labels_str = labels_match.group(1)
-                    result['labels'] = re.findall(r'["\']([^"\']+)["\']', labels_str)
-                
-                data_match = re.search(r"data\s*:\s*\[(.*?)\]", script_text, re.DOTALL)
-                if data_match:
-                    data_str = data_match.group(1)
-                    numbers = re.findall(r'["\']?([\d.]+)["\']?', data_str)
-                    result['data'] = [float(x) for x in numbers if x]
-                
-                if result['labels'] and result['data']:
-                    break
-        
-        return result
-    
-    def _extract_couple_names(self, soup: BeautifulSoup) -> dict:
-        couples = {}
-        
-        text = soup.get_text()
-        for match in re.finditer(r'(YND\d+)\s*:\s*([^\n]+)', text):
-            code = match.group(1)
-            rest = match.group(2).strip()
-            series_match = re.search(r'\(([^)]+)\)\s*$', rest)
-            if series_match:
-                series = series_match.group(1)
-                names = rest[:series_match.start()].strip()
-            else:
-                series = ''
-                names = rest
-            
-            couples[code] = {'names': names, 'series': series}
-        
-        return couples
-    
     def save_data(self, data: dict) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         json_file = DATA_DIR / f"vote_{timestamp}.json"
         
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # ชื่อคู่/ซีรีส์เก็บครั้งเดียวใน candidates.json
+        candidates.update(data, json_file.name)
+        # เขียนแบบ atomic แล้วอัปเดต latest.json
+        write_snapshot(DATA_DIR, json_file.name, data, encoder)
+        
+        # บันทึกลง SQLite ด้วย (ถ้าตั้ง VOTE_DB)
+        if engine.store:
+            try:
+                engine.store.save_snapshot(data, json_file.name)
+            except sqlite3.Error as e:
+                print(f"⚠️ บันทึกลงฐานข้อมูลไม่สำเร็จ: {e}")
         
         print(f"💾 บันทึก: {json_file.name}")
         return str(json_file)
@@ -1233,7 +1212,15 @@ DASHBOARD_HTML = '''
                 <div class="proj-header">
                     <span class="proj-icon">🔮</span>
                     <h3 class="proj-title">คาดการณ์ ณ เวลาปิดโหวต</h3>
-                    <span class="proj-note">(คำนวนจากอัตราโหวต 6 ชม.ล่าสุด)</span>
+                    <span class="proj-note">(คำนวนจากอัตราโหวต
+                        <select id="rateWindow" class="surge-input" onchange="applyRateWindow()">
+                            <option value="1h">1</option>
+                            <option value="3h">3</option>
+                            <option value="6h" selected>6</option>
+                            <option value="12h">12</option>
+                            <option value="24h">24</option>
+                        </select>
+                        ชม.ล่าสุด)</span>
                 </div>
                 
                 <div class="proj-grid">
@@ -1371,12 +1358,15 @@ DASHBOARD_HTML = '''
         <span class="pulse">🔴</span> Auto-refresh ทุก 60 วินาที
     </div>
     
+    <script id="initialState" type="application/json">{{ initial_state|tojson }}</script>
     <script>
         let h2hChart;
         let allData = null;
         let selectedDate = null;
         let availableDates = [];
         let cachedProjection = null;
+        let projectionData = null;
+        let surgeState = {};
         
         const colors = [
             '#ff6b6b', '#feca57', '#48dbfb', '#ff9ff3', '#1dd1a1',
@@ -1412,7 +1402,31 @@ DASHBOARD_HTML = '''
             return new Intl.NumberFormat('th-TH', { style: 'currency', currency: 'THB', maximumFractionDigits: 0 }).format(n);
         }
         
-        function recalculateSurge() {
+        async function renderPlanCosts(cards) {
+            // ราคาจาก planner ฝั่ง server ให้ตรงกับ API - ไม่ใช่ votes x 4
+            // cards: [[elementId, votes, prefix]] ของ render รอบเดียว -> คำขอเดียว /api/plan?exact=0&votes=a,b,c
+            if (!cards.length) return;
+            const amounts = cards.map(([elementId, votes]) => {
+                const amount = Math.max(0, Math.ceil(votes));
+                document.getElementById(elementId).dataset.votes = amount;
+                return amount;
+            });
+            try {
+                const res = await fetch('/api/plan?exact=0&votes=' + amounts.join(','));
+                const result = await res.json();
+                cards.forEach(([elementId, , prefix = '≈ '], i) => {
+                    const el = document.getElementById(elementId);
+                    const plan = result.votes?.[i];
+                    if (el.dataset.votes !== String(amounts[i]) || !plan || plan.error) return; // มีคำขอใหม่กว่าแล้ว
+                    el.innerText = prefix + formatMoney(plan.spent);
+                });
+            } catch (error) {
+                console.error('Error fetching plan:', error);
+            }
+        }
+        
+        function recalculateSurge(costs) {
+            // costs: รวมการ์ดราคาไว้ส่งพร้อมการ์ดอื่น (ไม่ระบุ = เปลี่ยน multiplier อย่างเดียว -> ถามทันที)
             if (!cachedProjection) return;
             
             const multiplier = parseInt(document.getElementById('surgeMultiplier').value) || 100;
@@ -1429,11 +1443,11 @@ DASHBOARD_HTML = '''
             // Calculate YND10 closing with custom surge
             const ynd10ClosingSurge = ynd10Current + (ynd10Rate * normalHours) + (ynd10Rate * multiplier * surgeHours);
             const ynd06NeededSurge = Math.max(0, ynd10ClosingSurge - ynd06Current + 1);
-            const ynd06CostSurge = ynd06NeededSurge * 4;
             
             document.getElementById('projYnd10Surge').innerText = formatNumber(Math.round(ynd10ClosingSurge));
             document.getElementById('projYnd06NeededSurge').innerText = formatNumber(Math.round(ynd06NeededSurge)) + ' โหวต';
-            document.getElementById('projYnd06CostSurge').innerText = '≈ ' + formatMoney(Math.round(ynd06CostSurge));
+            const card = ['projYnd06CostSurge', ynd06NeededSurge];
+            if (costs) costs.push(card); else renderPlanCosts([card]);
         }
         
         function renderLeaderboard(votes) {
@@ -1482,60 +1496,48 @@ DASHBOARD_HTML = '''
             if (ynd06Data && ynd10Data) {
                 const gap = ynd10Data.points - ynd06Data.points;
                 const votesNeeded = gap + 1; // +1 to win
-                const costNeeded = votesNeeded * 4;
                 
                 document.getElementById('predGap').innerText = formatNumber(Math.abs(gap));
                 document.getElementById('predVotes').innerText = formatNumber(votesNeeded > 0 ? votesNeeded : 0);
-                document.getElementById('predCost').innerText = formatMoney(costNeeded > 0 ? costNeeded : 0);
             }
         }
         
-        function calculateProjection(votes) {
-            if (!votes || !votes.history || votes.history.length < 2) return;
-            
-            // Deadline: Jan 9, 2026 12:00
-            const deadline = new Date('2026-01-09T12:00:00+07:00');
-            const now = new Date();
-            const hoursRemaining = Math.max(0, (deadline - now) / (1000 * 60 * 60));
-            
-            // Calculate hourly growth rate from last 6 hours of data
-            const recent = votes.history.slice(-6);
-            if (recent.length < 2) return;
-            
-            const first = recent[0];
-            const last = recent[recent.length - 1];
-            
-            // Parse time strings to calculate time diff
-            const parseTime = (timeStr) => {
-                const parts = timeStr.split(' ');
-                if (parts.length < 2) return new Date();
-                const [day, month] = parts[0].split('/').map(Number);
-                const [hour, min] = parts[1].split(':').map(Number);
-                return new Date(2026, month - 1, day, hour, min);
-            };
-            
-            const timeDiffHours = (parseTime(last.time) - parseTime(first.time)) / (1000 * 60 * 60);
-            if (timeDiffHours <= 0) return;
-            
-            const ynd06First = first.codes['YND06']?.points || 0;
-            const ynd06Last = last.codes['YND06']?.points || 0;
-            const ynd06Rate = (ynd06Last - ynd06First) / timeDiffHours;
+        function renderOvertakePlan(plan) {
+            // plan: ผลจาก /api/plan?overtake= (ซื้อแพ็คถูกที่สุดให้ได้คะแนนที่ต้องการ)
+            if (!plan || !plan.plan) return;
+            document.getElementById('predCost').innerText = formatMoney(plan.plan.spent);
+        }
+        
+        function renderProjection(proj) {
+            // proj: ผลจาก /api/projection (คำนวณฝั่ง server ทุก code + อัตราหลายช่วงเวลา)
+            if (!proj || !proj.candidates) return;
+            projectionData = proj;
+            applyRateWindow();
+        }
+        
+        function applyRateWindow() {
+            // เลือกช่วงเวลาของอัตราโหวตจาก proj.rates ได้เลย ไม่ต้องถาม server ใหม่
+            const proj = projectionData;
+            if (!proj) return;
             
-            const ynd10First = first.codes['YND10']?.points || 0;
-            const ynd10Last = last.codes['YND10']?.points || 0;
-            const ynd10Rate = (ynd10Last - ynd10First) / timeDiffHours;
+            const p06 = proj.candidates['YND06'];
+            const p10 = proj.candidates['YND10'];
+            if (!p06 || !p10) return;
             
-            const ynd06Current = ynd06Last;
-            const ynd10Current = ynd10Last;
+            const rates = proj.rates?.[document.getElementById('rateWindow').value] || {};
+            const hoursRemaining = proj.hours_remaining || 0;
+            const ynd06Rate = rates['YND06'] ?? p06.rate_per_hour;
+            const ynd10Rate = rates['YND10'] ?? p10.rate_per_hour;
+            const ynd06Current = p06.current;
+            const ynd10Current = p10.current;
             
             // Normal scenario
             const ynd10ClosingNormal = ynd10Current + (ynd10Rate * hoursRemaining);
             const ynd06NeededNormal = Math.max(0, ynd10ClosingNormal - ynd06Current + 1);
-            const ynd06CostNormal = ynd06NeededNormal * 4;
             
             document.getElementById('projYnd10Normal').innerText = formatNumber(Math.round(ynd10ClosingNormal));
             document.getElementById('projYnd06NeededNormal').innerText = formatNumber(Math.round(ynd06NeededNormal)) + ' โหวต';
-            document.getElementById('projYnd06CostNormal').innerText = '≈ ' + formatMoney(Math.round(ynd06CostNormal));
+            const costs = [['projYnd06CostNormal', ynd06NeededNormal]];
             
             // Growth rates
             document.getElementById('projRateYnd06').innerText = formatNumber(Math.round(ynd06Rate));
@@ -1549,7 +1551,8 @@ DASHBOARD_HTML = '''
             };
             
             // Calculate surge
-            recalculateSurge();
+            recalculateSurge(costs);
+            renderPlanCosts(costs);
             
             // Status message
             const statusEl = document.getElementById('predStatus');
@@ -1560,18 +1563,29 @@ DASHBOARD_HTML = '''
             } else {
                 statusEl.innerHTML = `<span style="font-size: 1.5rem;">🔥</span> <span style="font-size: 1.2rem; font-weight: bold; color: #fb923c;">สูสี! เร่งโหวต YND06 ก่อนหมดเวลา!</span>`;
             }
-        }
-        
-        function renderH2HChart(votes) {
-            if (!votes || !votes.history || votes.history.length === 0) return;
             
-            const labels = votes.history.map(h => {
-                const time = h.time.split(' ')[1] || h.time;
-                return time;
+            // Surge detector (server): อัตราคะแนนล่าสุดกระโดดจากค่าปกติ
+            ['YND10', 'YND06'].forEach(code => {
+                const s = surgeState[code];
+                if (s && s.surging) {
+                    statusEl.innerHTML += `<div style="margin-top: 8px; color: #f87171; font-weight: bold;">🚨 ${code} กำลังเร่งโหวต: ${formatNumber(s.rate_per_hour)}/ชม. (ปกติ ${formatNumber(s.baseline_per_hour)}/ชม.)</div>`;
+                }
             });
+        }
+        
+        // epoch (เวลาท้องถิ่นที่ server บันทึก) -> 'dd/mm HH:MM'
+        function formatEpoch(ts) {
+            const iso = new Date(ts * 1000).toISOString();
+            return `${iso.slice(8, 10)}/${iso.slice(5, 7)} ${iso.slice(11, 16)}`;
+        }
+        
+        function renderH2HChart(h2h) {
+            // h2h: ผลจาก /api/series (LTTB, เฉพาะ YND06, YND10)
+            if (!h2h || !h2h.series) return;
             
-            const ynd06Data = votes.history.map(h => h.codes['YND06']?.points || 0);
-            const ynd10Data = votes.history.map(h => h.codes['YND10']?.points || 0);
+            const toPoints = s => s ? s.ts.map((t, i) => ({ x: t, y: s.points[i] })) : [];
+            const ynd06Data = toPoints(h2h.series['YND06']);
+            const ynd10Data = toPoints(h2h.series['YND10']);
             
             const ctx = document.getElementById('h2hChart').getContext('2d');
             
@@ -1579,7 +1593,6 @@ DASHBOARD_HTML = '''
             h2hChart = new Chart(ctx, {
                 type: 'line',
                 data: {
-                    labels: labels,
                     datasets: [
                         {
                             label: 'YND06',
@@ -1604,15 +1617,19 @@ DASHBOARD_HTML = '''
                 options: {
                     responsive: true,
                     maintainAspectRatio: false,
-                    plugins: { legend: { position: 'top', labels: { color: '#cbd5e1' } } },
+                    plugins: {
+                        legend: { position: 'top', labels: { color: '#cbd5e1' } },
+                        tooltip: { callbacks: { title: items => formatEpoch(items[0].parsed.x) } }
+                    },
                     scales: {
                         y: { 
                             grid: { color: '#334155' },
                             ticks: { color: '#94a3b8' }
                         },
                         x: { 
+                            type: 'linear',
                             grid: { display: false },
-                            ticks: { color: '#94a3b8', maxTicksLimit: 10 }
+                            ticks: { color: '#94a3b8', maxTicksLimit: 10, callback: v => formatEpoch(v).split(' ')[1] }
                         }
                     }
                 }
@@ -1634,59 +1651,78 @@ DASHBOARD_HTML = '''
         
         async function fetchAllData() {
             try {
-                const [dataRes, votesRes] = await Promise.all([
+                const [dataRes, datesRes, votesRes, h2hRes, projRes, planRes, surgesRes] = await Promise.all([
                     fetch('/api/data'),
-                    fetch('/api/votes')
+                    fetch('/api/dates'),
+                    fetch('/api/votes?date=' + encodeURIComponent(selectedDate || 'latest')),
+                    fetch('/api/series?codes=YND06,YND10&points=300'),
+                    fetch('/api/projection?codes=YND06,YND10'),
+                    fetch('/api/plan?overtake=YND06&rival=YND10'),
+                    fetch('/api/surges?codes=YND06,YND10')
                 ]);
                 
-                const data = await dataRes.json();
-                const votes = await votesRes.json();
-                
-                if (data.error) {
-                    document.getElementById('statsGrid').innerHTML = 
-                        '<div class="loading">❌ ' + data.error + '</div>';
-                    return;
-                }
-                
-                allData = { current: data, votes: votes };
-                
-                // Get available dates
-                if (votes.history) {
-                    const dates = new Set();
-                    votes.history.forEach(h => {
-                        const date = h.time.split(' ')[0];
-                        dates.add(date);
-                    });
-                    availableDates = Array.from(dates).sort();
-                    
-                    if (!selectedDate && availableDates.length > 0) {
-                        selectedDate = availableDates[availableDates.length - 1]; // Latest date
-                    }
-                }
-                
-                updateDashboard(data);
-                updateDateButtons();
-                updateVotesDisplay(votes);
+                applyData({
+                    data: await dataRes.json(),
+                    dates: await datesRes.json(),
+                    votes: await votesRes.json(),
+                    h2h: await h2hRes.json(),
+                    projection: await projRes.json(),
+                    plan: await planRes.json(),
+                    surges: await surgesRes.json()
+                });
                 
             } catch (error) {
                 console.error('Error fetching data:', error);
             }
         }
         
+        // state: { data, dates, votes, h2h, projection, plan, surges } (รูปแบบเดียวกับ initialState)
+        function applyData(state) {
+            const { data, dates, votes, h2h, projection, plan, surges } = state;
+            if (data.error) {
+                document.getElementById('statsGrid').innerHTML = 
+                    '<div class="loading">❌ ' + data.error + '</div>';
+                return;
+            }
+            
+            allData = { current: data, votes: votes };
+            
+            // Available dates (จาก server: [{date, label, count}])
+            if (dates && dates.dates) {
+                availableDates = dates.dates;
+            }
+            if (!selectedDate && votes.date) {
+                selectedDate = votes.date; // Latest date
+            }
+            
+            updateDashboard(data);
+            updateDateButtons();
+            updateVotesDisplay(votes);
+            renderH2HChart(h2h);
+            surgeState = (surges && surges.state) || {};
+            renderProjection(projection);
+            renderOvertakePlan(plan);
+        }
+        
         function updateDateButtons() {
             let html = '';
-            availableDates.forEach(date => {
-                const isActive = date === selectedDate ? 'active' : '';
-                html += `<button class="date-btn ${isActive}" onclick="selectDate('${date}')">${date}</button>`;
+            availableDates.forEach(d => {
+                const isActive = d.date === selectedDate ? 'active' : '';
+                html += `<button class="date-btn ${isActive}" title="${d.count} ครั้ง" onclick="selectDate('${d.date}')">${d.label}</button>`;
             });
             document.getElementById('dateButtons').innerHTML = html;
         }
         
-        function selectDate(date) {
+        async function selectDate(date) {
             selectedDate = date;
             updateDateButtons();
-            if (allData && allData.votes) {
-                updateVotesDisplay(allData.votes);
+            try {
+                const res = await fetch('/api/votes?date=' + encodeURIComponent(date));
+                const votes = await res.json();
+                if (allData) allData.votes = votes;
+                updateVotesDisplay(votes);
+            } catch (error) {
+                console.error('Error fetching date:', error);
             }
         }
         
@@ -1710,7 +1746,7 @@ DASHBOARD_HTML = '''
             let summaryHtml = `
                 <div class="summary-card">
                     <div class="label">📁 จำนวนข้อมูล</div>
-                    <div class="value">${data.history?.length || 0} ครั้ง</div>
+                    <div class="value">${data.total_records ?? data.history?.length ?? 0} ครั้ง</div>
                 </div>
                 <div class="summary-card">
                     <div class="label">🎯 ฐานโหวตรวม</div>
@@ -1729,14 +1765,9 @@ DASHBOARD_HTML = '''
             
             // Render new sections
             renderLeaderboard(data);
-            calculateProjection(data);
-            renderH2HChart(data);
             
-            // Filter history by selected date
-            const filteredHistory = data.history?.filter(h => {
-                const date = h.time.split(' ')[0];
-                return date === selectedDate;
-            }) || [];
+            // History ของวันที่เลือก (server ส่งมาเฉพาะวันนั้น)
+            const filteredHistory = data.history || [];
             
             if (filteredHistory.length === 0) {
                 document.getElementById('percentHead').innerHTML = '<tr><th>ไม่มีข้อมูล</th></tr>';
@@ -1843,54 +1874,46 @@ DASHBOARD_HTML = '''
         
 
         
-        // Initial load
-        fetchAllData();
+        // Initial load: ใช้ state ที่ฝังมากับหน้าเว็บก่อน (ไม่ต้องรอ fetch)
+        const initialState = JSON.parse(document.getElementById('initialState').textContent);
+        if (initialState && initialState.data) {
+            applyData(initialState);
+        } else {
+            fetchAllData();
+        }
         
         // Auto-refresh every 60 seconds
         setInterval(fetchAllData, 60000);
         
-        // Package Calculator
-        const packages = [
-            { name: 'แพ็ค 4,000 บาท', price: 4000, points: 1000 },
-            { name: 'แพ็ค 450 บาท', price: 450, points: 100 },
-            { name: 'แพ็ค 50 บาท', price: 50, points: 10 },
-            { name: 'แพ็ค 6 บาท', price: 6, points: 1 }
-        ];
-        
-        function calculatePackages() {
-            let budget = parseInt(document.getElementById('budgetInput').value) || 0;
+        // Package Calculator (คำนวณแผนที่ได้คะแนนมากสุดฝั่ง server: /api/plan)
+        async function calculatePackages() {
+            const budget = parseInt(document.getElementById('budgetInput').value) || 0;
             
             if (budget <= 0) {
                 alert('กรุณาใส่จำนวนเงินที่ต้องการ');
                 return;
             }
             
-            const originalBudget = budget;
-            let totalPoints = 0;
-            let totalSpent = 0;
-            const purchases = [];
-            
-            // คำนวณซื้อแพ็คแพงสุดก่อน
-            for (const pkg of packages) {
-                const qty = Math.floor(budget / pkg.price);
-                if (qty > 0) {
-                    const spent = qty * pkg.price;
-                    const points = qty * pkg.points;
-                    
-                    purchases.push({
-                        name: pkg.name,
-                        price: pkg.price,
-                        qty: qty,
-                        spent: spent,
-                        points: points
-                    });
-                    
-                    budget -= spent;
-                    totalSpent += spent;
-                    totalPoints += points;
+            let plan;
+            try {
+                const res = await fetch('/api/plan?budget=' + budget);
+                const result = await res.json();
+                if (result.error) {
+                    alert(result.error);
+                    return;
                 }
+                plan = result.budgets[0];
+            } catch (error) {
+                console.error('Error calculating packages:', error);
+                return;
             }
             
+            const originalBudget = plan.budget;
+            const totalPoints = plan.points;
+            const totalSpent = plan.spent;
+            const purchases = plan.purchases;
+            const remaining = plan.remaining;
+            
             // แสดงผล
             const resultDiv = document.getElementById('calcResult');
             const contentDiv = document.getElementById('resultContent');
@@ -1926,7 +1949,7 @@ DASHBOARD_HTML = '''
                         <span>🎯 คะแนนที่ได้รับ: </span>
                         <span class="points">${formatNumber(totalPoints)} คะแนน</span>
                     </div>
-                    ${budget > 0 ? `<div class="summary-remaining">💸 เงินคงเหลือ: ${formatNumber(budget)} บาท (ไม่พอซื้อแพ็คใดๆ)</div>` : ''}
+                    ${remaining > 0 ? `<div class="summary-remaining">💸 เงินคงเหลือ: ${formatNumber(remaining)} บาท (ไม่พอซื้อแพ็คใดๆ)</div>` : ''}
                 `;
             }
             
@@ -1947,18 +1970,21 @@ DASHBOARD_HTML = '''
 def get_latest_data():
     """ดึงข้อมูลล่าสุดจากไฟล์ JSON"""
     try:
-        # หาไฟล์ JSON ล่าสุด
-        json_files = sorted(DATA_DIR.glob('vote_*.json'), reverse=True)
+        engine.refresh()
+        latest = engine.latest_snapshot()
         
-        if not json_files:
+        if not latest:
             return {'error': 'ไม่พบไฟล์ข้อมูล - รัน scraper ก่อน'}
         
-        latest_file = json_files[0]
+        latest_name, data = latest
         
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        data['filename'] = latest_file.name
+        # เติมชื่อคู่/ซีรีส์จาก candidates.json (snapshot ใหม่ไม่มีชื่อในไฟล์)
+        data['summary'] = candidates.join(data.get('summary', []))
+        data['couples'] = {
+            item['code']: {'names': item.get('names', ''), 'series': item.get('series', '')}
+            for item in data['summary']
+        }
+        data['filename'] = latest_name
         return data
         
     except Exception as e:
@@ -1968,51 +1994,20 @@ def get_latest_data():
 def get_all_history():
     """ดึงประวัติข้อมูลทั้งหมด"""
     try:
-        json_files = sorted(DATA_DIR.glob('vote_*.json'))
-        
-        if not json_files:
-            return {'error': 'ไม่พบไฟล์ข้อมูล'}
+        engine.refresh()
         
-        history = []
-        all_codes = set()
-        
-        for file in json_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # แปลง timestamp เป็นเวลาที่อ่านง่าย
-                timestamp = data.get('timestamp', '')
-                if timestamp:
-                    try:
-                        dt = datetime.fromisoformat(timestamp)
-                        time_str = dt.strftime('%d/%m %H:%M')
-                    except:
-                        time_str = timestamp[:16]
-                else:
-                    # ดึงเวลาจากชื่อไฟล์
-                    time_str = file.stem.replace('vote_', '')
-                
-                # สร้าง dict ของ code -> percentage
-                vote_data = {}
-                if 'summary' in data:
-                    for item in data['summary']:
-                        code = item.get('code', '')
-                        pct = item.get('percentage', 0)
-                        vote_data[code] = pct
-                        all_codes.add(code)
-                
+        with engine.lock:
+            if not len(engine):
+                return {'error': 'ไม่พบไฟล์ข้อมูล'}
+            
+            codes = list(engine.codes)
+            history = []
+            for time_str, filename, pct in zip(format_times(engine.ts), engine.filenames, engine.pct.tolist()):
                 history.append({
                     'time': time_str,
-                    'filename': file.name,
-                    'data': vote_data
+                    'filename': filename,
+                    'data': dict(zip(codes, pct))
                 })
-                
-            except Exception as e:
-                continue
-        
-        # เรียง codes
-        codes = sorted(list(all_codes))
         
         return {
             'history': history,
@@ -2024,139 +2019,87 @@ def get_all_history():
         return {'error': str(e)}
 
 
-def calculate_votes_and_money():
+def _history_entries(start, stop):
+    """แปลง snapshot ช่วง [start, stop) เป็นรายการประวัติ (คะแนน/เงิน ต่อ code)"""
+    codes = engine.codes
+    pct = engine.pct[start:stop].tolist()
+    points = engine.points[start:stop].tolist()
+    added = engine.added[start:stop].tolist()
+    totals = engine.totals[start:stop].tolist()
+    
+    entries = []
+    for i, time_str in enumerate(format_times(engine.ts[start:stop])):
+        hour_data = {
+            'time': time_str,
+            'codes': {}
+        }
+        
+        for j, code in enumerate(codes):
+            hour_data['codes'][code] = {
+                'percentage': pct[i][j],
+                'points': round(points[i][j]),
+                'money': round(points[i][j] * BAHT_PER_POINT),
+                'points_added': round(added[i][j]),
+                'money_added': round(added[i][j] * BAHT_PER_POINT)
+            }
+        
+        hour_data['total_base_votes'] = round(totals[i])
+        hour_data['total_money'] = round(totals[i] * BAHT_PER_POINT)
+        entries.append(hour_data)
+    
+    return entries
+
+
+def calculate_votes_and_money(date=None, as_of=None):
     """
     คำนวณคะแนนและเงินจาก % ที่เปลี่ยนแปลง
     สูตร Cumulative Gain Only: นับเฉพาะ % ที่เพิ่มขึ้นเป็นคะแนนสะสม
     1% = 1000 คะแนน = 4000 บาท
+    
+    date: 'YYYY-MM-DD' หรือ 'latest' -> ส่งประวัติเฉพาะวันนั้น (วันที่ปิดแล้วอ่านจาก partition)
+    as_of: epoch -> ผลโหวต ณ snapshot ล่าสุดก่อนเวลานั้น + ประวัติของวันนั้นจนถึงเวลานั้น
     """
     try:
-        json_files = sorted(DATA_DIR.glob('vote_*.json'))
-        
-        if not json_files:
-            return {'error': 'ไม่พบไฟล์ข้อมูล'}
-        
-        # อัตราแปลง
-        POINTS_PER_PERCENT = 1000  # 1% = 1000 คะแนน
-        BAHT_PER_POINT = 4  # 1 คะแนน = 4 บาท
-        BASE_TOTAL_VOTES = 100000  # ฐานคะแนนสำหรับแปลง % เป็นโหวต
-        
-        all_codes = set()
-        history_data = []
-        
-        # โหลดข้อมูลทั้งหมดก่อน
-        for file in json_files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                timestamp = data.get('timestamp', '')
-                raw_timestamp = timestamp  # Keep for sorting
-                
-                if timestamp:
-                    try:
-                        dt = datetime.fromisoformat(timestamp)
-                        time_str = dt.strftime('%d/%m %H:%M')
-                    except:
-                        time_str = timestamp[:16]
-                else:
-                    time_str = file.stem.replace('vote_', '')
-                    raw_timestamp = time_str  # Fallback for sorting
-                
-                vote_data = {}
-                if 'summary' in data:
-                    for item in data['summary']:
-                        code = item.get('code', '')
-                        pct = item.get('percentage', 0)
-                        vote_data[code] = pct
-                        all_codes.add(code)
-                
-                history_data.append({
-                    'time': time_str,
-                    'raw_timestamp': raw_timestamp,
-                    'data': vote_data
-                })
-            except:
-                continue
-        
-        if not history_data:
-            return {'error': 'ไม่มีข้อมูล'}
-        
-        # Sort by timestamp to match dashboard_two.py
-        history_data.sort(key=lambda x: x['raw_timestamp'])
-        
-        print(f"DEBUG: dashboard.py loaded {len(history_data)} records")
-        if history_data:
-            print(f"DEBUG: First: {history_data[0]['raw_timestamp']}, Last: {history_data[-1]['raw_timestamp']}")
-        
-        codes = sorted(list(all_codes))
-        
-        # Cumulative Gain Only: นับเฉพาะ % ที่เพิ่มขึ้น
-        cumulative_points = {code: 0.0 for code in codes}
-        prev_pct = {code: 0.0 for code in codes}
-        
-        result_history = []
-        
-        for i, entry in enumerate(history_data):
-            current_pct = entry['data']
-            time_str = entry['time']
-            
-            hour_data = {
-                'time': time_str,
-                'codes': {}
-            }
+        engine.refresh()
+        
+        with engine.lock:
+            if not len(engine):
+                return {'error': 'ไม่พบไฟล์ข้อมูล'}
+            
+            codes = list(engine.codes)
+            
+            # คะแนนสะสมของทุก snapshot อยู่ใน engine.points แล้ว -> เลือกแถวด้วย binary search
+            row = len(engine) - 1
+            if as_of is not None:
+                row = engine.index_at(as_of)
+                if row is None:
+                    return {'error': 'ยังไม่มีข้อมูล ณ เวลานั้น'}
+                day = int(engine.ts[row]) // SECONDS_PER_DAY
+                history = _history_entries(engine.day_range(day)[0], row + 1)
+            elif date:
+                day = engine.open_day if date == 'latest' else parse_date(date)
+                history = list(engine.day_partition('votes', day, _history_entries))
+            else:
+                history = _history_entries(0, len(engine))
             
-            # Cumulative Gain Only: นับเฉพาะ % ที่เพิ่มขึ้น
-            for code in codes:
-                curr = current_pct.get(code, 0)
-                prev = prev_pct.get(code, 0)
-                
-                # นับเฉพาะ % ที่เพิ่มขึ้น
-                points_added = 0
-                if curr > prev:
-                    delta = curr - prev
-                    points_added = (delta / 100) * BASE_TOTAL_VOTES
-                    cumulative_points[code] += points_added
-                
-                points = cumulative_points[code]
-                money = points * BAHT_PER_POINT
-                
-                hour_data['codes'][code] = {
-                    'percentage': curr,
+            # สรุป ณ แถวที่เลือก (ล่าสุดถ้าไม่ระบุ as_of)
+            latest_summary = []
+            for code, points in zip(codes, engine.points[row].tolist()):
+                latest_summary.append({
+                    'code': code,
                     'points': round(points),
-                    'money': round(money),
-                    'points_added': round(points_added),
-                    'money_added': round(points_added * BAHT_PER_POINT)
-                }
-                
-                prev_pct[code] = curr
+                    'money': round(points * BAHT_PER_POINT)
+                })
             
-            total_points = sum(cumulative_points.values())
-            hour_data['total_base_votes'] = round(total_points)
-            hour_data['total_money'] = round(total_points * BAHT_PER_POINT)
+            latest_summary.sort(key=lambda x: x['points'], reverse=True)
             
-            result_history.append(hour_data)
+            total_votes = float(engine.totals[row])
+            total_records = row + 1
+            snapshot_ts = int(engine.ts[row])
         
-        # สรุปล่าสุด
-        latest_summary = []
-        for code in codes:
-            latest_summary.append({
-                'code': code,
-                'points': round(cumulative_points[code]),
-                'money': round(cumulative_points[code] * BAHT_PER_POINT)
-            })
-        
-        latest_summary.sort(key=lambda x: x['points'], reverse=True)
-        
-        # Debug: Print YND06 and YND10 values
-        for item in latest_summary:
-            if item['code'] in ['YND06', 'YND10']:
-                print(f"DEBUG API: {item['code']} = {item['points']}")
-        
-        total_votes = sum(cumulative_points.values())
-        
-        return {
-            'history': result_history,
+        result = {
+            'history': history,
+            'total_records': total_records,
             'codes': codes,
             'latest_summary': latest_summary,
             'total_base_votes': round(total_votes),
@@ -2168,25 +2111,222 @@ def calculate_votes_and_money():
             }
         }
         
+        if date or as_of is not None:
+            result['date'] = format_time(day * SECONDS_PER_DAY, '%Y-%m-%d')
+        if as_of is not None:
+            result['as_of'] = format_time(snapshot_ts, '%Y-%m-%dT%H:%M:%S')
+        
+        return result
+        
     except Exception as e:
         return {'error': str(e)}
 
 
+def get_dates():
+    """รายการวันที่มีข้อมูล + จำนวน snapshot ต่อวัน"""
+    engine.refresh()
+    with engine.lock:
+        return {'dates': engine.dates()}
+
+
+# ========== CACHE ==========
+
+# คู่ที่แสดงในกราฟ Head-to-Head + จำนวนจุดต่อเส้น (LTTB)
+H2H_CODES = ['YND06', 'YND10']
+H2H_POINTS = 300
+
+def cached(name, compute):
+    """คืนผลจาก cache ถ้าข้อมูลยังไม่เปลี่ยน (version เดิม) ไม่งั้นคำนวณใหม่แล้วเก็บไว้"""
+    return engine.cached(name, compute)
+
+
+def get_initial_state():
+    """state สำหรับฝังในหน้าเว็บ: ข้อมูลล่าสุด + รายการวัน + ประวัติวันล่าสุด (render ได้ทันที)"""
+    return {
+        'data': cached('data', get_latest_data),
+        'dates': cached('dates', get_dates),
+        'votes': cached('votes:latest', lambda: calculate_votes_and_money('latest')),
+        'h2h': get_h2h_series(),
+        'projection': get_projection(),
+        'plan': get_overtake_plan(),
+        'surges': get_h2h_surges(),
+    }
+
+
+def get_projection():
+    """คาดการณ์ ณ เวลาปิดโหวตของคู่ Head-to-Head"""
+    with engine.lock:
+        codes = [c for c in H2H_CODES if c in engine.codes]
+    return projection_payload(codes)
+
+
+def get_overtake_plan():
+    """แผนซื้อแพ็คที่ถูกที่สุดให้ code แรกของ Head-to-Head แซงอีกฝ่าย"""
+    with engine.lock:
+        codes = [c for c in H2H_CODES if c in engine.codes]
+    if len(codes) < 2:
+        return {'error': 'ไม่พบข้อมูล Head-to-Head'}
+    return cached(f'plan:{codes[0]}:{codes[1]}', lambda: overtake_payload(codes[0], codes[1]))
+
+
+def get_h2h_surges():
+    """สถานะ surge detector ของคู่ Head-to-Head"""
+    with engine.lock:
+        codes = [c for c in H2H_CODES if c in engine.codes]
+    return surges_payload(codes)
+
+
+def get_h2h_series():
+    """คะแนนสะสมของคู่ Head-to-Head (ลดจำนวนจุดด้วย LTTB)"""
+    with engine.lock:
+        codes = [c for c in H2H_CODES if c in engine.codes]
+    return series_payload(codes, H2H_POINTS)
+
+
 @app.route('/')
 def dashboard():
-    return render_template_string(DASHBOARD_HTML)
+    # ?embed=0 ปิดการฝัง state (หน้าเว็บจะ fetch เองแบบเดิม)
+    initial_state = get_initial_state() if request.args.get('embed', '1') != '0' else None
+    return render_template_string(DASHBOARD_HTML, initial_state=initial_state)
 
 @app.route('/api/data')
 def api_data():
-    return jsonify(get_latest_data())
+    return jsonify(cached('data', get_latest_data))
 
 @app.route('/api/history')
 def api_history():
-    return jsonify(get_all_history())
+    return jsonify(cached('history', get_all_history))
 
 @app.route('/api/votes')
 def api_votes():
-    return jsonify(calculate_votes_and_money())
+    as_of = request.args.get('as_of', '')
+    if as_of:
+        # ?as_of=2026-01-08T02:00 (หรือ epoch) -> ผลโหวต ณ เวลานั้น
+        try:
+            ts = parse_time_arg(as_of)
+        except ValueError:
+            return jsonify({'error': 'รูปแบบเวลาไม่ถูกต้อง (ใช้ epoch หรือ YYYY-MM-DDTHH:MM)'})
+        engine.refresh()
+        with engine.lock:
+            row = engine.index_at(ts)
+            if row is None:
+                return jsonify({'error': 'ยังไม่มีข้อมูล ณ เวลานั้น'})
+            ts = int(engine.ts[row])
+        return jsonify(cached(f'votes:as_of:{ts}', lambda: calculate_votes_and_money(as_of=ts)))
+    
+    date = request.args.get('date', '')
+    if date:
+        if date != 'latest':
+            try:
+                parse_date(date)
+            except ValueError:
+                return jsonify({'error': 'รูปแบบวันที่ไม่ถูกต้อง (ใช้ YYYY-MM-DD)'})
+        return jsonify(cached(f'votes:{date}', lambda: calculate_votes_and_money(date)))
+    return jsonify(cached('votes', calculate_votes_and_money))
+
+@app.route('/api/query')
+def api_query():
+    """
+    ดึงข้อมูลเฉพาะที่ต้องการ
+    ?from=&to= (epoch หรือ ISO), codes=YND06,YND10, fields=pct,points,added,money
+    """
+    args = request.args
+    try:
+        start = parse_time_arg(args['from']) if args.get('from') else None
+        stop = parse_time_arg(args['to']) if args.get('to') else None
+        codes = [c for c in args.get('codes', '').split(',') if c]
+        fields = [f for f in args.get('fields', '').split(',') if f]
+        
+        engine.refresh()
+        with engine.lock:
+            return jsonify(engine.query(start, stop, codes, fields))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/series')
+def api_series():
+    """series คะแนนสะสมสำหรับกราฟ: ?codes=YND06,YND10&points=300 (LTTB)"""
+    try:
+        codes = [c for c in request.args.get('codes', '').split(',') if c]
+        points = int(request.args.get('points', H2H_POINTS))
+        return jsonify(series_payload(codes, points))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/projection')
+def api_projection():
+    """
+    คาดการณ์ ณ เวลาปิดโหวตของทุก code และทุกคู่
+    ?codes=&deadline=&surge_multiplier=&surge_hours=&window_hours=
+    """
+    try:
+        return jsonify(projection_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/simulate')
+def api_simulate():
+    """
+    Monte Carlo ยอดปิดโหวต: โอกาสชนะ + percentile ของแต่ละ code
+    ?codes=&paths=10000&hours=&history_hours=24&surge_multiplier=1&surge_hours=3&seed=
+    """
+    try:
+        return jsonify(simulate_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/whatif')
+def api_whatif():
+    """
+    ตาราง what-if แพ้/ชนะ: [rates][multipliers][hours]
+    ?code=YND06&rival=YND10&rates=0,1000,5000&multipliers=1,10,100&hours=1,6,24&window_hours=6
+    """
+    try:
+        return jsonify(whatif_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/surges')
+def api_surges():
+    """
+    เหตุการณ์ surge (อัตราคะแนนกระโดด) จาก detector แบบ streaming + สถานะปัจจุบัน
+    ?codes=YND06,YND10&since=<last_ts ที่เคยได้รับ>
+    """
+    try:
+        return jsonify(surges_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/events')
+def api_events():
+    """
+    เหตุการณ์แซงกัน/เปลี่ยนผู้นำ (ดัชนีที่อัปเดตทุก snapshot)
+    ?codes=YND06,YND10&from=&to=&lead=1
+    """
+    try:
+        return jsonify(events_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/plan')
+def api_plan():
+    """
+    วางแผนซื้อแพ็คโหวต (แม่นยำ ไม่ใช่ซื้อแพ็คแพงสุดก่อน)
+    ?budget=5000,10000 | ?votes=1234&exact=0 | ?overtake=YND06&rival=YND10&scenario=now|normal|surge
+    """
+    try:
+        return jsonify(plan_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/dates')
+def api_dates():
+    return jsonify(cached('dates', get_dates))
+
+@app.route('/api/diagnostics')
+def api_diagnostics():
+    """สถานะ engine + ไฟล์ snapshot ที่อ่านไม่ได้ (quarantine - อ่านใหม่เมื่อไฟล์เปลี่ยน)"""
+    return jsonify(engine.diagnostics())
 
 @app.route('/api/scrape')
 def api_scrape():
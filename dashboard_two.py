@@ -4,180 +4,84 @@ Y UNIVERSE AWARDS 2025 Deep Dive Dashboard (dashboard_two.py)
 รันที่ Port: 5001
 """
 
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, render_template_string, jsonify, request
 import json
-from pathlib import Path
 from datetime import datetime
-import pandas as pd
-import numpy as np
+from vote_engine import engine, format_times, parse_date
+from vote_analytics import series_payload, projection_payload, projection_from_args, plan_from_args
+from vote_store import CandidateTable
 
 app = Flask(__name__)
-DATA_DIR = Path('data_yna2025')
+DATA_DIR = engine.data_dir
+candidates = CandidateTable(DATA_DIR)  # ชื่อคู่/ซีรีส์ของแต่ละ code
 
 # Constants
 VOTE_COST = 4.0  # 4 Baht per vote (1000 votes = 4000 THB)
-BASE_TOTAL_VOTES = 100000  # Initial assumption of total votes in the system
+CHART_POINTS = 300  # จุดต่อเส้นกราฟ (LTTB)
 
-def load_data():
-    """Load all JSON files and return as a DataFrame"""
-    records = []
-    files = sorted(DATA_DIR.glob('vote_*.json'))
-    
-    for f in files:
-        try:
-            with open(f, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                timestamp = data.get('timestamp')
-                # If timestamp is missing or invalid, try to parse from filename
-                if not timestamp:
-                    ts_str = f.stem.replace('vote_', '')
-                    try:
-                        timestamp = datetime.strptime(ts_str, "%Y%m%d_%H%M%S").isoformat()
-                    except:
-                        continue
-
-                # Parse summary
-                summary = data.get('summary', [])
-                row = {'timestamp': timestamp}
-                for item in summary:
-                    code = item['code']
-                    row[f'{code}_pct'] = item['percentage']
-                    row[f'{code}_name'] = item['names']
-                    row[f'{code}_series'] = item['series']
-                records.append(row)
-        except Exception as e:
-            print(f"Error loading {f}: {e}")
-            continue
-            
-    if not records:
-        return pd.DataFrame()
-        
-    df = pd.DataFrame(records)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp')
-    return df
+def _latest_names():
+    """ชื่อคู่ของแต่ละ code จาก candidates.json (ไฟล์เก่าที่ยังไม่มี table ใช้ชื่อใน snapshot ล่าสุด)"""
+    names = {code: info['names'] for code, info in candidates.latest().items()}
+    if names:
+        return names
+    latest_name = engine.latest_file()
+    if not latest_name:
+        return {}
+    data = engine.load_snapshot(latest_name)
+    return {item['code']: item.get('names', '') for item in data.get('summary', [])}
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'))
 
-def reconstruct_votes(df):
+
+def _day_json(date):
+    """build ของ day_partition: ตารางรายชั่วโมงของวันเดียวเป็นข้อความ JSON สำเร็จรูป"""
+    return lambda start, stop: [_dumps({'date': date, 'records': _hourly_records(start, stop)})]
+
+
+def _history_json(start, stop):
     """
-    Cumulative Gain Only Algorithm
-    
-    Logic:
-    - Track each candidate's percentage over time.
-    - When a candidate's % INCREASES, calculate the gain and convert to votes.
-    - Votes ADDED = (pct_gain) * (BASE_TOTAL_VOTES / 100)
-    - When % DECREASES, ignore it (votes stay the same, no loss).
-    - Total votes = Sum of all individual candidate votes.
+    build ของ day_partition: กราฟคะแนนสะสม (key 'history' เดิมของ /api/data) ของวันเดียว
+    -> [labels, (คะแนนของแต่ละ code ตามลำดับ engine.codes)] เป็นข้อความ JSON ที่ยังไม่มีวงเล็บ ไว้ต่อกันข้ามวัน
     """
-    if df.empty:
-        return {}, []
+    labels = format_times(engine.ts[start:stop], '%d/%H:%M')
+    rounded = engine.points[start:stop].round().astype('int64')
+    return [_dumps(labels)[1:-1], tuple(_dumps(rounded[:, j].tolist())[1:-1] for j in range(len(engine.codes)))]
 
-    # Identify candidate columns
-    pct_cols = [c for c in df.columns if c.endswith('_pct')]
-    candidates = [c.replace('_pct', '') for c in pct_cols]
-    
-    # Initialize: Track cumulative votes and previous percentages
-    cumulative_votes = {c: 0.0 for c in candidates}
-    prev_pct = {c: 0.0 for c in candidates}
-    
-    history = []
-    
-    for _, row in df.iterrows():
-        step_data = {
-            'timestamp': row['timestamp'],
-        }
-        
-        for c in candidates:
-            pct = row.get(f'{c}_pct', 0)
-            
-            # Calculate gain (only if positive)
-            pct_change = pct - prev_pct[c]
-            
-            if pct_change > 0:
-                # Convert % gain to votes: 1% = 1000 votes (since BASE = 100,000)
-                votes_added = (pct_change / 100.0) * BASE_TOTAL_VOTES
-                cumulative_votes[c] += votes_added
-            
-            # Update previous percentage for next iteration
-            prev_pct[c] = pct
-            
-            step_data[f'{c}_votes'] = cumulative_votes[c]
-            step_data[f'{c}_cost'] = cumulative_votes[c] * VOTE_COST
-            step_data[f'{c}_name'] = row.get(f'{c}_name', '')
-            step_data[f'{c}_pct'] = pct
-        
-        # Calculate total votes as sum of all candidates
-        step_data['total_votes'] = sum(cumulative_votes.values())
-            
-        history.append(step_data)
-        
-    return history, candidates
-
-@app.route('/')
-def dashboard():
-    return render_template_string(HTML_TEMPLATE)
 
-@app.route('/api/data')
-def get_data():
-    df = load_data()
-    history, candidates = reconstruct_votes(df)
-    
-    if not history:
-        return jsonify({'error': 'No data'})
-        
-    # Format for frontend
-    latest = history[-1]
-    
-    # Summary List (Sorted by Votes)
-    summary = []
-    for c in candidates:
-        summary.append({
-            'code': c,
-            'name': latest.get(f'{c}_name', ''),
-            'votes': round(latest.get(f'{c}_votes', 0)),
-            'cost': round(latest.get(f'{c}_cost', 0)),
-            'pct': latest.get(f'{c}_pct', 0)
-        })
-    summary.sort(key=lambda x: x['votes'], reverse=True)
-    
-    # Time Series for Graph (simplified)
-    # We'll send data for YND06, YND10, and maybe others if needed
-    labels = [h['timestamp'].strftime('%d/%H:%M') for h in history]
-    
-    series = {}
-    for c in candidates:
-        series[c] = [round(h.get(f'{c}_votes', 0)) for h in history]
-    
-    # Process ALL History (No Skipping)
-    full_records = []
+def _hourly_records(start, stop):
+    """
+    แปลง snapshot ช่วง [start, stop) เป็นตารางรายชั่วโมง
+    (คะแนน/เงิน/% ของแต่ละ code + ส่วนต่างจาก snapshot ก่อนหน้า)
+    """
+    lo = max(start - 1, 0)  # ต้องใช้ snapshot ก่อนหน้าเพื่อคิดส่วนต่าง
+    codes = engine.codes
+    votes = engine.points[lo:stop].tolist()
+    pct = engine.pct[lo:stop].tolist()
+    totals = engine.totals[lo:stop].tolist()
     
-    # Iterate through history to format and calculate deltas
-    for i, h in enumerate(history):
-        current = h
-        prev = history[i-1] if i > 0 else None
-        
-        ts_obj = current['timestamp'] if isinstance(current['timestamp'], datetime) else pd.to_datetime(current['timestamp'])
-        time_str = ts_obj.strftime('%Y-%m-%d %H:%M:%S')
+    records = []
+    times = format_times(engine.ts[start:stop], '%Y-%m-%d %H:%M:%S')
+    for i, time_str in enumerate(times, start=start - lo):
+        prev = i - 1 if lo + i > 0 else None
         
         rec = {
             'time': time_str,
-            'total_votes': round(current.get('total_votes', 0)),
-            'total_change': round(current.get('total_votes', 0) - (prev.get('total_votes', 0) if prev else 0)),
+            'total_votes': round(totals[i]),
+            'total_change': round(totals[i] - (totals[prev] if prev is not None else 0)),
             'candidates': {}
         }
         
-        for c in candidates:
-            cur_votes = round(current.get(f'{c}_votes', 0))
-            cur_cost = round(current.get(f'{c}_cost', 0))
-            cur_pct = current.get(f'{c}_pct', 0)
-            
-            if prev:
-                prev_votes = round(prev.get(f'{c}_votes', 0))
-                prev_cost = round(prev.get(f'{c}_cost', 0))
-                prev_pct = prev.get(f'{c}_pct', 0)
-                
-                diff_votes = cur_votes - prev_votes
-                diff_cost = cur_cost - prev_cost
-                diff_pct = cur_pct - prev_pct
+        for j, c in enumerate(codes):
+            cur_votes = round(votes[i][j])
+            cur_cost = round(votes[i][j] * VOTE_COST)
+            cur_pct = pct[i][j]
+            
+            if prev is not None:
+                diff_votes = cur_votes - round(votes[prev][j])
+                diff_cost = cur_cost - round(votes[prev][j] * VOTE_COST)
+                diff_pct = cur_pct - pct[prev][j]
             else:
                 diff_votes = 0
                 diff_cost = 0
@@ -191,105 +95,112 @@ def get_data():
                 'diff_cost': diff_cost,
                 'diff_pct': diff_pct
             }
-        full_records.append(rec)
-
-    # Group by Date
-    grouped_history = {}
-    for rec in full_records:
-        date_key = rec['time'].split(' ')[0] # YYYY-MM-DD
-        if date_key not in grouped_history:
-            grouped_history[date_key] = []
-        grouped_history[date_key].append(rec)
-    
-    # Convert to list of {date: ..., records: [...]}
-    final_hourly = []
-    for date in sorted(grouped_history.keys(), reverse=True):
-         # Sort records to be ASCENDING (Time Low -> Time High)
-         records_asc = sorted(grouped_history[date], key=lambda x: x['time'])
-         final_hourly.append({
-             'date': date,
-             'records': records_asc
-         })
-         
-    # Calculate Projection Model
-    # Deadline: Jan 9, 2026 12:00
-    deadline = datetime(2026, 1, 9, 12, 0, 0)
-    now = datetime.now()
-    hours_remaining = max(0, (deadline - now).total_seconds() / 3600)
+        records.append(rec)
     
-    # Calculate hourly growth rate (last 6 hours average)
-    projection = {'ynd06': {}, 'ynd10': {}, 'hours_remaining': round(hours_remaining, 1)}
+    return records
+
+
+@app.route('/')
+def dashboard():
+    return render_template_string(HTML_TEMPLATE)
+
+@app.route('/api/data')
+def get_data():
+    engine.refresh()
     
-    if len(history) >= 2:
-        # Get data points from last 6 hours
-        recent_hours = 6
-        recent_data = [h for h in history if (now - pd.to_datetime(h['timestamp'])).total_seconds() < recent_hours * 3600]
+    with engine.lock:
+        if not len(engine):
+            return jsonify({'error': 'No data'})
         
-        if len(recent_data) >= 2:
-            # First and last data points in recent window
-            first = recent_data[0]
-            last = recent_data[-1]
-            
-            time_diff_hours = (pd.to_datetime(last['timestamp']) - pd.to_datetime(first['timestamp'])).total_seconds() / 3600
-            
-            if time_diff_hours > 0:
-                # YND06 growth rate
-                ynd06_start = first.get('YND06_votes', 0)
-                ynd06_end = last.get('YND06_votes', 0)
-                ynd06_rate = (ynd06_end - ynd06_start) / time_diff_hours
-                
-                # YND10 growth rate
-                ynd10_start = first.get('YND10_votes', 0)
-                ynd10_end = last.get('YND10_votes', 0)
-                ynd10_rate = (ynd10_end - ynd10_start) / time_diff_hours
-                
-                # Current votes
-                ynd06_current = latest.get('YND06_votes', 0)
-                ynd10_current = latest.get('YND10_votes', 0)
-                
-                # Projections at deadline (normal rate)
-                ynd06_projected_normal = ynd06_current + (ynd06_rate * hours_remaining)
-                ynd10_projected_normal = ynd10_current + (ynd10_rate * hours_remaining)
-                
-                # Projections with surge (100x rate for last 3 hours)
-                surge_hours = min(3, hours_remaining)
-                normal_hours = hours_remaining - surge_hours
-                
-                ynd06_projected_surge = ynd06_current + (ynd06_rate * normal_hours) + (ynd06_rate * 100 * surge_hours)
-                ynd10_projected_surge = ynd10_current + (ynd10_rate * normal_hours) + (ynd10_rate * 100 * surge_hours)
-                
-                projection['ynd06'] = {
-                    'current': round(ynd06_current),
-                    'rate_per_hour': round(ynd06_rate),
-                    'projected_normal': round(ynd06_projected_normal),
-                    'projected_surge': round(ynd06_projected_surge)
-                }
-                
-                projection['ynd10'] = {
-                    'current': round(ynd10_current),
-                    'rate_per_hour': round(ynd10_rate),
-                    'projected_normal': round(ynd10_projected_normal),
-                    'projected_surge': round(ynd10_projected_surge)
-                }
-                
-                # Winner predictions
-                projection['winner_normal'] = 'YND06' if ynd06_projected_normal > ynd10_projected_normal else 'YND10'
-                projection['winner_surge'] = 'YND06' if ynd06_projected_surge > ynd10_projected_surge else 'YND10'
-                projection['gap_normal'] = round(abs(ynd06_projected_normal - ynd10_projected_normal))
-                projection['gap_surge'] = round(abs(ynd06_projected_surge - ynd10_projected_surge))
-         
-    return jsonify({
+        candidates = list(engine.codes)
+        latest_votes = engine.points[-1].tolist()
+        latest_pct = engine.pct[-1].tolist()
+        latest_total = float(engine.totals[-1])
+        names = engine.cached('names', _latest_names)
+        
+        # Summary List (Sorted by Votes)
+        summary = []
+        for j, c in enumerate(candidates):
+            summary.append({
+                'code': c,
+                'name': names.get(c, ''),
+                'votes': round(latest_votes[j]),
+                'cost': round(latest_votes[j] * VOTE_COST),
+                'pct': latest_pct[j]
+            })
+        summary.sort(key=lambda x: x['votes'], reverse=True)
+        
+        # Group by Date (latest first) - วันที่ปิดแล้วเป็น JSON ที่ serialize ไว้ครั้งเดียว (ต่อ request ทำแค่วันปัจจุบัน)
+        final_hourly = [
+            engine.day_partition('hourly_json', parse_date(d['date']), _day_json(d['date']))[0]
+            for d in reversed(engine.dates())
+        ]
+
+        # Time Series for Graph (history) - ต่อ partition รายวัน (กราฟในหน้านี้ใช้ /api/series แทนแล้ว)
+        name = 'history_json ' + ','.join(candidates)  # code ใหม่ -> คอลัมน์ไม่ตรงกับ partition เดิม
+        days = [engine.day_partition(name, parse_date(d['date']), _history_json) for d in engine.dates()]
+        history = '{"labels":[%s],"series":{%s}}' % (
+            ','.join(day[0] for day in days if day[0]),
+            ','.join('%s:[%s]' % (_dumps(c), ','.join(day[1][j] for day in days if day[1][j]))
+                     for j, c in enumerate(candidates)),
+        )
+    
+    # Projection Model (YND06 vs YND10) - ใช้ projection กลางจาก vote_analytics
+    projection = {'ynd06': {}, 'ynd10': {}}
+    if 'YND06' in candidates and 'YND10' in candidates:
+        proj = projection_payload(['YND06', 'YND10'])
+        pair = proj['pairs'][0]
+        projection = {
+            'ynd06': proj['candidates']['YND06'],
+            'ynd10': proj['candidates']['YND10'],
+            'hours_remaining': proj['hours_remaining'],
+            'winner_normal': pair['winner_normal'],
+            'winner_surge': pair['winner_surge'],
+            'gap_normal': pair['gap_normal'],
+            'gap_surge': pair['gap_surge'],
+            'rates': proj['rates'],
+        }
+    
+    rest = _dumps({
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'summary': summary,
-        'history': {
-            'labels': labels,
-            'series': series
-        },
-        'hourly_grouped': final_hourly,
-        'total_votes': round(latest.get('total_votes', 0)),
-        'total_money': round(latest.get('total_votes', 0) * VOTE_COST),
+        'total_votes': round(latest_total),
+        'total_money': round(latest_total * VOTE_COST),
         'projection': projection
     })
+    body = '{"history":' + history + ',"hourly_grouped":[' + ','.join(final_hourly) + '],' + rest[1:]
+    return app.response_class(body, mimetype='application/json')
+
+@app.route('/api/series')
+def get_series():
+    """Downsampled vote series for charts: ?codes=YND06,YND10&points=300 (LTTB)"""
+    try:
+        codes = [c for c in request.args.get('codes', '').split(',') if c]
+        points = int(request.args.get('points', CHART_POINTS))
+        return jsonify(series_payload(codes, points))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/projection')
+def get_projection():
+    """Deadline projection for all candidates: ?codes=&deadline=&surge_multiplier=&surge_hours=&window_hours="""
+    try:
+        return jsonify(projection_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/plan')
+def get_plan():
+    """Cheapest vote packages: ?budget=5000,10000 | ?votes=1234&exact=0 | ?overtake=YND06&rival=YND10"""
+    try:
+        return jsonify(plan_from_args(request.args))
+    except ValueError as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/diagnostics')
+def get_diagnostics():
+    """Engine status + unreadable snapshot files (quarantined until they change)"""
+    return jsonify(engine.diagnostics())
 
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -527,7 +438,31 @@ HTML_TEMPLATE = """
         // Store projection data globally for recalculation
         let cachedProjection = null;
         
-        function recalculateSurge() {
+        async function renderPlanCosts(cards) {
+            // ราคาจาก planner ฝั่ง server ให้ตรงกับ API - ไม่ใช่ votes x 4
+            // cards: [[elementId, votes, prefix]] ของ render รอบเดียว -> คำขอเดียว /api/plan?exact=0&votes=a,b,c
+            if (!cards.length) return;
+            const amounts = cards.map(([elementId, votes]) => {
+                const amount = Math.max(0, Math.ceil(votes));
+                document.getElementById(elementId).dataset.votes = amount;
+                return amount;
+            });
+            try {
+                const res = await fetch('/api/plan?exact=0&votes=' + amounts.join(','));
+                const result = await res.json();
+                cards.forEach(([elementId, , prefix = '≈ '], i) => {
+                    const el = document.getElementById(elementId);
+                    const plan = result.votes?.[i];
+                    if (el.dataset.votes !== String(amounts[i]) || !plan || plan.error) return; // มีคำขอใหม่กว่าแล้ว
+                    el.innerText = prefix + formatMoney(plan.spent);
+                });
+            } catch (error) {
+                console.error('Error fetching plan:', error);
+            }
+        }
+
+        function recalculateSurge(costs) {
+            // costs: รวมการ์ดราคาไว้ส่งพร้อมการ์ดอื่น (ไม่ระบุ = เปลี่ยน multiplier อย่างเดียว -> ถามทันที)
             if (!cachedProjection) return;
             
             const multiplier = parseInt(document.getElementById('surge-multiplier').value) || 100;
@@ -546,17 +481,21 @@ HTML_TEMPLATE = """
             // Calculate YND10 closing with custom surge
             const ynd10ClosingSurge = ynd10Current + (ynd10Rate * normalHours) + (ynd10Rate * multiplier * surgeHours);
             const ynd06NeededSurge = Math.max(0, ynd10ClosingSurge - ynd06Current + 1);
-            const ynd06CostSurge = ynd06NeededSurge * 4;
             
             document.getElementById('proj-ynd10-closing-surge').innerText = formatNumber(Math.round(ynd10ClosingSurge));
             document.getElementById('proj-ynd06-needed-surge').innerText = formatNumber(Math.round(ynd06NeededSurge)) + ' โหวต';
-            document.getElementById('proj-ynd06-cost-surge').innerText = '≈ ' + formatMoney(Math.round(ynd06CostSurge));
+            const card = ['proj-ynd06-cost-surge', ynd06NeededSurge];
+            if (costs) costs.push(card); else renderPlanCosts([card]);
         }
 
         async function fetchData() {
             try {
-                const res = await fetch('/api/data');
+                const [res, seriesRes] = await Promise.all([
+                    fetch('/api/data'),
+                    fetch('/api/series?points=300')
+                ]);
                 const data = await res.json();
+                data.series = (await seriesRes.json()).series || {};
                 renderDashboard(data);
             } catch (e) {
                 console.error("Fetch error", e);
@@ -583,6 +522,16 @@ HTML_TEMPLATE = """
             return ``;
         }
 
+        // epoch (เวลาท้องถิ่นที่ server บันทึก) -> 'dd/HH:MM'
+        function formatEpoch(ts) {
+            const iso = new Date(ts * 1000).toISOString();
+            return `${iso.slice(8, 10)}/${iso.slice(11, 16)}`;
+        }
+        
+        function toPoints(s) {
+            return s ? s.ts.map((t, i) => ({ x: t, y: s.points[i] })) : [];
+        }
+        
         function renderDashboard(data) {
             document.getElementById('last-update').innerText = 'Last update: ' + data.timestamp;
             document.getElementById('total-votes').innerText = formatNumber(data.total_votes);
@@ -617,17 +566,17 @@ HTML_TEMPLATE = """
             });
             
             // Render Prediction (YND06 vs YND10)
+            const costs = []; // การ์ดราคาทั้งหมดของรอบนี้ -> /api/plan ครั้งเดียว
             const ynd06Data = data.summary.find(s => s.code === 'YND06');
             const ynd10Data = data.summary.find(s => s.code === 'YND10');
             
             if (ynd06Data && ynd10Data) {
                 const gap = ynd10Data.votes - ynd06Data.votes;
                 const votesNeeded = gap + 1; // +1 to win
-                const costNeeded = votesNeeded * 4;
                 
                 document.getElementById('pred-gap').innerText = formatNumber(Math.abs(gap));
                 document.getElementById('pred-votes').innerText = formatNumber(votesNeeded > 0 ? votesNeeded : 0);
-                document.getElementById('pred-cost').innerText = formatMoney(costNeeded > 0 ? costNeeded : 0);
+                costs.push(['pred-cost', votesNeeded, '']);
             }
             
             // Render Projection Model
@@ -639,14 +588,13 @@ HTML_TEMPLATE = """
                 // Normal scenario
                 const ynd10ClosingNormal = proj.ynd10.projected_normal || 0;
                 const ynd06NeededNormal = Math.max(0, ynd10ClosingNormal - ynd06Current + 1); // +1 to win
-                const ynd06CostNormal = ynd06NeededNormal * 4;
                 
                 document.getElementById('proj-ynd10-closing-normal').innerText = formatNumber(ynd10ClosingNormal);
                 document.getElementById('proj-ynd06-needed-normal').innerText = formatNumber(ynd06NeededNormal) + ' โหวต';
-                document.getElementById('proj-ynd06-cost-normal').innerText = '≈ ' + formatMoney(ynd06CostNormal);
+                costs.push(['proj-ynd06-cost-normal', ynd06NeededNormal]);
                 
                 // Surge scenario - use recalculateSurge for dynamic multiplier
-                recalculateSurge();
+                recalculateSurge(costs);
                 
                 // Growth rates
                 document.getElementById('proj-rate-ynd06').innerText = formatNumber(proj.ynd06.rate_per_hour || 0);
@@ -663,6 +611,8 @@ HTML_TEMPLATE = """
                 }
             }
             
+            renderPlanCosts(costs);
+            
             // Render Hourly Table (Desktop + Grouped) - TRANSPOSED LAYOUT (Time as Columns)
             const dtContainer = document.getElementById('hourlyContainerDesktop');
             dtContainer.innerHTML = '';
@@ -751,14 +701,13 @@ HTML_TEMPLATE = """
             
             // Render Head-to-Head Chart (YND06 vs YND10)
             const ctxComp = document.getElementById('compChart').getContext('2d');
-            const ynd06 = data.history.series['YND06'];
-            const ynd10 = data.history.series['YND10'];
+            const ynd06 = toPoints(data.series['YND06']);
+            const ynd10 = toPoints(data.series['YND10']);
             
             if (compChartInstance) compChartInstance.destroy();
             compChartInstance = new Chart(ctxComp, {
                 type: 'line',
                 data: {
-                    labels: data.history.labels,
                     datasets: [
                         {
                             label: 'YND06',
@@ -783,15 +732,19 @@ HTML_TEMPLATE = """
                 options: {
                     responsive: true,
                     maintainAspectRatio: false,
-                    plugins: { legend: { position: 'top', labels: { color: '#cbd5e1' } } },
+                    plugins: {
+                        legend: { position: 'top', labels: { color: '#cbd5e1' } },
+                        tooltip: { callbacks: { title: items => formatEpoch(items[0].parsed.x) } }
+                    },
                     scales: {
                         y: { 
                             grid: { color: '#334155' },
                             ticks: { color: '#94a3b8' }
                         },
                         x: { 
+                            type: 'linear',
                             grid: { display: false },
-                            ticks: { color: '#94a3b8', maxTicksLimit: 10 }
+                            ticks: { color: '#94a3b8', maxTicksLimit: 10, callback: v => formatEpoch(v) }
                         }
                     }
                 }
@@ -810,7 +763,7 @@ HTML_TEMPLATE = """
                  if (item.votes > 100) {
                      datasets.push({
                         label: item.code,
-                        data: data.history.series[item.code],
+                        data: toPoints(data.series[item.code]),
                         borderColor: colors[colorIdx % colors.length],
                         borderWidth: 2,
                         pointRadius: 0,
@@ -843,7 +796,6 @@ HTML_TEMPLATE = """
             allChartInstance = new Chart(ctxAll, {
                 type: 'line',
                 data: {
-                    labels: data.history.labels,
                     datasets: datasets
                 },
                 options: {
@@ -856,6 +808,7 @@ HTML_TEMPLATE = """
                             ticks: { color: '#94a3b8' }
                         },
                         x: { 
+                            type: 'linear',
                             display: false 
                         }
                     }
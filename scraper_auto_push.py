@@ -155,13 +155,15 @@ Y UNIVERSE AWARDS 2025 - Auto Scraper with GitHub Push
 
 import requests
 from bs4 import BeautifulSoup
-import json
-import re
 from datetime import datetime
 from pathlib import Path
+import sqlite3
 import subprocess
 import time
 import schedule
+from vote_extract import extract_chart_data, extract_couples
+from vote_segments import SegmentStore
+from vote_store import CandidateTable, SnapshotEncoder, VoteStore, write_snapshot
 
 # ========== ตั้งค่า ==========
 CONFIG = {
@@ -176,6 +178,11 @@ CONFIG = {
 DATA_DIR = Path('data_yna2025')
 DATA_DIR.mkdir(exist_ok=True)
 
+STORE = VoteStore.from_env()  # SQLite (ถ้าตั้ง VOTE_DB)
+CANDIDATES = CandidateTable(DATA_DIR)
+ENCODER = SnapshotEncoder()  # keyframe + delta (อิง latest.json บนดิสก์)
+SEGMENTS = SegmentStore(DATA_DIR)  # วันที่ปิดแล้วรวมเป็นไฟล์เดียวต่อวันก่อน push
+
 # ========== Scraper ==========
 class VoteScraper:
     def __init__(self):
@@ -226,34 +233,9 @@ class VoteScraper:
             html = response.text
             soup = BeautifulSoup(html, 'html.parser')
             
-            # Extract Chart.js data
-            vote_data = {'labels': [], 'data': []}
-            for script in soup.find_all('script'):
-                if script.string and 'Chart' in script.string:
-                    labels_match = re.search(r'labels\s*:\s*\[(.*?)\]', script.string, re.DOTALL)
-                    if labels_match:
-                        vote_data['labels'] = re.findall(r'["\']([^"\']+)["\']', labels_match.group(1))
-                    
-                    data_match = re.search(r"data\s*:\s*\[(.*?)\]", script.string, re.DOTALL)
-                    if data_match:
-                        numbers = re.findall(r'["\']?([\d.]+)["\']?', data_match.group(1))
-                        vote_data['data'] = [float(x) for x in numbers if x]
-                    break
-            
-            # Extract couple names
-            couples = {}
-            text = soup.get_text()
-            for match in re.finditer(r'(YND\d+)\s*:\s*([^\n]+)', text):
-                code = match.group(1)
-                rest = match.group(2).strip()
-                series_match = re.search(r'\(([^)]+)\)\s*$', rest)
-                if series_match:
-                    series = series_match.group(1)
-                    names = rest[:series_match.start()].strip()
-                else:
-                    series = ''
-                    names = rest
-                couples[code] = {'names': names, 'series': series}
+            # Extract Chart.js data + couple names
+            vote_data = extract_chart_data(soup)
+            couples = extract_couples(soup)
             
             # Build result
             result = {
@@ -285,8 +267,17 @@ class VoteScraper:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         json_file = DATA_DIR / f"vote_{timestamp}.json"
         
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # ชื่อคู่/ซีรีส์เก็บครั้งเดียวใน candidates.json
+        CANDIDATES.update(data, json_file.name)
+        # เขียนแบบ atomic แล้วอัปเดต latest.json
+        write_snapshot(DATA_DIR, json_file.name, data, ENCODER)
+        
+        # บันทึกลง SQLite ด้วย (ถ้าตั้ง VOTE_DB)
+        if STORE:
+            try:
+                STORE.save_snapshot(data, json_file.name)
+            except sqlite3.Error as e:
+                print(f"⚠️ บันทึกลงฐานข้อมูลไม่สำเร็จ: {e}")
         
         print(f"💾 บันทึก: {json_file.name}")
         return str(json_file)
@@ -358,6 +349,16 @@ def run_job():
         for item in data['summary'][:3]:
             print(f"   {item['code']}: {item['percentage']:.2f}%")
         
+        # รวมไฟล์ของวันที่ปิดแล้วเป็น segment (ลดจำนวนไฟล์ใน git)
+        for r in SEGMENTS.compact():
+            if 'error' in r:
+                print(f"⚠️ compact {r['day']} ไม่สำเร็จ: {r['error']}")
+            else:
+                print(f"📦 {r['segment']}: {r['files']} ไฟล์")
+        for r in SEGMENTS.retain():  # ทำงานเมื่อตั้ง RETAIN_RAW_DAYS เท่านั้น
+            if 'error' in r:
+                print(f"⚠️ retention {r['day']} ไม่สำเร็จ: {r['error']}")
+        
         # Push ขึ้น GitHub
         git_push()
     else:
@@ -3,34 +3,53 @@ Test script to compare vote calculation between dashboard.py and dashboard_two.p
 """
 from pathlib import Path
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import pandas as pd
+from vote_segments import SegmentStore
+from vote_store import snapshot_rows
 
 DATA_DIR = Path('data_yna2025')
 BASE_TOTAL_VOTES = 100000
 
-# Method 1: dashboard_two.py style (pandas)
-def calc_dashboard_two():
-    records = []
-    for f in sorted(DATA_DIR.glob("vote_*.json")):
+
+def load_snapshots():
+    """
+    % ครบทุก code ของทุก snapshot -> [{'timestamp', 'data': {code: pct}}] เรียงตามเวลา
+    ไฟล์ delta มีเฉพาะ code ที่เปลี่ยน จึงอ่านผ่าน snapshot_rows (เติมค่าจาก snapshot ก่อนหน้า)
+    รวม snapshot ที่ compact เป็น segment แล้ว
+    """
+    segments = SegmentStore(DATA_DIR)
+    loose = []
+    for f in sorted(DATA_DIR.glob('vote_*.json')):
         try:
             with open(f, 'r', encoding='utf-8') as fp:
-                data = json.load(fp)
-            timestamp = data.get('timestamp')
-            if not timestamp:
-                ts_str = f.stem.replace('vote_', '')
-                try:
-                    timestamp = datetime.strptime(ts_str, "%Y%m%d_%H%M%S").isoformat()
-                except:
-                    continue
-            summary = data.get('summary', [])
-            row = {'timestamp': timestamp}
-            for item in summary:
-                code = item['code']
-                row[f'{code}_pct'] = item['percentage']
-            records.append(row)
-        except Exception as e:
+                loose.append((f.name, json.load(fp)))
+        except Exception:
             continue
+    try:
+        rows = segments.rows(skip={name for name, _ in loose})
+    except (OSError, ValueError, KeyError):
+        rows = []
+
+    def previous(ts):
+        earlier = [r for r in rows if r[0] < ts]
+        return max(earlier, key=lambda r: r[0])[2] if earlier else None
+
+    rows = sorted(rows + snapshot_rows(loose, previous), key=lambda r: r[0])
+    return [
+        {'timestamp': datetime.fromtimestamp(ts, timezone.utc).isoformat(), 'data': pct}
+        for ts, _, pct, _ in rows
+    ]
+
+
+# Method 1: dashboard_two.py style (pandas)
+def calc_dashboard_two():
+    records = []
+    for snapshot in load_snapshots():
+        row = {'timestamp': snapshot['timestamp']}
+        for code, pct in snapshot['data'].items():
+            row[f'{code}_pct'] = pct
+        records.append(row)
     
     if not records:
         return {}
@@ -61,33 +80,15 @@ def calc_dashboard_two():
 
 # Method 2: dashboard.py style (plain Python)
 def calc_dashboard():
-    json_files = sorted(DATA_DIR.glob('vote_*.json'))
-    
     all_codes = set()
     history_data = []
     
-    for file in json_files:
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            timestamp = data.get('timestamp', '')
-            raw_timestamp = timestamp
-            
-            vote_data = {}
-            if 'summary' in data:
-                for item in data['summary']:
-                    code = item.get('code', '')
-                    pct = item.get('percentage', 0)
-                    vote_data[code] = pct
-                    all_codes.add(code)
-            
-            history_data.append({
-                'raw_timestamp': raw_timestamp,
-                'data': vote_data
-            })
-        except:
-            continue
+    for snapshot in load_snapshots():
+        all_codes.update(snapshot['data'])
+        history_data.append({
+            'raw_timestamp': snapshot['timestamp'],
+            'data': snapshot['data']
+        })
     
     history_data.sort(key=lambda x: x['raw_timestamp'])
     
@@ -0,0 +1,58 @@
+"""
+ทดสอบ vote_codec: encode_block / decode_block ถอดกลับได้ตรงทุก bit
+"""
+import io
+
+import numpy as np
+
+from vote_codec import decode_block, encode_block, iter_blocks
+
+
+def _bits(a):
+    return np.asarray(a, dtype=np.float64).view(np.int64)
+
+
+def test_round_trip_hourly():
+    ts = 1767700800 + 3600 * np.arange(24) + np.array([0, 3, -2, 7] * 6)
+    rng = np.random.default_rng(1)
+    pct = np.round(np.cumsum(rng.random((24, 3)), axis=0), 2)
+    block = decode_block(encode_block(ts, ['YND01', 'YND02', 'YND03'], [f'f{i}' for i in range(24)], pct))
+    assert np.array_equal(block['ts'], ts)
+    assert np.array_equal(_bits(block['pct']), _bits(pct))
+    assert block['codes'] == ['YND01', 'YND02', 'YND03']
+    assert block['filenames'] == [f'f{i}' for i in range(24)]
+    assert block['gain'] is None
+
+
+def test_round_trip_special_values():
+    # NaN / -0.0 / inf / เวลาซ้ำกัน / ช่วงเวลากระโดดมาก
+    ts = np.array([1767700800, 1767700800, 1767700800, 1767704400, 1767704401, 1900000000, 0], dtype=np.int64)
+    pct = np.array([
+        [0.0, -0.0],
+        [np.nan, 1.5],
+        [-0.0, np.nan],
+        [np.inf, -np.inf],
+        [1e-300, 5e-324],
+        [33.33, 33.33],
+        [33.33, 0.1 + 0.2],
+    ])
+    gain = np.where(np.isnan(pct), 0.0, np.nan)
+    block = decode_block(encode_block(ts, ['A', 'B'], list('abcdefg'), pct, gain))
+    assert np.array_equal(block['ts'], ts)
+    assert np.array_equal(_bits(block['pct']), _bits(pct))  # แยก -0.0 กับ 0.0 และ NaN ได้
+    assert np.array_equal(_bits(block['gain']), _bits(gain))
+
+
+def test_empty_and_no_codes():
+    block = decode_block(encode_block([], ['A'], [], np.empty((0, 1))))
+    assert len(block['ts']) == 0 and block['pct'].shape == (0, 1)
+    block = decode_block(encode_block([1, 2], [], ['a', 'b'], np.empty((2, 0))))
+    assert np.array_equal(block['ts'], [1, 2]) and block['pct'].shape == (2, 0)
+
+
+def test_iter_blocks_concatenated():
+    first = encode_block([1, 2], ['A'], ['a', 'b'], [[1.0], [2.0]])
+    second = encode_block([3], ['A', 'B'], ['c'], [[3.0, 4.0]])
+    blocks = list(iter_blocks(io.BytesIO(first + second)))
+    assert [b['filenames'] for b in blocks] == [['a', 'b'], ['c']]
+    assert blocks[1]['pct'].tolist() == [[3.0, 4.0]]
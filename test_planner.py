@@ -0,0 +1,80 @@
+"""
+ทดสอบ vote_planner เทียบกับ brute force (DP เต็มทุกจำนวน) สำหรับ N เล็ก
+"""
+import math
+
+from vote_planner import PACKAGES, plan_budget, plan_votes
+
+PACKS = [(p['price'], p['points']) for p in PACKAGES]
+MAX_POINTS = max(points for _, points in PACKS)
+
+
+def _exact_costs(limit: int) -> list:
+    """cost[v] = เงินน้อยสุดที่ได้พอดี v คะแนน (unbounded knapsack เต็มตาราง)"""
+    cost = [0] + [math.inf] * limit
+    for v in range(1, limit + 1):
+        for price, points in PACKS:
+            if points <= v:
+                cost[v] = min(cost[v], cost[v - points] + price)
+    return cost
+
+
+def _best_votes(limit: int) -> list:
+    """votes[b] = คะแนนมากสุดด้วยเงินไม่เกิน b บาท"""
+    votes = [0] * (limit + 1)
+    for b in range(1, limit + 1):
+        votes[b] = votes[b - 1]
+        for price, points in PACKS:
+            if price <= b:
+                votes[b] = max(votes[b], votes[b - price] + points)
+    return votes
+
+
+def _check_purchases(result: dict):
+    assert result['spent'] == sum(p['spent'] for p in result['purchases'])
+    assert result['points'] == sum(p['points'] for p in result['purchases'])
+    for p in result['purchases']:
+        assert p['spent'] == p['qty'] * p['price']
+
+
+def test_plan_votes_exact():
+    cost = _exact_costs(2500)
+    for n in range(2500):
+        result = plan_votes(n)
+        _check_purchases(result)
+        assert result['points'] == n
+        assert result['spent'] == cost[n], n
+
+
+def test_plan_votes_at_least():
+    cost = _exact_costs(2500 + MAX_POINTS)
+    for n in range(2500):
+        result = plan_votes(n, exact=False)
+        _check_purchases(result)
+        best = min(cost[n:n + MAX_POINTS])
+        assert result['spent'] == best, n
+        assert result['points'] >= n
+        # เสมอกันเลือกที่ได้คะแนนน้อยกว่า
+        assert result['points'] == n + cost[n:n + MAX_POINTS].index(best)
+
+
+def test_plan_budget():
+    votes = _best_votes(12000)
+    # spent[b] = เงินน้อยสุดที่ได้ votes[b] คะแนน (votes ไม่ลดลงตามงบ)
+    spent = [0] * len(votes)
+    for b in range(1, len(votes)):
+        spent[b] = spent[b - 1] if votes[b] == votes[b - 1] else b
+    for b in list(range(0, 1000)) + list(range(1000, 12000, 7)):
+        result = plan_budget(b)
+        _check_purchases(result)
+        assert result['points'] == votes[b], b
+        assert result['spent'] == spent[b], b
+        assert result['remaining'] == b - result['spent']
+
+
+def test_large_amounts():
+    n = 10 ** 12 + 7
+    result = plan_votes(n)
+    assert result['points'] == n
+    result = plan_budget(10 ** 12)
+    assert result['spent'] <= 10 ** 12
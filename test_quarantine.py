@@ -0,0 +1,46 @@
+"""
+ทดสอบ vote_quarantine: ข้ามไฟล์เสียจนกว่า mtime/ขนาดจะเปลี่ยน และจำข้าม process ผ่าน quarantine.json
+"""
+import os
+
+from vote_quarantine import Quarantine
+
+
+def test_skip_until_changed(tmp_path):
+    bad = tmp_path / 'vote_20260107_010000.json'
+    bad.write_text('{"timestamp": "2026-01-07T01:00', encoding='utf-8')
+    quarantine = Quarantine(tmp_path / 'quarantine.json')
+
+    assert not quarantine.skip(bad)  # ยังไม่เคยบันทึก
+    assert quarantine.add(bad, ValueError('ตัดกลางคัน'))
+    assert quarantine.skip(bad)
+    assert quarantine.report()[0]['error'] == 'ValueError: ตัดกลางคัน'
+
+    # process ใหม่โหลดจากไฟล์
+    assert Quarantine(tmp_path / 'quarantine.json').skip(bad)
+
+    # ขนาดเปลี่ยน -> ออกจาก quarantine ให้อ่านใหม่
+    bad.write_text('{"timestamp": "2026-01-07T01:00:00", "summary": []}', encoding='utf-8')
+    assert not quarantine.skip(bad)
+    assert bad not in quarantine
+    assert not Quarantine(tmp_path / 'quarantine.json').skip(bad)
+
+
+def test_mtime_change_readmits(tmp_path):
+    bad = tmp_path / 'vote_20260107_020000.json'
+    bad.write_text('{', encoding='utf-8')
+    quarantine = Quarantine()
+    quarantine.add(bad, 'อ่านไม่ได้')
+    quarantine.add(bad, 'อ่านไม่ได้')
+    assert quarantine.report()[0]['attempts'] == 2
+
+    st = bad.stat()
+    os.utime(bad, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))  # ขนาดเดิม แต่ mtime ใหม่
+    assert not quarantine.skip(bad)
+    assert len(quarantine) == 0
+
+
+def test_missing_file(tmp_path):
+    quarantine = Quarantine()
+    assert not quarantine.add(tmp_path / 'gone.json', 'ไม่มีไฟล์')
+    assert len(quarantine) == 0
@@ -0,0 +1,79 @@
+"""
+ทดสอบ vote_segments: compact + retain แล้วคะแนนสะสม (จาก gain) ยังเท่ากับข้อมูลดิบ
+"""
+import random
+
+import numpy as np
+
+from vote_engine import BASE_TOTAL_VOTES, VoteEngine
+from vote_segments import SegmentStore
+from vote_store import SnapshotEncoder, write_snapshot
+
+CODES = ['YND01', 'YND02', 'YND03']
+
+
+def _write_days(data_dir, days: int = 5, per_hour: int = 4) -> list:
+    """snapshot ทุก 15 นาที (keyframe + delta) -> % ของทุก snapshot ตามลำดับเวลา"""
+    rng = random.Random(11)
+    encoder = SnapshotEncoder(8)
+    pct = {code: 100 / len(CODES) for code in CODES}
+    written = []
+    for day in range(days):
+        for hour in range(24):
+            for quarter in range(per_hour):
+                for code in rng.sample(CODES, 2):
+                    pct[code] = round(max(0.0, pct[code] + rng.uniform(-0.3, 0.5)), 2)
+                minute = quarter * 60 // per_hour
+                write_snapshot(data_dir, f'vote_202601{day + 1:02d}_{hour:02d}{minute:02d}00.json', {
+                    'timestamp': f'2026-01-{day + 1:02d}T{hour:02d}:{minute:02d}:00',
+                    'summary': [{'code': c, 'percentage': v, 'names': c, 'series': ''} for c, v in pct.items()],
+                }, encoder)
+                written.append(dict(pct))
+    return written
+
+
+def _raw_points(written: list) -> np.ndarray:
+    """คะแนนสะสมแบบเดียวกับ engine: ส่วนต่างที่เพิ่มขึ้นของ % x BASE_TOTAL_VOTES / 100"""
+    pct = np.array([[row[code] for code in CODES] for row in written])
+    gain = np.maximum(0.0, np.diff(pct, axis=0)).sum(axis=0)
+    return (pct[0] + gain) * BASE_TOTAL_VOTES / 100
+
+
+def _engine_points(data_dir) -> np.ndarray:
+    engine = VoteEngine(data_dir, None, shared=False)
+    engine.refresh()
+    assert engine.codes == CODES
+    return engine.points[-1]
+
+
+def test_compact_keeps_totals(tmp_path):
+    written = _write_days(tmp_path)
+    before = _engine_points(tmp_path)
+    assert np.allclose(before, _raw_points(written))
+
+    store = SegmentStore(tmp_path)
+    results = store.compact()
+    assert [r['day'] for r in results] == ['20260101', '20260102', '20260103', '20260104']
+    assert not any('error' in r for r in results)
+    assert store.verify() == []
+    assert len(list(tmp_path.glob('vote_*.json'))) == 24 * 4  # เหลือเฉพาะวันล่าสุด
+    assert np.allclose(_engine_points(tmp_path), before)
+
+
+def test_retain_keeps_totals(tmp_path):
+    written = _write_days(tmp_path)
+    raw = _raw_points(written)
+    store = SegmentStore(tmp_path)
+    store.compact()
+
+    results = store.retain(raw_days=1, hourly_days=3)
+    tiers = {r['day']: (r['tier'], r['after']) for r in results}
+    assert tiers == {'20260101': ('daily', 1), '20260102': ('daily', 1), '20260103': ('hourly', 24),
+                     '20260104': ('hourly', 24)}
+    assert store.verify() == []
+    assert np.allclose(_engine_points(tmp_path), raw)
+
+    # downsample ซ้ำเป็นชั้นที่หยาบกว่า (gain เดิมรวมต่อ) ยังได้ยอดเท่าเดิม
+    store.retain(raw_days=1, hourly_days=1)
+    assert {entry['tier'] for entry in store.index().values()} == {'daily'}
+    assert np.allclose(_engine_points(tmp_path), raw)
@@ -0,0 +1,106 @@
+"""
+ทดสอบ vote_store: snapshot แบบ keyframe + delta อ่านกลับ (forward-fill) ได้ % ครบทุก code
+"""
+import json
+import random
+
+from vote_engine import VoteEngine
+from vote_store import CandidateTable, SnapshotEncoder, VoteStore, read_latest, snapshot_rows, write_snapshot
+
+CODES = ['YND01', 'YND02', 'YND03', 'YND04']
+
+
+def _snapshot(hour: int, pct: dict) -> dict:
+    return {
+        'timestamp': f'2026-01-07T{hour:02d}:00:00',
+        'summary': [{'code': code, 'percentage': value, 'names': code, 'series': ''} for code, value in pct.items()],
+    }
+
+
+def _read_dir(path) -> list:
+    files = sorted(path.glob('vote_*.json'))
+    return snapshot_rows([(f.name, json.loads(f.read_text(encoding='utf-8'))) for f in files])
+
+
+def test_forward_fill_delta():
+    snapshots = [
+        ('vote_20260107_000000.json', {'timestamp': '2026-01-07T00:00:00', 'summary': [
+            {'code': 'A', 'percentage': 10.0}, {'code': 'B', 'percentage': 20.0}, {'code': 'C', 'percentage': 70.0}]}),
+        ('vote_20260107_010000.json', {'timestamp': '2026-01-07T01:00:00', 'delta': True, 'summary': [
+            {'code': 'A', 'percentage': 11.0}]}),
+        ('vote_20260107_020000.json', {'timestamp': '2026-01-07T02:00:00', 'delta': True, 'summary': []}),
+        ('vote_20260107_030000.json', {'timestamp': '2026-01-07T03:00:00', 'delta': True, 'summary': [
+            {'code': 'B', 'percentage': 19.0}, {'code': 'C', 'percentage': 70.0}]}),
+    ]
+    random.Random(3).shuffle(snapshots)  # เรียงตามเวลาเอง
+    rows = snapshot_rows(snapshots)
+    assert [r[1] for r in rows] == [f'vote_20260107_0{h}0000.json' for h in range(4)]
+    assert [r[2] for r in rows] == [
+        {'A': 10.0, 'B': 20.0, 'C': 70.0},
+        {'A': 11.0, 'B': 20.0, 'C': 70.0},
+        {'A': 11.0, 'B': 20.0, 'C': 70.0},
+        {'A': 11.0, 'B': 19.0, 'C': 70.0},
+    ]
+
+
+def test_forward_fill_from_previous():
+    delta = {'timestamp': '2026-01-07T05:00:00', 'delta': True, 'summary': [{'code': 'A', 'percentage': 12.0}]}
+    rows = snapshot_rows([('vote_20260107_050000.json', delta)], lambda ts: {'A': 11.0, 'B': 19.0})
+    assert rows[0][2] == {'A': 12.0, 'B': 19.0}
+    rows = snapshot_rows([('vote_20260107_050000.json', delta)], {'B': 19.0})
+    assert rows[0][2] == {'A': 12.0, 'B': 19.0}
+
+
+def test_write_snapshot_round_trip(tmp_path):
+    rng = random.Random(7)
+    pct = {code: 25.0 for code in CODES}
+    expected = []
+    for hour in range(24):
+        for code in rng.sample(CODES, rng.randint(0, 2)):  # บาง code ไม่เปลี่ยน -> อยู่นอก delta
+            pct[code] = round(pct[code] + rng.uniform(-1, 1), 2)
+        write_snapshot(tmp_path, f'vote_20260107_{hour:02d}0000.json', _snapshot(hour, pct), SnapshotEncoder(6))
+        expected.append(dict(pct))
+
+    files = [json.loads(f.read_text(encoding='utf-8')) for f in sorted(tmp_path.glob('vote_*.json'))]
+    assert any(f.get('delta') for f in files) and not files[0].get('delta')
+    assert [r[2] for r in _read_dir(tmp_path)] == expected
+
+    latest = read_latest(tmp_path)
+    assert latest['filename'] == 'vote_20260107_230000.json'
+    assert {s['code']: s['percentage'] for s in latest['snapshot']['summary']} == expected[-1]
+
+
+def test_write_snapshot_out_of_order(tmp_path):
+    encoder = SnapshotEncoder(100)
+    values = {hour: {code: 25.0 + hour * (j - 1.5) for j, code in enumerate(CODES)} for hour in range(6)}
+    values[4]['YND01'] = values[3]['YND01']  # ไม่เปลี่ยน -> ต้องเติมจากแถวก่อนหน้า
+    for hour in (0, 1, 2, 4, 5, 3):  # ไฟล์ชั่วโมง 3 มาช้า
+        write_snapshot(tmp_path, f'vote_20260107_{hour:02d}0000.json', _snapshot(hour, values[hour]), encoder)
+    assert [r[2] for r in _read_dir(tmp_path)] == [values[hour] for hour in range(6)]
+    assert read_latest(tmp_path)['filename'] == 'vote_20260107_050000.json'
+
+
+def test_candidates_shared_file(tmp_path):
+    # สอง process (สอง table) เขียนไฟล์เดียวกัน -> ไม่ทับ version ของอีกฝั่ง
+    first, second = CandidateTable(tmp_path), CandidateTable(tmp_path)
+    assert first.update(_snapshot(0, {'A': 1.0}))
+    assert second.update(_snapshot(1, {'B': 1.0}))
+    assert set(first.versions()) == {'A', 'B'}
+    assert not list(tmp_path.glob('*.tmp'))
+
+    # ไฟล์เสีย -> ใช้ชุดล่าสุดที่อ่านได้ ไม่ raise
+    (tmp_path / 'candidates.json').write_text('{"A": [', encoding='utf-8')
+    assert set(first.versions()) == {'A', 'B'}
+    assert CandidateTable(tmp_path).versions() == {}
+
+
+def test_store_duplicate_timestamp(tmp_path):
+    for name in ('vote_20260107_000000.json', 'vote_20260107_000000_retry.json'):  # เวลาเดียวกัน
+        write_snapshot(tmp_path, name, _snapshot(0, {'A': 1.0}), SnapshotEncoder(1))
+    engine = VoteEngine(tmp_path, None, shared=False, store=VoteStore(tmp_path / 'votes.db'))
+    engine.refresh()
+    assert len(engine) == 1
+    # ไฟล์ที่ DB ไม่รับถือว่าอ่านแล้ว -> ไม่นำเข้าซ้ำทุก refresh และแจ้งใน quarantine
+    assert not engine._has_new(sorted(tmp_path.glob('vote_*.json')))
+    assert [entry['error'] for entry in engine.quarantine.report()] == [
+        'เวลาซ้ำกับ vote_20260107_000000.json (ไม่ได้บันทึกลง DB)']
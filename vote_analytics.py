@@ -0,0 +1,516 @@
+"""
+Vote Analytics - งานวิเคราะห์บนข้อมูลของ vote_engine (คำนวณด้วย NumPy ทั้ง array)
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from vote_engine import engine, format_time, format_times, now_epoch, parse_time_arg
+from vote_planner import plan_batch, plan_votes
+
+# จำนวนจุดสูงสุดต่อเส้นกราฟที่ /api/series ยอมส่ง
+MAX_SERIES_POINTS = 2000
+
+# ค่าตั้งต้นของ projection (ปรับได้ด้วย env หรือ query string)
+# Deadline: Jan 9, 2026 12:00 (เวลาไทย)
+VOTE_DEADLINE = os.environ.get('VOTE_DEADLINE', '2026-01-09T12:00:00+07:00')
+SURGE_MULTIPLIER = float(os.environ.get('SURGE_MULTIPLIER', 100))  # สปริ้นท์ช่วงท้าย x เท่า
+SURGE_HOURS = float(os.environ.get('SURGE_HOURS', 3))  # จำนวนชั่วโมงสุดท้ายที่สปริ้นท์
+RATE_WINDOW_HOURS = 6  # คิดอัตราโหวตจากกี่ชั่วโมงล่าสุด
+RATE_WINDOWS = (1, 3, 6, 12, 24)  # ช่วงเวลาที่ส่งอัตราให้หน้าเว็บเลือกเอง
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: เลือก index ของจุดที่คงรูปกราฟไว้มากที่สุด
+    x: (n,) แกนเวลา, y: (n, k) หลายเส้นพร้อมกัน -> คืน index (threshold, k) ของแต่ละเส้น
+    วนทีละ bucket แต่คำนวณพื้นที่สามเหลี่ยมของทุกจุดในถังและทุกเส้นพร้อมกัน
+    """
+    n, k = y.shape
+    if threshold >= n or threshold < 3:
+        return np.repeat(np.arange(n)[:, None], k, axis=1)
+
+    x = x.astype(float) - float(x[0])
+    cols = np.arange(k)
+    every = (n - 2) / (threshold - 2)
+
+    out = np.empty((threshold, k), dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = np.zeros(k, dtype=np.int64)
+
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        next_lo = hi
+        next_hi = min(int((i + 2) * every) + 1, n)
+
+        # จุดเฉลี่ยของถังถัดไป
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean(axis=0)
+
+        ax = x[a]
+        ay = y[a, cols]
+        area = np.abs(
+            (ax - avg_x) * (y[lo:hi] - ay)
+            - (ax - x[lo:hi, None]) * (avg_y - ay)
+        )
+        a = lo + area.argmax(axis=0)
+        out[i + 1] = a
+
+    return out
+
+
+def _build_series(codes: list, points: int) -> dict:
+    cols = [engine.codes.index(c) for c in codes]
+    values = engine.points[:, cols]
+    indices = lttb_indices(engine.ts, values, points)
+
+    series = {}
+    for j, code in enumerate(codes):
+        idx = indices[:, j]
+        series[code] = {
+            'ts': engine.ts[idx].tolist(),
+            'time': format_times(engine.ts[idx]),
+            'points': np.round(values[idx, j]).astype(np.int64).tolist(),
+        }
+
+    return {
+        'codes': codes,
+        'points': min(points, len(engine)),
+        'total_points': len(engine),
+        'series': series,
+    }
+
+
+def series_payload(codes: list | None = None, points: int = 300) -> dict:
+    """
+    คะแนนสะสมของแต่ละ code ที่ลดจำนวนจุดด้วย LTTB สำหรับวาดกราฟ
+    cache ต่อ (codes, points, version ของข้อมูล) - ValueError ถ้า code ไม่มีอยู่จริง
+    """
+    engine.refresh()
+    with engine.lock:
+        codes = list(codes) if codes else list(engine.codes)
+        unknown = [c for c in codes if c not in engine.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+
+        points = max(3, min(int(points), MAX_SERIES_POINTS))
+        key = f"series:{','.join(codes)}:{points}"
+        return engine.cached(key, lambda: _build_series(codes, points))
+
+
+def window_rates(windows=RATE_WINDOWS) -> np.ndarray:
+    """
+    อัตราคะแนนต่อชั่วโมงของทุก code หลายช่วงเวลาพร้อมกัน -> (len(windows), n_codes)
+    points เป็น prefix sum ของ added อยู่แล้ว คะแนนที่ได้ในช่วงจึงเป็นแค่ผลต่างของ 2 แถว
+    จุดเริ่มของแต่ละช่วง = snapshot สุดท้ายที่เก่ากว่า (ล่าสุด - window) หาด้วย searchsorted ครั้งเดียว
+    """
+    windows = np.asarray(windows, dtype=float)
+    if len(engine) < 2:
+        return np.zeros((len(windows), len(engine.codes)))
+
+    last = len(engine) - 1
+    thresholds = engine.ts[last] - windows * 3600
+    starts = np.clip(np.searchsorted(engine.ts, thresholds, side='right') - 1, 0, last)
+
+    hours = (engine.ts[last] - engine.ts[starts]) / 3600
+    gained = engine.points[last] - engine.points[starts]
+    safe_hours = np.where(hours > 0, hours, 1)
+    return np.where(hours[:, None] > 0, gained / safe_hours[:, None], 0.0)
+
+
+def rates_per_hour(window_hours: float = RATE_WINDOW_HOURS) -> np.ndarray:
+    """อัตราคะแนนต่อชั่วโมงของทุก code จากช่วง window_hours ก่อน snapshot ล่าสุด"""
+    return window_rates([window_hours])[0]
+
+
+def _float(args, name: str, default) -> float:
+    try:
+        return float(args.get(name, default))
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} ต้องเป็นตัวเลข') from None
+
+
+def _check_params(**params):
+    """พารามิเตอร์ตัวเลขจากผู้ใช้ต้องเป็นตัวเลขจริงและไม่ติดลบ (None = ใช้ค่าเริ่มต้น) -> ValueError"""
+    params = {name: value for name, value in params.items() if value is not None}
+    bad = [name for name, value in params.items() if not np.isfinite(value)]
+    if bad:
+        raise ValueError(f"{', '.join(bad)} ต้องเป็นตัวเลข")
+    negative = [name for name, value in params.items() if value < 0]
+    if negative:
+        raise ValueError(f"{', '.join(negative)} ต้องไม่ติดลบ")
+
+
+def projection_payload(codes: list | None = None, deadline: int | None = None, now: int | None = None,
+                       surge_multiplier: float = SURGE_MULTIPLIER, surge_hours: float = SURGE_HOURS,
+                       window_hours: float = RATE_WINDOW_HOURS) -> dict:
+    """
+    คาดการณ์คะแนน ณ เวลาปิดโหวตของทุก code พร้อมกัน
+    - normal: อัตราปัจจุบันต่อเนื่องจนปิดโหวต
+    - surge:  อัตรา x surge_multiplier ใน surge_hours ชั่วโมงสุดท้าย
+    และผลแพ้ชนะ/ส่วนต่างของทุกคู่ (needed = ต้องโหวตเพิ่มอีกเท่าไหร่จึงชนะอีกฝ่าย)
+    """
+    _check_params(surge_multiplier=surge_multiplier, surge_hours=surge_hours, window_hours=window_hours)
+    if window_hours <= 0:
+        raise ValueError('window_hours ต้องมากกว่า 0')
+    engine.refresh()
+    deadline = parse_time_arg(VOTE_DEADLINE) if deadline is None else deadline
+    now = now_epoch() if now is None else now
+
+    with engine.lock:
+        codes = list(codes) if codes else list(engine.codes)
+        unknown = [c for c in codes if c not in engine.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+        if not len(engine):
+            return {'error': 'ไม่พบไฟล์ข้อมูล'}
+
+        cols = [engine.codes.index(c) for c in codes]
+        current = engine.points[-1, cols]
+        rate = rates_per_hour(window_hours)[cols]
+        all_rates = window_rates(RATE_WINDOWS)[:, cols]
+
+    hours_remaining = max(0.0, (deadline - now) / 3600)
+    surge_h = min(surge_hours, hours_remaining)
+    normal_h = hours_remaining - surge_h
+
+    projected_normal = current + rate * hours_remaining
+    projected_surge = current + rate * normal_h + rate * surge_multiplier * surge_h
+
+    # ทุกคู่พร้อมกัน: [i, j] = i - j
+    gap_normal = projected_normal[:, None] - projected_normal[None, :]
+    gap_surge = projected_surge[:, None] - projected_surge[None, :]
+    # i ต้องเพิ่มกี่คะแนน (จากตอนนี้) ให้ชนะยอดปิดของ j
+    needed_normal = np.maximum(0, projected_normal[None, :] - current[:, None] + 1)
+    needed_surge = np.maximum(0, projected_surge[None, :] - current[:, None] + 1)
+
+    candidates = {}
+    for j, code in enumerate(codes):
+        candidates[code] = {
+            'current': round(float(current[j])),
+            'rate_per_hour': round(float(rate[j])),
+            'projected_normal': round(float(projected_normal[j])),
+            'projected_surge': round(float(projected_surge[j])),
+        }
+
+    pairs = []
+    for i in range(len(codes)):
+        for j in range(i + 1, len(codes)):
+            a, b = codes[i], codes[j]
+            pairs.append({
+                'a': a,
+                'b': b,
+                'winner_normal': a if gap_normal[i, j] > 0 else b,
+                'winner_surge': a if gap_surge[i, j] > 0 else b,
+                'gap_normal': round(abs(float(gap_normal[i, j]))),
+                'gap_surge': round(abs(float(gap_surge[i, j]))),
+                'needed_normal': {a: round(float(needed_normal[i, j])), b: round(float(needed_normal[j, i]))},
+                'needed_surge': {a: round(float(needed_surge[i, j])), b: round(float(needed_surge[j, i]))},
+            })
+
+    return {
+        'deadline': format_time(deadline, '%Y-%m-%dT%H:%M:%S+00:00'),
+        'hours_remaining': round(hours_remaining, 1),
+        'window_hours': window_hours,
+        'surge': {'multiplier': surge_multiplier, 'hours': surge_hours},
+        'candidates': candidates,
+        'rates': {
+            f'{w:g}h': {code: round(float(r)) for code, r in zip(codes, row)}
+            for w, row in zip(RATE_WINDOWS, all_rates)
+        },
+        'winner_normal': codes[int(np.argmax(projected_normal))] if codes else None,
+        'winner_surge': codes[int(np.argmax(projected_surge))] if codes else None,
+        'pairs': pairs,
+    }
+
+
+def projection_from_args(args) -> dict:
+    """projection_payload จาก query string: codes, deadline, surge_multiplier, surge_hours, window_hours"""
+    return projection_payload(
+        codes=[c for c in args.get('codes', '').split(',') if c],
+        deadline=parse_time_arg(args['deadline']) if args.get('deadline') else None,
+        surge_multiplier=_float(args, 'surge_multiplier', SURGE_MULTIPLIER),
+        surge_hours=_float(args, 'surge_hours', SURGE_HOURS),
+        window_hours=_float(args, 'window_hours', RATE_WINDOW_HOURS),
+    )
+
+
+# ---------- Monte Carlo ----------
+
+SIMULATION_PATHS = 10000
+MAX_SIMULATION_PATHS = 50000
+MAX_SIMULATION_HOURS = 24 * 7  # จำลองไกลสุด (งานต่อ request = paths x ชั่วโมง)
+SIMULATION_HISTORY_HOURS = 24  # สุ่มจากคะแนนรายชั่วโมงที่เกิดขึ้นจริงในช่วงนี้
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def hourly_gains(history_hours: float | None = SIMULATION_HISTORY_HOURS) -> np.ndarray:
+    """คะแนนที่ได้ต่อชั่วโมงของแต่ละช่วง snapshot (แถวละช่วง, คอลัมน์ละ code)"""
+    if len(engine) < 2:
+        return np.zeros((0, len(engine.codes)))
+
+    start = 1
+    if history_hours:
+        start = max(1, int(np.searchsorted(engine.ts, engine.ts[-1] - history_hours * 3600, side='left')))
+
+    hours = np.diff(engine.ts[start - 1:]) / 3600
+    gains = engine.added[start:]
+    keep = hours > 0
+    return gains[keep] / hours[keep, None]
+
+
+def simulate(gains: np.ndarray, current: np.ndarray, hours: float, paths: int,
+             surge_multiplier: float = 1.0, surge_hours: float = 0.0, seed: int = 0) -> np.ndarray:
+    """
+    จำลองยอดปิดโหวต paths เส้นทาง -> (paths, n_codes)
+    แต่ละชั่วโมงสุ่มทั้งแถวของ gains (คงความสัมพันธ์ระหว่าง code ในชั่วโมงเดียวกัน)
+    ชั่วโมงสุดท้ายที่ไม่เต็มชั่วโมงคิดตามสัดส่วน
+    """
+    rng = np.random.default_rng(seed)
+    totals = np.tile(current.astype(float), (paths, 1))
+    if not len(gains) or hours <= 0:
+        return totals
+
+    n_hours = int(np.ceil(hours))
+    # น้ำหนักของแต่ละชั่วโมง: สัดส่วนชั่วโมง x surge ช่วงท้าย
+    weights = np.ones(n_hours)
+    weights[-1] = hours - (n_hours - 1)
+    hours_left = hours - np.arange(n_hours)
+    weights[hours_left <= surge_hours] *= surge_multiplier
+
+    # สุ่มทีละชั่วโมง (หน่วยความจำ O(paths) ไม่ใช่ paths x ชั่วโมง)
+    for h in range(n_hours):
+        totals += gains[rng.integers(0, len(gains), size=paths)] * weights[h]
+    return totals
+
+
+def simulate_payload(codes: list | None = None, paths: int = SIMULATION_PATHS, hours: float | None = None,
+                     history_hours: float = SIMULATION_HISTORY_HOURS, surge_multiplier: float = 1.0,
+                     surge_hours: float = SURGE_HOURS, seed: int | None = None) -> dict:
+    """
+    Monte Carlo ยอด ณ เวลาปิดโหวต: โอกาสชนะ + ช่วง percentile ของแต่ละ code
+    hours: จำนวนชั่วโมงที่เหลือ (ค่าเริ่มต้นคิดจาก VOTE_DEADLINE, ไม่เกิน MAX_SIMULATION_HOURS)
+    cache ต่อพารามิเตอร์ + version ของข้อมูล (ระบุ seed เอง = คำนวณใหม่ ไม่ cache)
+    """
+    _check_params(hours=hours, history_hours=history_hours, surge_multiplier=surge_multiplier, surge_hours=surge_hours)
+
+    engine.refresh()
+    if hours is None:
+        hours = (parse_time_arg(VOTE_DEADLINE) - now_epoch()) / 3600
+    hours = round(max(0.0, min(hours, MAX_SIMULATION_HOURS)), 2)  # round: ให้ cache ใช้ซ้ำได้ในช่วงเวลาใกล้กัน
+    paths = max(1, min(int(paths), MAX_SIMULATION_PATHS))
+
+    with engine.lock:
+        codes = list(codes) if codes else list(engine.codes)
+        unknown = [c for c in codes if c not in engine.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+        if not len(engine):
+            return {'error': 'ไม่พบไฟล์ข้อมูล'}
+
+        explicit_seed = seed is not None
+        key = f"simulate:{','.join(codes)}:{paths}:{hours}:{history_hours}:{surge_multiplier}:{surge_hours}"
+        if seed is None:
+            # seed จากข้อมูล (เวลาของ snapshot ล่าสุด) + พารามิเตอร์ -> ทุก worker / ทุกครั้งที่ restart ได้ผลเดียวกัน
+            seed = int.from_bytes(hashlib.sha1(f'{key}:{int(engine.ts[-1])}'.encode()).digest()[:8], 'big')
+
+        def compute():
+            cols = [engine.codes.index(c) for c in codes]
+            gains = hourly_gains(history_hours)[:, cols]
+            final = simulate(gains, engine.points[-1, cols], hours, paths,
+                             surge_multiplier, surge_hours, seed)
+
+            winners = np.bincount(final.argmax(axis=1), minlength=len(codes)) / paths
+            bands = np.percentile(final, PERCENTILES, axis=0)
+            return {
+                'codes': codes,
+                'paths': paths,
+                'hours': hours,
+                'samples': len(gains),
+                'surge': {'multiplier': surge_multiplier, 'hours': surge_hours},
+                'win_probability': {c: round(float(p), 4) for c, p in zip(codes, winners)},
+                'mean': {c: round(float(m)) for c, m in zip(codes, final.mean(axis=0))},
+                'percentiles': {
+                    c: {f'p{q}': round(float(v)) for q, v in zip(PERCENTILES, bands[:, j])}
+                    for j, c in enumerate(codes)
+                },
+            }
+
+        if explicit_seed:
+            return compute()  # seed จาก query string ไม่ใช้เป็น key ของ cache
+        return engine.cached(key, compute)
+
+
+def simulate_from_args(args) -> dict:
+    """simulate_payload จาก query string: codes, paths, hours, history_hours, surge_multiplier, surge_hours, seed"""
+    return simulate_payload(
+        codes=[c for c in args.get('codes', '').split(',') if c],
+        paths=int(args.get('paths', SIMULATION_PATHS)),
+        hours=_float(args, 'hours', None) if args.get('hours') else None,
+        history_hours=_float(args, 'history_hours', SIMULATION_HISTORY_HOURS),
+        surge_multiplier=_float(args, 'surge_multiplier', 1.0),
+        surge_hours=_float(args, 'surge_hours', SURGE_HOURS),
+        seed=int(args['seed']) if args.get('seed') else None,
+    )
+
+
+# ---------- What-if grid ----------
+
+WHATIF_ADDED_RATES = (0, 500, 1000, 2000, 5000, 10000)  # คะแนน/ชั่วโมงที่เติมให้ code
+WHATIF_MULTIPLIERS = (1, 2, 5, 10, 50, 100)  # อีกฝ่ายสปริ้นท์ x เท่า
+WHATIF_HOURS = (1, 3, 6, 12, 24)
+MAX_WHATIF_CELLS = 100000
+
+
+def whatif_grid(current: float, rate: float, rival_current: float, rival_rate: float,
+                added_rates: np.ndarray, multipliers: np.ndarray, hours: np.ndarray) -> tuple:
+    """
+    ส่วนต่าง code - rival ของทุกสถานการณ์พร้อมกัน -> (margin, break_even)
+    margin[a, m, h]: เติม added_rates[a] ต่อชั่วโมง, rival x multipliers[m], นาน hours[h]
+    break_even[m, h]: อัตราที่ต้องเติมขั้นต่ำเพื่อชนะ
+    """
+    added = added_rates[:, None, None]
+    mult = multipliers[None, :, None]
+    h = hours[None, None, :]
+
+    margin = (current + (rate + added) * h) - (rival_current + rival_rate * mult * h)
+    break_even = np.maximum(0, (rival_current - current + 1) / h[0] + rival_rate * mult[0] - rate)
+    return margin, break_even
+
+
+def whatif_payload(code: str, rival: str, added_rates=WHATIF_ADDED_RATES, multipliers=WHATIF_MULTIPLIERS,
+                   hours=WHATIF_HOURS, window_hours: float = RATE_WINDOW_HOURS) -> dict:
+    """
+    ตาราง what-if: ถ้าเติมคะแนนให้ code ชั่วโมงละ X และ rival สปริ้นท์ Y เท่า นาน Z ชั่วโมง ใครชนะ
+    ใช้คะแนนล่าสุดและอัตราเฉลี่ย window_hours ชั่วโมง - cache ต่อพารามิเตอร์ + version ของข้อมูล
+    """
+    if not code or not rival:
+        raise ValueError('ต้องระบุ code และ rival')
+    if code == rival:
+        raise ValueError('code และ rival ต้องไม่ซ้ำกัน')
+    added_rates = np.asarray(added_rates, dtype=float)
+    multipliers = np.asarray(multipliers, dtype=float)
+    hours = np.asarray(hours, dtype=float)
+    if not (len(added_rates) and len(multipliers) and len(hours)):
+        raise ValueError('ต้องระบุ rates, multipliers และ hours อย่างน้อยอย่างละค่า')
+    if len(added_rates) * len(multipliers) * len(hours) > MAX_WHATIF_CELLS:
+        raise ValueError(f'ตารางต้องไม่เกิน {MAX_WHATIF_CELLS:,} ช่อง')
+    arrays = {'rates': added_rates, 'multipliers': multipliers, 'hours': hours}
+    bad = [name for name, values in arrays.items() if not np.isfinite(values).all()]
+    if not np.isfinite(window_hours):
+        bad.append('window_hours')
+    if bad:
+        raise ValueError(f"{', '.join(bad)} ต้องเป็นตัวเลข")
+    if (hours <= 0).any():
+        raise ValueError('hours ต้องมากกว่า 0')
+    if window_hours <= 0:
+        raise ValueError('window_hours ต้องมากกว่า 0')
+
+    engine.refresh()
+    with engine.lock:
+        unknown = [c for c in (code, rival) if c not in engine.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+        if not len(engine):
+            return {'error': 'ไม่พบไฟล์ข้อมูล'}
+
+        key = (f"whatif:{code}:{rival}:{window_hours}:{added_rates.tolist()}:"
+               f"{multipliers.tolist()}:{hours.tolist()}")
+
+        def compute():
+            cols = [engine.codes.index(code), engine.codes.index(rival)]
+            current = engine.points[-1, cols]
+            rate = rates_per_hour(window_hours)[cols]
+            margin, break_even = whatif_grid(current[0], rate[0], current[1], rate[1],
+                                             added_rates, multipliers, hours)
+            return {
+                'code': code,
+                'rival': rival,
+                'window_hours': window_hours,
+                'current': {code: round(float(current[0])), rival: round(float(current[1]))},
+                'rate_per_hour': {code: round(float(rate[0])), rival: round(float(rate[1]))},
+                'added_rates': added_rates.tolist(),
+                'multipliers': multipliers.tolist(),
+                'hours': hours.tolist(),
+                'win': (margin > 0).tolist(),
+                'margin': np.round(margin).astype(np.int64).tolist(),
+                'break_even_rate': np.ceil(break_even).astype(np.int64).tolist(),
+            }
+
+        return engine.cached(key, compute)
+
+
+def _floats(value: str | None, default, name: str) -> list:
+    try:
+        return [float(v) for v in value.split(',') if v] if value else list(default)
+    except ValueError:
+        raise ValueError(f'{name} ต้องเป็นตัวเลข') from None
+
+
+def whatif_from_args(args) -> dict:
+    """whatif_payload จาก query string: code, rival, rates, multipliers, hours, window_hours"""
+    return whatif_payload(
+        code=args.get('code', ''),
+        rival=args.get('rival', ''),
+        added_rates=_floats(args.get('rates'), WHATIF_ADDED_RATES, 'rates'),
+        multipliers=_floats(args.get('multipliers'), WHATIF_MULTIPLIERS, 'multipliers'),
+        hours=_floats(args.get('hours'), WHATIF_HOURS, 'hours'),
+        window_hours=_float(args, 'window_hours', RATE_WINDOW_HOURS),
+    )
+
+
+# ---------- Vote packages ----------
+
+OVERTAKE_SCENARIOS = ('now', 'normal', 'surge')
+
+
+def overtake_payload(code: str, rival: str, scenario: str = 'now') -> dict:
+    """
+    แผนซื้อแพ็คที่ถูกที่สุดให้ code ชนะ rival
+    - now:           แซงคะแนนปัจจุบัน (ส่วนต่าง + 1)
+    - normal/surge:  ชนะยอดปิดโหวตที่คาดการณ์ (needed จาก projection_payload)
+    """
+    if scenario not in OVERTAKE_SCENARIOS:
+        raise ValueError(f"scenario ต้องเป็น {', '.join(OVERTAKE_SCENARIOS)}")
+    if not code or not rival:
+        raise ValueError('ต้องระบุ code และ rival')
+    if code == rival:
+        raise ValueError('code และ rival ต้องไม่ซ้ำกัน')
+
+    projection = projection_payload([code, rival])
+    if 'error' in projection:
+        return projection
+
+    candidates = projection['candidates']
+    if scenario == 'now':
+        needed = max(0, candidates[rival]['current'] - candidates[code]['current'] + 1)
+    else:
+        needed = projection['pairs'][0][f'needed_{scenario}'][code]
+
+    return {
+        'code': code,
+        'rival': rival,
+        'scenario': scenario,
+        'gap': candidates[rival]['current'] - candidates[code]['current'],
+        'votes_needed': needed,
+        'plan': plan_votes(needed, exact=False),
+    }
+
+
+def plan_from_args(args) -> dict:
+    """
+    แผนซื้อแพ็คจาก query string
+    - budget=5000,10000          คะแนนมากสุดต่องบ
+    - votes=1234&exact=0         เงินน้อยสุดต่อจำนวนคะแนน (exact=0 ยอมได้เกิน)
+    - overtake=YND06&rival=YND10&scenario=now|normal|surge
+    """
+    if args.get('overtake'):
+        return overtake_payload(args['overtake'], args.get('rival', ''), args.get('scenario', 'now'))
+
+    budgets = [int(b) for b in args.get('budget', '').split(',') if b]
+    votes = [int(v) for v in args.get('votes', '').split(',') if v]
+    return plan_batch(budgets, votes, exact=args.get('exact', '1') != '0')
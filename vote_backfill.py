@@ -0,0 +1,174 @@
+"""
+Vote Backfill - นำเข้าประวัติทุกรูปแบบในโปรเจกต์เข้า VoteStore (SQLite) ครั้งเดียว แบบขนานหลาย process
+
+รูปแบบที่รองรับ:
+- data_yna2025/vote_*.json   snapshot ของ scraper (เต็ม / compact / delta / downsample)
+- data_yna2025/vote_*.csv    code, percentage, names, series (UTF-8 BOM) - เวลาเอาจากชื่อไฟล์
+- data/data_*.json           WebScraper ทั่วไป (content, raw_html) - ดึงข้อมูลกราฟ Chart.js จาก raw_html ใหม่
+
+snapshot เวลาเดียวกันจากหลายแหล่งเก็บครั้งเดียว (JSON > CSV > raw_html)
+ชื่อคู่/ซีรีส์ที่พบอัปเดต candidates.json ของ data_dir ปลายทาง
+
+    python vote_backfill.py data_yna2025 data --db votes.db --workers 4
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from vote_extract import extract_chart_data, extract_couples
+from vote_store import VOTE_DB, CandidateTable, VoteStore, parse_timestamp, snapshot_rows
+
+SOURCE_PATTERNS = ('vote_*.json', 'vote_*.csv', 'data_*.json')
+PRIORITY = {'json': 0, 'csv': 1, 'html': 2}  # เวลาซ้ำกัน -> เก็บแหล่งที่เลขน้อยกว่า
+CHUNK_SIZE = 16  # ไฟล์ต่องานที่ส่งให้ worker
+
+
+def _read_csv(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        summary = [
+            {
+                'code': row['code'],
+                'percentage': float(row['percentage']),
+                'names': row.get('names') or '',
+                'series': row.get('series') or '',
+            }
+            for row in csv.DictReader(f)
+        ]
+    return {'summary': summary}  # ไม่มี timestamp -> ใช้เวลาจากชื่อไฟล์
+
+
+def _from_html(data: dict) -> dict:
+    soup = BeautifulSoup(data.get('raw_html', ''), 'html.parser')
+    chart = extract_chart_data(soup)
+    if not chart['labels'] or not chart['data']:
+        raise ValueError('ไม่พบข้อมูลกราฟใน raw_html')
+    couples = extract_couples(soup)
+    return {
+        'timestamp': data.get('timestamp', ''),
+        'summary': [
+            {'code': code, 'percentage': pct, **couples.get(code, {})}
+            for code, pct in zip(chart['labels'], chart['data'])
+        ],
+    }
+
+
+def load_source(path: str) -> dict:
+    """
+    อ่านไฟล์หนึ่งไฟล์ (รันใน worker) -> {'file', 'kind', 'data'} หรือ {'file', 'kind', 'error'}
+    data อยู่ในรูปเดียวกับ snapshot ของ scraper
+    """
+    path = Path(path)
+    kind = 'csv' if path.suffix == '.csv' else 'json'
+    try:
+        if kind == 'csv':
+            return {'file': str(path), 'kind': kind, 'data': _read_csv(path)}
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if 'raw_html' in data:
+            kind = 'html'
+            data = _from_html(data)
+        return {'file': str(path), 'kind': kind, 'data': data}
+    except Exception as e:
+        return {'file': str(path), 'kind': kind, 'error': str(e)}
+
+
+def find_sources(paths) -> list:
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for pattern in SOURCE_PATTERNS:
+                files.extend(path.glob(pattern))
+        elif path.exists():
+            files.append(path)
+    return sorted(set(files))
+
+
+def _dedupe(sources: list) -> tuple[list, int]:
+    """เก็บ snapshot เดียวต่อเวลา (epoch) -> ([(filename, data)] เรียงตามเวลา, จำนวนที่ซ้ำ)"""
+    best = {}
+    for source in sources:
+        name = Path(source['file']).name
+        ts = parse_timestamp(source['data'].get('timestamp', ''), name)
+        if ts is None:
+            source['error'] = 'ไม่มีเวลาของ snapshot'
+            continue
+        key = (PRIORITY[source['kind']], name)
+        if ts not in best or key < best[ts][0]:
+            best[ts] = (key, name, source['data'])
+    kept = [(name, data) for _, (_, name, data) in sorted(best.items())]
+    valid = sum(1 for s in sources if 'error' not in s)
+    return kept, valid - len(kept)
+
+
+def backfill(paths, store: VoteStore, candidates: CandidateTable | None = None,
+             workers: int | None = None) -> dict:
+    """นำเข้าทุกไฟล์ใน paths -> สถิติ (จำนวนไฟล์, ที่นำเข้า, ซ้ำ, ผิดพลาด, files/sec)"""
+    started = time.perf_counter()
+    files = [str(f) for f in find_sources(paths)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(files) > CHUNK_SIZE:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sources = list(pool.map(load_source, files, chunksize=CHUNK_SIZE))
+    else:
+        sources = [load_source(f) for f in files]
+    parsed = time.perf_counter()
+
+    ok = [s for s in sources if 'error' not in s]
+    snapshots, duplicates = _dedupe(ok)
+    errors = [s for s in sources if 'error' in s]
+
+    if candidates is not None:
+        for name, data in snapshots:
+            candidates.update(data, name)
+    rows = snapshot_rows(snapshots, store.pct_before)
+    added = store.save_rows(rows) if rows else 0
+
+    elapsed = time.perf_counter() - started
+    kinds = {}
+    for source in sources:
+        kinds[source['kind']] = kinds.get(source['kind'], 0) + 1
+    return {
+        'files': len(files),
+        'kinds': kinds,
+        'snapshots': len(rows),
+        'added': added,
+        'existing': len(rows) - added,
+        'duplicates': duplicates,
+        'errors': [{'file': s['file'], 'error': s['error']} for s in errors],
+        'workers': workers,
+        'parse_seconds': round(parsed - started, 3),
+        'seconds': round(elapsed, 3),
+        'files_per_second': round(len(files) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vote Backfill - นำเข้าประวัติ JSON / CSV / raw_html เข้า SQLite')
+    parser.add_argument('paths', nargs='*', default=['data_yna2025', 'data'], help='ไฟล์หรือโฟลเดอร์')
+    parser.add_argument('--db', default=VOTE_DB or 'votes.db', help='ไฟล์ฐานข้อมูล (default: VOTE_DB หรือ votes.db)')
+    parser.add_argument('--workers', type=int, default=None, help='จำนวน process (default: จำนวน CPU)')
+    parser.add_argument('--candidates', default='data_yna2025', help='data_dir ของ candidates.json (ว่าง = ไม่อัปเดต)')
+    args = parser.parse_args()
+
+    candidates = CandidateTable(args.candidates) if args.candidates else None
+    stats = backfill(args.paths, VoteStore(args.db), candidates, args.workers)
+
+    kinds = ', '.join(f'{kind} {count}' for kind, count in sorted(stats['kinds'].items()))
+    print(f"📂 {stats['files']} ไฟล์ ({kinds}) - {stats['workers']} process")
+    print(f"✅ นำเข้า {stats['added']} snapshot -> {args.db} "
+          f"(มีอยู่แล้ว {stats['existing']}, ซ้ำเวลา {stats['duplicates']})")
+    for error in stats['errors']:
+        print(f"⚠️ {error['file']}: {error['error']}")
+    print(f"⏱️ {stats['seconds']}s ({stats['files_per_second']} files/sec, อ่านไฟล์ {stats['parse_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
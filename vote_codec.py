@@ -0,0 +1,230 @@
+"""
+Vote Codec - บีบอัด time series ของ % แบบ Gorilla (Facebook TSDB) สำหรับ segment รายวัน
+
+- เวลา: delta-of-delta (scrape ทุกชั่วโมง -> ส่วนต่างของส่วนต่างเป็นแค่ไม่กี่วินาที)
+- ค่า %: XOR กับค่าก่อนหน้าของ code เดียวกัน (ค่าไม่เปลี่ยน = 1 bit, เปลี่ยนเล็กน้อย = เฉพาะ bit ที่ต่างกัน)
+  ถอดกลับได้ตรงทุก bit (ไม่ปัดเศษ)
+
+รูปแบบไฟล์: block ต่อกันได้หลาย block
+    b'VGB1' | header length (uint32) | payload length (uint32) | header JSON | payload (bitstream)
+header: {'rows', 'codes', 'filenames', 'gain'}
+payload: คอลัมน์ ts แล้วตามด้วย % ของแต่ละ code (และ gain ของแต่ละ code ถ้ามี) ทีละคอลัมน์
+"""
+
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'VGB1'
+PREFIX = struct.Struct('<4sII')
+
+# delta-of-delta: (prefix, bits ของ prefix, bits ของค่า) - ค่าเก็บแบบ offset ให้เป็นบวก
+TS_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+TS_FALLBACK = (0b1111, 4, 64)
+MASK64 = (1 << 64) - 1
+
+
+class BitWriter:
+    def __init__(self):
+        self.buf = bytearray()
+        self._acc = 0
+        self._n = 0
+
+    def write(self, value: int, nbits: int):
+        self._acc = (self._acc << nbits) | value
+        self._n += nbits
+        while self._n >= 8:
+            self._n -= 8
+            self.buf.append((self._acc >> self._n) & 0xFF)
+        self._acc &= (1 << self._n) - 1
+
+    def getvalue(self) -> bytes:
+        if self._n:
+            self.buf.append((self._acc << (8 - self._n)) & 0xFF)
+            self._acc = self._n = 0
+        return bytes(self.buf)
+
+
+class BitReader:
+    def __init__(self, data: bytes):
+        self.data = data + bytes(8)  # อ่านเลยท้ายได้โดยไม่ต้องตรวจขอบ
+        self.pos = 0
+
+    def read(self, nbits: int) -> int:
+        start = self.pos >> 3
+        end = (self.pos + nbits + 7) >> 3
+        chunk = int.from_bytes(self.data[start:end], 'big')
+        self.pos += nbits
+        return (chunk >> ((end << 3) - self.pos)) & ((1 << nbits) - 1)
+
+    def bit(self) -> int:
+        pos = self.pos
+        self.pos = pos + 1
+        return (self.data[pos >> 3] >> (7 - (pos & 7))) & 1
+
+
+# ---------- คอลัมน์ ----------
+
+def _write_ts(w: BitWriter, ts: list):
+    prev, prev_delta = 0, 0
+    for t in ts:
+        delta = t - prev
+        dod = delta - prev_delta
+        prev, prev_delta = t, delta
+        if dod == 0:
+            w.write(0, 1)
+            continue
+        for prefix, plen, nbits in TS_BUCKETS:
+            half = 1 << (nbits - 1)
+            if -half < dod <= half:
+                w.write(prefix, plen)
+                w.write(dod + half - 1, nbits)
+                break
+        else:
+            prefix, plen, nbits = TS_FALLBACK
+            w.write(prefix, plen)
+            w.write(dod & MASK64, nbits)
+
+
+def _read_ts(r: BitReader, n: int) -> np.ndarray:
+    out = []
+    prev, prev_delta = 0, 0
+    for _ in range(n):
+        if not r.bit():
+            dod = 0
+        elif not r.bit():
+            dod = r.read(7) - 63
+        elif not r.bit():
+            dod = r.read(9) - 255
+        elif not r.bit():
+            dod = r.read(12) - 2047
+        else:
+            dod = r.read(64)
+            dod -= (dod >> 63) << 64  # two's complement
+        prev_delta += dod
+        prev += prev_delta
+        out.append(prev)
+    return np.array(out, dtype=np.int64)
+
+
+def _write_values(w: BitWriter, values: np.ndarray):
+    bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64).tolist()
+    if not bits:
+        return
+    prev = bits[0]
+    w.write(prev, 64)
+    lead, trail = -1, -1  # ยังไม่มีช่วง bit ก่อนหน้า
+    for v in bits[1:]:
+        x = v ^ prev
+        prev = v
+        if not x:
+            w.write(0, 1)
+            continue
+        x_lead = min(64 - x.bit_length(), 31)
+        x_trail = (x & -x).bit_length() - 1
+        if lead >= 0 and x_lead >= lead and x_trail >= trail:
+            # อยู่ในช่วง bit เดียวกับค่าก่อนหน้า -> ไม่ต้องเก็บความยาวซ้ำ
+            w.write(0b10, 2)
+            w.write(x >> trail, 64 - lead - trail)
+        else:
+            lead, trail = x_lead, x_trail
+            size = 64 - lead - trail
+            w.write(0b11, 2)
+            w.write(lead, 5)
+            w.write(size - 1, 6)
+            w.write(x >> trail, size)
+
+
+def _read_values(r: BitReader, n: int) -> np.ndarray:
+    if not n:
+        return np.empty(0)
+    prev = r.read(64)
+    out = [prev]
+    lead = trail = size = 0
+    for _ in range(n - 1):
+        if r.bit():
+            if r.bit():
+                lead = r.read(5)
+                size = r.read(6) + 1
+                trail = 64 - lead - size
+            prev ^= r.read(size) << trail
+        out.append(prev)
+    return np.array(out, dtype=np.uint64).view(np.float64)
+
+
+# ---------- block ----------
+
+def encode_block(ts, codes: list, filenames: list, pct, gain=None) -> bytes:
+    """
+    ts (n,), pct (n, n_codes), gain (n, n_codes) หรือ None -> bytes ของหนึ่ง block
+    gain: NaN = snapshot ดิบ (คำนวณจากส่วนต่าง)
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    pct = np.asarray(pct, dtype=np.float64).reshape(len(ts), len(codes))
+    if len(filenames) != len(ts):
+        raise ValueError('จำนวน filenames ไม่เท่ากับจำนวนแถว')
+
+    w = BitWriter()
+    _write_ts(w, ts.tolist())
+    for j in range(len(codes)):
+        _write_values(w, pct[:, j])
+    if gain is not None:
+        gain = np.asarray(gain, dtype=np.float64).reshape(pct.shape)
+        for j in range(len(codes)):
+            _write_values(w, gain[:, j])
+    payload = w.getvalue()
+
+    header = json.dumps({
+        'rows': len(ts),
+        'codes': list(codes),
+        'filenames': list(filenames),
+        'gain': gain is not None,
+    }, ensure_ascii=False).encode('utf-8')
+    return PREFIX.pack(MAGIC, len(header), len(payload)) + header + payload
+
+
+def _decode(header: dict, payload: bytes) -> dict:
+    n, codes = header['rows'], header['codes']
+    r = BitReader(payload)
+    ts = _read_ts(r, n)
+    pct = np.column_stack([_read_values(r, n) for _ in codes]) if codes else np.empty((n, 0))
+    gain = None
+    if header['gain']:
+        gain = np.column_stack([_read_values(r, n) for _ in codes]) if codes else np.empty((n, 0))
+    return {'ts': ts, 'codes': codes, 'filenames': header['filenames'], 'pct': pct, 'gain': gain}
+
+
+def iter_blocks(f):
+    """
+    อ่านทีละ block จากไฟล์ (streaming) -> dict: ts, codes, filenames, pct, gain (ndarray หรือ None)
+    ValueError ถ้าไฟล์ไม่ใช่รูปแบบนี้หรือถูกตัดกลางคัน
+    """
+    while True:
+        prefix = f.read(PREFIX.size)
+        if not prefix:
+            return
+        if len(prefix) < PREFIX.size:
+            raise ValueError('block ไม่ครบ')
+        magic, header_len, payload_len = PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError('ไม่ใช่ไฟล์ VGB1')
+        header = f.read(header_len)
+        payload = f.read(payload_len)
+        if len(header) < header_len or len(payload) < payload_len:
+            raise ValueError('block ไม่ครบ')
+        yield _decode(json.loads(header.decode('utf-8')), payload)
+
+
+def decode_block(data: bytes) -> dict:
+    """bytes ของ block เดียว -> dict แบบเดียวกับ iter_blocks"""
+    magic, header_len, payload_len = PREFIX.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('ไม่ใช่ไฟล์ VGB1')
+    start = PREFIX.size + header_len
+    header = json.loads(data[PREFIX.size:start].decode('utf-8'))
+    return _decode(header, data[start:start + payload_len])
@@ -0,0 +1,235 @@
+"""
+Vote Detectors - ตัวตรวจจับแบบ streaming ที่รับ snapshot ใหม่ทีละแถวจาก engine (ไม่ย้อนอ่านประวัติ)
+
+SurgeDetector - การเร่งโหวต (อัตราคะแนนกระโดด) เก็บสถานะคงที่ต่อ code:
+- EWMA ของอัตราคะแนน/ชั่วโมง และ variance -> z-score ของ snapshot ล่าสุด
+- CUSUM ด้านบวกของ z-score: สะสมจนเกิน threshold = surge แล้วเริ่มนับใหม่
+เหตุการณ์เก็บใน ring buffer ขนาดคงที่ - id มาจากข้อมูล ('<ts>:<code>') จึงเหมือนกันทุก worker
+
+RankIndex - ดัชนีการแซงกัน (ส่วนต่างของคู่ใดๆ เปลี่ยนเครื่องหมาย) และการเปลี่ยนผู้นำ
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+
+import numpy as np
+
+from vote_engine import engine, format_time, parse_time_arg
+
+EWMA_ALPHA = 0.2  # น้ำหนักของ snapshot ล่าสุด
+CUSUM_SLACK = 0.5  # z-score ที่ยอมให้สูงกว่าค่าปกติได้ก่อนเริ่มสะสม
+CUSUM_THRESHOLD = 4.0  # สะสมเกินเท่านี้ = surge
+WARMUP_SNAPSHOTS = 6  # ไม่แจ้ง surge จนกว่าจะเห็นข้อมูลครบเท่านี้
+MIN_STD = 50.0  # คะแนน/ชั่วโมง - กัน z-score พุ่งเมื่อช่วงก่อนหน้าแทบไม่มีคนโหวต
+EVENT_LOG_SIZE = 200
+
+
+class SurgeDetector:
+    """EWMA z-score + CUSUM ของอัตราคะแนนต่อชั่วโมง (ทุก code พร้อมกัน)"""
+
+    def __init__(self, alpha: float = EWMA_ALPHA, slack: float = CUSUM_SLACK,
+                 threshold: float = CUSUM_THRESHOLD, warmup: int = WARMUP_SNAPSHOTS,
+                 log_size: int = EVENT_LOG_SIZE):
+        self.alpha = alpha
+        self.slack = slack
+        self.threshold = threshold
+        self.warmup = warmup
+        self.events = deque(maxlen=log_size)
+        self.reset([])
+
+    def reset(self, codes: list):
+        """เริ่มใหม่ (engine คำนวณประวัติใหม่ทั้งหมดแล้วจะส่งข้อมูลมาอีกครั้ง)"""
+        n = len(codes)
+        self.codes = list(codes)
+        self.mean = np.zeros(n)
+        self.var = np.zeros(n)
+        self.cusum = np.zeros(n)
+        self.rate = np.zeros(n)
+        self.z = np.zeros(n)
+        self.surging = np.zeros(n, dtype=bool)
+        self.count = 0
+        self.last_ts = None
+        self._pending = np.zeros(n)  # คะแนนของ snapshot ที่เวลาซ้ำกัน รอรวมกับแถวถัดไป
+        self.events.clear()
+
+    def update(self, ts: np.ndarray, added: np.ndarray):
+        """รับ snapshot ใหม่ตามลำดับเวลา"""
+        for t, row in zip(ts.tolist(), added):
+            if self.last_ts is None:
+                # snapshot แรกไม่มีช่วงก่อนหน้า (added = ยอดทั้งหมด)
+                self.last_ts = t
+                continue
+            if t <= self.last_ts:
+                self._pending += row
+                continue
+
+            self._step(t, (row + self._pending) / ((t - self.last_ts) / 3600))
+            self._pending[:] = 0
+            self.last_ts = t
+
+    def _step(self, t: int, rate: np.ndarray):
+        std = np.maximum(np.sqrt(self.var), MIN_STD)
+        z = (rate - self.mean) / std if self.count else np.zeros_like(rate)
+
+        if self.count >= self.warmup:
+            self.cusum = np.maximum(0.0, self.cusum + z - self.slack)
+            self.surging = self.cusum > self.threshold
+            for j in np.flatnonzero(self.surging):
+                self._emit(t, j, rate[j], z[j])
+            self.cusum[self.surging] = 0.0
+
+        # EWMA mean / variance
+        diff = rate - self.mean if self.count else np.zeros_like(rate)
+        self.mean = self.mean + self.alpha * diff if self.count else rate.astype(float)
+        self.var = (1 - self.alpha) * (self.var + self.alpha * diff ** 2)
+        self.rate = rate
+        self.z = z
+        self.count += 1
+
+    def _emit(self, t: int, j: int, rate: float, z: float):
+        self.events.append({
+            'id': f'{t}:{self.codes[j]}',
+            'ts': t,
+            'time': format_time(t),
+            'code': self.codes[j],
+            'rate_per_hour': round(float(rate)),
+            'baseline_per_hour': round(float(self.mean[j])),
+            'z': round(float(z), 2),
+        })
+
+    def state(self) -> dict:
+        return {
+            code: {
+                'rate_per_hour': round(float(self.rate[j])),
+                'baseline_per_hour': round(float(self.mean[j])),
+                'z': round(float(self.z[j]), 2),
+                'cusum': round(float(self.cusum[j]), 2),
+                'surging': bool(self.surging[j]),
+            }
+            for j, code in enumerate(self.codes)
+        }
+
+
+class RankIndex:
+    """
+    เหตุการณ์แซงกันของทุกคู่ code: เก็บเฉพาะคะแนนสะสมแถวล่าสุด
+    แต่ละ snapshot เทียบส่วนต่างทุกคู่กับแถวก่อนหน้า (n_codes x n_codes)
+    """
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, codes: list):
+        self.codes = list(codes)
+        self.points = None
+        self.events = []
+        self.ts = []  # ts ของแต่ละ event (เรียงตามเวลา) ใช้ค้นหาช่วงเวลา
+
+    def update(self, ts: np.ndarray, added: np.ndarray):
+        for t, row in zip(ts.tolist(), added):
+            if self.points is None:
+                # snapshot แรก: ยังไม่มีลำดับก่อนหน้าให้เทียบ
+                self.points = row.astype(float)
+                continue
+
+            prev = self.points
+            points = prev + row  # ลำดับการบวกเดียวกับ engine.points
+            before = prev[:, None] - prev[None, :]
+            after = points[:, None] - points[None, :]
+            # [i, j]: i แซง j ใน snapshot นี้
+            crossed = (before <= 0) & (after > 0)
+            if crossed.any():
+                self._record(t, prev, points, crossed)
+            self.points = points
+
+    def _record(self, t: int, prev: np.ndarray, points: np.ndarray, crossed: np.ndarray):
+        rank_before = 1 + (prev[None, :] > prev[:, None]).sum(axis=1)
+        rank_after = 1 + (points[None, :] > points[:, None]).sum(axis=1)
+        leader_before = int(np.argmax(prev))
+        leader_after = int(np.argmax(points))
+
+        for i, j in zip(*np.nonzero(crossed)):
+            self.ts.append(t)
+            self.events.append({
+                'ts': t,
+                'time': format_time(t),
+                'code': self.codes[i],
+                'overtook': self.codes[j],
+                'gap': round(float(points[i] - points[j])),
+                'rank_before': int(rank_before[i]),
+                'rank_after': int(rank_after[i]),
+                'lead_change': bool(j == leader_before and i == leader_after and i != j),
+            })
+
+
+# Global detectors - รับข้อมูลจาก engine ตั้งแต่ import
+detector = SurgeDetector()
+engine.subscribe(detector)
+rank_index = RankIndex()
+engine.subscribe(rank_index)
+
+
+def surges_payload(codes: list | None = None, since: int = 0) -> dict:
+    """
+    เหตุการณ์ surge ที่ ts > since (กรองตาม code ได้) + สถานะปัจจุบันของแต่ละ code
+    last_ts = ts ของเหตุการณ์ล่าสุด (ส่งกลับมาเป็น since รอบถัดไป ได้ผลเดียวกันไม่ว่าจะถึง worker ไหน)
+    """
+    engine.refresh()
+    with engine.lock:
+        codes = list(codes) if codes else list(detector.codes)
+        unknown = [c for c in codes if c not in detector.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+
+        state = detector.state()
+        return {
+            'last_ts': detector.events[-1]['ts'] if detector.events else 0,
+            'events': [e for e in detector.events if e['ts'] > since and e['code'] in codes],
+            'state': {code: state[code] for code in codes},
+        }
+
+
+def surges_from_args(args) -> dict:
+    """surges_payload จาก query string: codes, since (epoch หรือ ISO)"""
+    return surges_payload(
+        codes=[c for c in args.get('codes', '').split(',') if c],
+        since=parse_time_arg(args['since']) if args.get('since') else 0,
+    )
+
+
+def events_payload(codes: list | None = None, start: int | None = None, stop: int | None = None,
+                   lead_only: bool = False) -> dict:
+    """
+    เหตุการณ์แซงกันในช่วง start <= ts <= stop (binary search บน ts ของ event)
+    codes: เฉพาะคู่ที่ทั้งสองฝ่ายอยู่ใน codes (ถ้าระบุ code เดียว = ทุกเหตุการณ์ที่เกี่ยวกับ code นั้น)
+    lead_only: เฉพาะการเปลี่ยนผู้นำ
+    """
+    engine.refresh()
+    with engine.lock:
+        codes = list(codes) if codes else []
+        unknown = [c for c in codes if c not in rank_index.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+
+        lo = 0 if start is None else bisect_left(rank_index.ts, start)
+        hi = len(rank_index.ts) if stop is None else bisect_right(rank_index.ts, stop)
+        events = rank_index.events[lo:hi]
+
+    if lead_only:
+        events = [e for e in events if e['lead_change']]
+    if len(codes) == 1:
+        events = [e for e in events if codes[0] in (e['code'], e['overtook'])]
+    elif codes:
+        events = [e for e in events if e['code'] in codes and e['overtook'] in codes]
+
+    return {'count': len(events), 'events': events}
+
+
+def events_from_args(args) -> dict:
+    """events_payload จาก query string: codes, from, to (epoch หรือ ISO), lead=1"""
+    return events_payload(
+        codes=[c for c in args.get('codes', '').split(',') if c],
+        start=parse_time_arg(args['from']) if args.get('from') else None,
+        stop=parse_time_arg(args['to']) if args.get('to') else None,
+        lead_only=args.get('lead', '0') == '1',
+    )
@@ -0,0 +1,689 @@
+"""
+Vote Engine - โหลด snapshot ผลโหวตครั้งเดียวแล้วเก็บเป็น array เรียงตามเวลาในหน่วยความจำ
+ใช้ร่วมกันระหว่าง dashboard.py และ dashboard_two.py
+
+สูตร Cumulative Gain Only: นับเฉพาะ % ที่เพิ่มขึ้นเป็นคะแนนสะสม
+1% = 1000 คะแนน = 4000 บาท
+snapshot ที่ถูก downsample (vote_segments retain) มี gain = % ที่เพิ่มขึ้นรวมของช่วงที่ถูกตัด ใช้แทนส่วนต่าง
+
+สถานะที่คำนวณแล้วบันทึกเป็นไฟล์ .npy (STATE_DIR) ทุกครั้งที่มีข้อมูลใหม่
+worker ที่เพิ่งเริ่มจะ memory-map ไฟล์นั้นแทนการอ่าน JSON ทั้งหมดใหม่
+หลาย worker ใช้ array ชุดเดียวกันผ่าน shared memory (vote_shared) - คำนวณครั้งเดียวต่อ snapshot
+ถ้าตั้ง VOTE_DB จะอ่าน snapshot จาก SQLite (vote_store) แทนการเปิดไฟล์ JSON ทีละไฟล์
+วันที่ compact แล้ว (vote_segments) อ่านจาก segment รายวันรวมกับไฟล์ที่ยังไม่ compact
+ไฟล์/segment ที่อ่านไม่ได้เข้า quarantine (vote_quarantine) และไม่ถูกอ่านซ้ำจนกว่าไฟล์จะเปลี่ยน
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from vote_quarantine import QUARANTINE_FILE, Quarantine
+from vote_segments import SegmentStore
+from vote_shared import SHARED_ARRAYS, SharedState
+from vote_store import LATEST_FILE, VoteStore, dense_snapshot, read_latest, snapshot_rows
+
+DATA_DIR = Path('data_yna2025')
+
+# warm-start state (อยู่นอก DATA_DIR เพราะ DATA_DIR ถูก git push)
+# ENGINE_STATE_DIR= (ค่าว่าง) = ปิด warm-start
+_STATE_DIR = os.environ.get('ENGINE_STATE_DIR', '.engine_state').strip()
+STATE_DIR = Path(_STATE_DIR) if _STATE_DIR else None
+STATE_FORMAT = 1
+STATE_ARRAYS = ('ts', 'pct', 'added', 'points')
+
+# แชร์ array ระหว่าง worker (ENGINE_SHARED_MEMORY=0 เพื่อปิด)
+SHARED_MEMORY = os.environ.get('ENGINE_SHARED_MEMORY', '1') != '0'
+
+# latest.json ไม่ขยับ -> ใช้รายชื่อไฟล์เดิม แต่ยัง glob ทั้งโฟลเดอร์อย่างน้อยทุกกี่วินาที
+# (ไฟล์ที่มาทางอื่นโดยไม่อัปเดต pointer เช่น git pull)
+RESCAN_SECONDS = float(os.environ.get('ENGINE_RESCAN_SECONDS', 60))
+
+# อัตราแปลง
+POINTS_PER_PERCENT = 1000  # 1% = 1000 คะแนน
+BAHT_PER_POINT = 4  # 1 คะแนน = 4 บาท
+BASE_TOTAL_VOTES = 100000  # ฐานคะแนนสำหรับแปลง % เป็นโหวต
+
+SECONDS_PER_DAY = 86400
+
+# ผลคำนวณที่ cache ไว้สูงสุดต่อ worker (LRU - key มีค่าจาก query string)
+CACHE_SIZE = 256
+
+# field ที่ query ได้ (ต่อ code)
+QUERY_FIELDS = ('pct', 'points', 'added', 'money')
+
+# ตำแหน่งของแต่ละ field ในข้อความ ISO 'YYYY-MM-DDTHH:MM:SS' (สำหรับ format_times)
+ISO_FIELDS = {'Y': range(0, 4), 'm': range(5, 7), 'd': range(8, 10), 'H': range(11, 13), 'M': range(14, 16), 'S': range(17, 19)}
+
+
+def format_time(ts: int, fmt: str = '%d/%m %H:%M') -> str:
+    """แปลง epoch กลับเป็นข้อความสำหรับแสดงผล"""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime(fmt)
+
+
+def format_times(ts, fmt: str = '%d/%m %H:%M') -> list:
+    """
+    format_time ของทั้ง array ในครั้งเดียว (ใช้เฉพาะกับแถวที่จะส่งกลับ)
+    numpy แปลง epoch เป็น ISO ทั้งชุด แล้วเลือกคอลัมน์ตัวอักษรตาม fmt (รองรับ %Y %m %d %H %M %S)
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    index, literal = [], {}
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == '%' and fmt[i + 1:i + 2] in ISO_FIELDS:
+            index.extend(ISO_FIELDS[fmt[i + 1]])
+            i += 2
+        elif fmt[i] != '%' and fmt[i].isascii():
+            literal[len(index)] = ord(fmt[i])
+            index.append(0)
+            i += 1
+        else:
+            return [format_time(t, fmt) for t in ts.tolist()]  # directive อื่น -> ทีละค่า
+    if not len(ts):
+        return []
+
+    iso = np.datetime_as_string(ts.astype('datetime64[s]'), unit='s').astype('S19')
+    out = iso.view(np.uint8).reshape(len(ts), 19)[:, index]
+    for col, char in literal.items():
+        out[:, col] = char
+    return np.ascontiguousarray(out).view(f'S{len(index)}').ravel().astype(str).tolist()
+
+
+def now_epoch() -> int:
+    """เวลาปัจจุบัน (epoch จริง ไม่ขึ้นกับ timezone ของเครื่อง)"""
+    return int(time.time())
+
+
+def parse_time_arg(value: str) -> int:
+    """
+    เวลาจาก query string: epoch (ตัวเลข) หรือ ISO เช่น 2026-01-08T02:00 / 2026-01-09T12:00:00+07:00
+    ISO ที่ไม่มี offset ถือเป็น UTC (แบบเดียวกับ parse_timestamp) ที่มี offset แปลงตาม offset นั้น
+    """
+    if value.lstrip('-').isdigit():
+        return int(value)
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.astimezone(timezone.utc).timestamp())
+
+
+def parse_date(date: str) -> int:
+    """แปลง YYYY-MM-DD เป็นเลขวัน (epoch // 86400) - ValueError ถ้ารูปแบบผิด"""
+    dt = datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return int(dt.timestamp()) // SECONDS_PER_DAY
+
+
+def read_snapshot(path: Path) -> dict:
+    """อ่านไฟล์ vote_*.json หนึ่งไฟล์ (ข้อมูลดิบ - อาจเป็น delta)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class VoteEngine:
+    """
+    ประวัติผลโหวตทั้งหมดในรูป array:
+    - ts:       epoch ของแต่ละ snapshot (int64, เรียงจากเก่าไปใหม่) ใช้เป็น index สำหรับค้นหาด้วยเวลา
+    - pct:      % ของแต่ละ code (n_snapshots x n_codes)
+    - added:    คะแนนที่เพิ่มขึ้นใน snapshot นั้น
+    - points:   คะแนนสะสม
+    - totals:   คะแนนสะสมรวมทุก code
+    อ่านเฉพาะไฟล์ใหม่ทุกครั้งที่ refresh ข้อมูลวันที่ปิดแล้วเก็บเป็น partition ถาวร
+    ตัวรับข้อมูลแบบ streaming (subscribe) ได้รับเฉพาะ snapshot ใหม่
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, state_dir: Path | None = STATE_DIR,
+                 shared: bool = SHARED_MEMORY, store: VoteStore | None = None):
+        self.data_dir = Path(data_dir)
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.store = store
+        self.segments = SegmentStore(self.data_dir)
+        self.quarantine = Quarantine(self.state_dir / QUARANTINE_FILE if self.state_dir else None)
+        self._store_cursor = 0  # id ของ snapshot ล่าสุดใน DB ที่อ่านแล้ว
+        self.lock = threading.RLock()
+        self.version = 0
+        self._cache = OrderedDict()  # name -> (version, value)
+        self._cache_version = None
+        self._listeners = []
+        self._started = False
+        self._generation = 0
+        self._rejected = 0  # generation ที่ไม่ตรงกับไฟล์ชุดปัจจุบัน (ไม่ต้องตรวจซ้ำ)
+        self._files = []  # ผล glob ล่าสุด
+        self._pointer = None  # (mtime_ns, size) ของ latest.json ตอน glob ล่าสุด
+        self._scanned = 0.0  # time.monotonic() ตอน glob ล่าสุด
+        self.shared = None
+        if shared:
+            try:
+                self.shared = SharedState(self.data_dir, self.state_dir)
+            except OSError:
+                self.shared = None  # ไม่มี shared memory -> แต่ละ worker คำนวณเอง
+        self._reset()
+
+    def _reset(self):
+        self._seen = set()
+        self.codes = []
+        self.filenames = []
+        self.ts = np.empty(0, dtype=np.int64)
+        self.pct = np.empty((0, 0))
+        self.added = np.empty((0, 0))
+        self.points = np.empty((0, 0))
+        self.totals = np.empty(0)
+        self._partitions = {}
+
+    def __len__(self):
+        return len(self.ts)
+
+    def refresh(self) -> int:
+        """อ่านไฟล์ snapshot ใหม่ (ถ้ามี) แล้วคืนเลข version ของข้อมูล"""
+        with self.lock:
+            files = self._scan()
+            if self.shared is None:
+                self._refresh_files(files)
+                return self.version
+
+            try:
+                # ใช้ข้อมูลที่ worker อื่น publish แล้ว - คำนวณเองเฉพาะเมื่อยังมีไฟล์ใหม่เหลืออยู่
+                self._adopt_shared(files)
+                if self._has_new(files):
+                    with self.shared.owner():
+                        self._adopt_shared(files)
+                        if self._refresh_files(files):
+                            self.shared.publish(self.codes, self.filenames,
+                                                {name: getattr(self, name) for name in SHARED_ARRAYS})
+                            self._adopt_shared(files)
+            except OSError:
+                self.shared = None
+                self._refresh_files(files)
+            return self.version
+
+    def _scan(self) -> list:
+        """
+        รายชื่อไฟล์ snapshot - glob ใหม่เฉพาะเมื่อ latest.json เปลี่ยน (ชื่อไฟล์ใหม่ = mtime ใหม่)
+        ไม่มี latest.json หรือครบ RESCAN_SECONDS -> glob ทุกครั้งตามเดิม
+        """
+        try:
+            st = (self.data_dir / LATEST_FILE).stat()
+            pointer = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pointer = None
+        now = time.monotonic()
+        if pointer is None or pointer != self._pointer or now - self._scanned >= RESCAN_SECONDS:
+            self._files = sorted(self.data_dir.glob('vote_*.json'))
+            self._pointer = pointer
+            self._scanned = now
+        return self._files
+
+    def _refresh_files(self, files: list) -> bool:
+        """อ่านไฟล์ที่ยังไม่เคยอ่าน -> True ถ้ามีข้อมูลใหม่"""
+        loaded = False
+        if not self._started:
+            self._started = True
+            loaded = self.load_state(self._available(files))
+            if loaded:
+                self.version += 1
+
+        rows = self._read_store(files) if self.store else self._read_files(files)
+
+        if rows:
+            self._ingest(rows)
+            self.version += 1
+            self.save_state()
+        return loaded or bool(rows)
+
+    def _available(self, files: list) -> set:
+        """ชื่อ snapshot ที่มีอยู่ตอนนี้ (ไฟล์เดี่ยว + segment + DB)"""
+        available = {f.name for f in files} | self._segment_names()
+        if self.store:
+            available |= self.store.filenames()
+        return available
+
+    def _has_new(self, files: list) -> bool:
+        if self._unseen(files) or self._segment_names() - self._seen:
+            return True
+        return bool(self.store) and self.store.last_id() > self._store_cursor
+
+    def _unseen(self, files: list) -> list:
+        """ไฟล์ที่ยังไม่เคยอ่าน (ไม่นับไฟล์ใน quarantine ที่ยังไม่เปลี่ยน)"""
+        return [f for f in files if f.name not in self._seen and not self.quarantine.skip(f)]
+
+    def _segment_names(self) -> set:
+        try:
+            names = self.segments.filenames()
+            bad = {segment for segment in self.segments.index() if self.quarantine.skip(self.segments.dir / segment)}
+        except (OSError, ValueError, KeyError):
+            return set()  # index เสีย -> ใช้เฉพาะไฟล์เดี่ยว
+        if bad:
+            names = {name for name in names if self.segments.segment_of(name) not in bad}
+        return names
+
+    def _segment_rows(self, skip: set) -> list:
+        """snapshot ใน segment ที่ยังไม่เคยอ่าน -> [(epoch, filename, {code: pct}, gain)]"""
+        names = self._segment_names()
+        if not names - skip:
+            return []
+        return self.segments.rows(
+            skip | (self.segments.filenames() - names),  # segment ใน quarantine
+            on_error=lambda segment, e: self.quarantine.add(self.segments.dir / segment, e),
+        )
+
+    def _read_files(self, files: list) -> list:
+        rows = self._segment_rows(self._seen)
+        snapshots = []
+        paths = {}
+        for file in self._unseen(files):
+            try:
+                snapshots.append((file.name, read_snapshot(file)))
+                paths[file.name] = file
+            except Exception as e:
+                self.quarantine.add(file, e)
+        # snapshot แบบ delta เติมค่าจากแถวก่อนหน้า (ใน engine หรือจาก segment ในชุดเดียวกัน)
+        rows += snapshot_rows(snapshots, lambda ts: self._pct_before(ts, rows))
+        for name in paths.keys() - {r[1] for r in rows}:
+            self.quarantine.add(paths[name], 'ไม่มีเวลาของ snapshot')
+        self._seen.update(r[1] for r in rows)
+        return rows
+
+    def _pct_before(self, ts: int, rows: list = ()) -> dict:
+        """% ของ snapshot ล่าสุดที่เก่ากว่า ts จาก engine หรือ rows ที่ยังไม่ได้ ingest"""
+        i = self.index_at(ts - 1)
+        best = (int(self.ts[i]), dict(zip(self.codes, self.pct[i].tolist()))) if i is not None else None
+        for row in rows:
+            if row[0] < ts and (best is None or row[0] >= best[0]):
+                best = (row[0], row[2])
+        return best[1] if best else {}
+
+    def _read_store(self, files: list) -> list:
+        """นำเข้าไฟล์ JSON ที่ยังไม่อยู่ใน DB แล้วอ่าน snapshot ใหม่จาก DB"""
+        self.store.import_files(self._unseen(files), on_error=self.quarantine.add)
+        rows = self._segment_rows(self._seen | self.store.filenames())
+        if rows:
+            self.store.save_rows(rows)
+        self._store_cursor, rows = self.store.rows_since(self._store_cursor)
+        rows = [r for r in rows if r[1] not in self._seen]
+        self._seen.update(r[1] for r in rows)
+        # ชื่อที่ DB รับรู้แต่ไม่บันทึก (เวลาซ้ำกับ snapshot อื่น) -> ถือว่าอ่านแล้ว ไม่งั้น _has_new เป็นจริงทุก request
+        self._seen.update(self.store.filenames())
+        return rows
+
+    def _adopt_shared(self, files: list):
+        """
+        สลับไปใช้ array ของ generation ล่าสุดใน shared memory (ส่งเฉพาะแถวใหม่ให้ listener)
+        ไม่ใช้ถ้ามี snapshot ที่ไม่อยู่ในไฟล์ชุดปัจจุบันแล้ว (ถูกลบ/แทนที่) -> คำนวณเองแล้ว publish ใหม่
+        """
+        if self.shared.generation() == self._rejected:
+            return
+        snapshot = self.shared.read(self._generation)
+        if snapshot is None:
+            return
+        generation, codes, filenames, arrays = snapshot
+        missing = set(filenames) - self._available(files)
+        if any(not (self.data_dir / name).exists() for name in missing):  # files อาจเป็นผล glob รอบก่อน
+            self._rejected = generation
+            return
+        self._started = True  # ไม่ต้อง warm-start จากไฟล์แล้ว
+
+        n = len(self.ts)
+        extends = codes == self.codes and len(filenames) >= n and filenames[:n] == self.filenames
+        if not extends:
+            self._reset()
+            n = 0
+            for listener in self._listeners:
+                listener.reset(list(codes))
+
+        self.codes = list(codes)
+        self.filenames = list(filenames)
+        self._seen = set(filenames)
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self._generation = generation
+
+        if len(self.ts) > n:
+            for listener in self._listeners:
+                listener.update(self.ts[n:], self.added[n:])
+            self.version += 1
+
+    def _ingest(self, rows: list):
+        rows.sort(key=lambda r: r[0])
+        new_codes = {code for _, _, data, gain in rows for code in (*data, *(gain or ()))} - set(self.codes)
+        in_order = not len(self.ts) or rows[0][0] >= self.ts[-1]
+
+        if new_codes or not in_order:
+            # มี code ใหม่หรือไฟล์มาไม่เรียงเวลา -> คำนวณใหม่ทั้งหมด
+            all_rows = self._merge_rows(rows)
+            seen = self._seen
+            codes = sorted(set(self.codes) | new_codes)
+            self._reset()
+            self._seen = seen
+            self.codes = codes
+            self.pct = np.empty((0, len(codes)))
+            self.added = np.empty((0, len(codes)))
+            self.points = np.empty((0, len(codes)))
+            rows = all_rows
+            for listener in self._listeners:
+                listener.reset(list(codes))
+
+        self._append(rows)
+
+    def _append(self, rows: list):
+        """ต่อท้าย snapshot ที่เรียงเวลาแล้ว - คำนวณคะแนนสะสมต่อจากแถวสุดท้าย"""
+        n_codes = len(self.codes)
+        ts = np.array([r[0] for r in rows], dtype=np.int64)
+        pct = np.array([[row[2].get(code, 0) for code in self.codes] for row in rows], dtype=float)
+        pct = pct.reshape(len(rows), n_codes)
+
+        prev_pct = self.pct[-1:] if len(self.pct) else np.zeros((1, n_codes))
+        prev_points = self.points[-1:] if len(self.points) else np.zeros((1, n_codes))
+
+        # Cumulative Gain Only: นับเฉพาะ % ที่เพิ่มขึ้น
+        delta = pct - np.vstack([prev_pct, pct[:-1]])
+        added = np.where(delta > 0, (delta / 100) * BASE_TOTAL_VOTES, 0.0)
+        # snapshot ที่แทนหลาย snapshot (downsample) ใช้ gain ที่เก็บไว้ - ยอดรวมเท่ากับข้อมูลดิบ
+        pinned = [i for i, row in enumerate(rows) if row[3] is not None]
+        if pinned:
+            gain = np.array([[rows[i][3].get(code, 0) for code in self.codes] for i in pinned], dtype=float)
+            added[pinned] = (gain.reshape(len(pinned), n_codes) / 100) * BASE_TOTAL_VOTES
+        points = np.cumsum(np.vstack([prev_points, added]), axis=0)[1:]
+
+        self.filenames.extend(r[1] for r in rows)
+        self.ts = np.concatenate([self.ts, ts])
+        self.pct = np.vstack([self.pct, pct])
+        self.added = np.vstack([self.added, added])
+        self.points = np.vstack([self.points, points])
+        self.totals = np.cumsum(self.points, axis=1)[:, -1] if n_codes else np.zeros(len(self.ts))
+
+        for listener in self._listeners:
+            listener.update(ts, added)
+
+    def _merge_rows(self, rows: list) -> list:
+        """
+        snapshot ที่มีอยู่ + snapshot ใหม่ เรียงตามเวลา สำหรับคำนวณใหม่ทั้งหมด
+        snapshot เดิมใช้คะแนนที่คำนวณไว้แล้วเป็น gain (รักษา gain ของ snapshot ที่ถูก downsample)
+        ยกเว้นแถวที่ snapshot ก่อนหน้าเปลี่ยน (มีไฟล์เก่าแทรกเข้ามา) ต้องคำนวณส่วนต่างใหม่
+        """
+        gain = (self.added / BASE_TOTAL_VOTES * 100).tolist()
+        stored = [
+            (t, name, dict(zip(self.codes, p)), dict(zip(self.codes, g)))
+            for t, name, p, g in zip(self.ts.tolist(), self.filenames, self.pct.tolist(), gain)
+        ]
+        previous = dict(zip(self.filenames, [None] + self.filenames[:-1]))
+
+        merged = sorted(stored + rows, key=lambda r: r[0])
+        for i, row in enumerate(merged):
+            before = merged[i - 1][1] if i else None
+            if row[1] in previous and previous[row[1]] != before:
+                merged[i] = (*row[:3], None)
+        return merged
+
+    # ---------- Warm-start state ----------
+
+    def save_state(self):
+        """
+        บันทึก ts / pct / added / points เป็น .npy ชุดใหม่ แล้วสลับ manifest.json แบบ atomic
+        ไฟล์ชุดเก่าลบทีหลัง (worker อื่นที่ map ไว้ยังอ่านได้)
+        """
+        if not self.state_dir:
+            return
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            generation = f'{time.time_ns()}_{os.getpid()}'
+            for name in STATE_ARRAYS:
+                np.save(self.state_dir / f'{generation}.{name}.npy', getattr(self, name))
+
+            manifest = {
+                'format': STATE_FORMAT,
+                'generation': generation,
+                'data_dir': str(self.data_dir.resolve()),
+                'rows': len(self.ts),
+                'codes': self.codes,
+                'filenames': self.filenames,
+            }
+            # ชุดเก่าที่ manifest ก่อนหน้าอ้างถึง -> ลบเมื่อเก่ากว่า 60 วินาที (worker อื่นอาจยัง map อยู่)
+            # ลบเฉพาะไฟล์ที่ engine เขียนเองตามรายชื่อใน manifest ไม่แตะไฟล์อื่นใน state_dir
+            stale = self._stale_generations()
+            cutoff = time.time_ns() - 60 * 10 ** 9
+            expired = [g for g in stale if int(g.split('_')[0]) < cutoff]
+            manifest['stale'] = [g for g in stale if g not in expired]
+
+            tmp = self.state_dir / f'manifest.{generation}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp, self.state_dir / 'manifest.json')
+
+            for old in expired:
+                for name in STATE_ARRAYS:
+                    (self.state_dir / f'{old}.{name}.npy').unlink(missing_ok=True)
+        except OSError:
+            pass  # เขียนไม่ได้ (เช่น read-only filesystem) -> ทำงานต่อแบบไม่มี warm-start
+
+    def _stale_generations(self) -> list:
+        """generation ใน manifest.json ปัจจุบัน (ชุดที่กำลังจะถูกแทน) + ชุดเก่าที่ยังไม่ได้ลบ"""
+        try:
+            with open(self.state_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            stale = [manifest['generation'], *manifest.get('stale', [])]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+        return [g for g in stale if isinstance(g, str) and re.fullmatch(r'\d+_\d+', g)]
+
+    def load_state(self, available: set) -> bool:
+        """
+        โหลด state ที่บันทึกไว้แบบ memory-map - ใช้เมื่อ manifest ตรงกับข้อมูลจริงเท่านั้น:
+        format / data_dir เดียวกัน, ไฟล์ snapshot ทุกไฟล์ยังอยู่, ขนาด array ตรงกัน
+        available: ชื่อไฟล์ vote_*.json ที่มีอยู่ตอนนี้ (ไฟล์เดี่ยว + segment)
+        """
+        if not self.state_dir:
+            return False
+        try:
+            with open(self.state_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') != STATE_FORMAT:
+                return False
+            if manifest['data_dir'] != str(self.data_dir.resolve()):
+                return False
+
+            rows, codes, filenames = manifest['rows'], manifest['codes'], manifest['filenames']
+            if len(filenames) != rows or not set(filenames) <= available:
+                return False
+
+            arrays = {
+                name: np.load(self.state_dir / f"{manifest['generation']}.{name}.npy", mmap_mode='r')
+                for name in STATE_ARRAYS
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        if arrays['ts'].shape != (rows,):
+            return False
+        if any(arrays[name].shape != (rows, len(codes)) for name in ('pct', 'added', 'points')):
+            return False
+
+        self._reset()
+        self.codes = list(codes)
+        self.filenames = list(filenames)
+        self._seen = set(filenames)
+        for name, array in arrays.items():
+            setattr(self, name, array)
+        self.totals = np.cumsum(self.points, axis=1)[:, -1] if codes else np.zeros(rows)
+
+        for listener in self._listeners:
+            listener.reset(list(self.codes))
+            if rows:
+                listener.update(self.ts, self.added)
+        return True
+
+    def subscribe(self, listener):
+        """
+        ลงทะเบียนตัวรับ snapshot แบบ streaming:
+        listener.reset(codes) เมื่อเริ่มใหม่/คำนวณใหม่ทั้งหมด, listener.update(ts, added) เฉพาะแถวใหม่
+        ส่งข้อมูลที่มีอยู่แล้วให้ทันทีครั้งเดียว
+        """
+        with self.lock:
+            self._listeners.append(listener)
+            listener.reset(list(self.codes))
+            if len(self.ts):
+                listener.update(self.ts, self.added)
+
+    # ---------- Timestamp index ----------
+
+    def day_range(self, day: int) -> tuple[int, int]:
+        """ช่วง index [start, stop) ของ snapshot ในวันนั้น (binary search บน ts)"""
+        start = int(np.searchsorted(self.ts, day * SECONDS_PER_DAY, side='left'))
+        stop = int(np.searchsorted(self.ts, (day + 1) * SECONDS_PER_DAY, side='left'))
+        return start, stop
+
+    def time_range(self, start: int | None = None, stop: int | None = None) -> tuple[int, int]:
+        """ช่วง index [lo, hi) ของ snapshot ที่ start <= ts <= stop (binary search บน ts)"""
+        lo = 0 if start is None else int(np.searchsorted(self.ts, start, side='left'))
+        hi = len(self.ts) if stop is None else int(np.searchsorted(self.ts, stop, side='right'))
+        return lo, max(lo, hi)
+
+    def index_at(self, ts: int) -> int | None:
+        """index ของ snapshot ล่าสุดที่ ts <= เวลาที่ขอ (None ถ้ายังไม่มีข้อมูล ณ เวลานั้น)"""
+        hi = int(np.searchsorted(self.ts, ts, side='right'))
+        return hi - 1 if hi else None
+
+    @property
+    def open_day(self) -> int | None:
+        """วันของ snapshot ล่าสุด - วันเดียวที่ข้อมูลยังเปลี่ยนได้"""
+        return int(self.ts[-1]) // SECONDS_PER_DAY if len(self.ts) else None
+
+    def dates(self) -> list:
+        """รายการวันที่มีข้อมูล พร้อมจำนวน snapshot"""
+        days, counts = np.unique(self.ts // SECONDS_PER_DAY, return_counts=True)
+        return [
+            {
+                'date': date,
+                'label': label,
+                'count': count,
+            }
+            for date, label, count in zip(
+                format_times(days * SECONDS_PER_DAY, '%Y-%m-%d'),
+                format_times(days * SECONDS_PER_DAY, '%d/%m'),
+                counts.tolist(),
+            )
+        ]
+
+    def day_partition(self, name: str, day: int, build) -> tuple:
+        """
+        ข้อมูลรายวันที่จัดรูปแบบแล้ว: build(start, stop) -> list
+        วันที่ปิดแล้วคำนวณครั้งเดียวแล้วเก็บถาวร วันปัจจุบันคำนวณใหม่ทุกครั้ง
+        """
+        key = (name, day)
+        if key in self._partitions:
+            return self._partitions[key]
+
+        start, stop = self.day_range(day)
+        records = tuple(build(start, stop))
+        if self.open_day is not None and day < self.open_day:
+            self._partitions[key] = records
+        return records
+
+    def query(self, start: int | None = None, stop: int | None = None,
+              codes: list | None = None, fields: list | None = None) -> dict:
+        """
+        ดึงข้อมูลเฉพาะช่วงเวลา / code / field ที่ต้องการ (แบบ column)
+        หาแถวด้วย binary search แล้วตัดเฉพาะคอลัมน์ของ code ที่ขอ
+        ValueError ถ้า code หรือ field ไม่มีอยู่จริง
+        """
+        codes = list(codes) if codes else list(self.codes)
+        fields = list(fields) if fields else ['points']
+
+        unknown = [c for c in codes if c not in self.codes]
+        if unknown:
+            raise ValueError(f"ไม่พบ code: {', '.join(unknown)}")
+        unknown = [f for f in fields if f not in QUERY_FIELDS]
+        if unknown:
+            raise ValueError(f"ไม่รองรับ field: {', '.join(unknown)}")
+
+        lo, hi = self.time_range(start, stop)
+        cols = [self.codes.index(c) for c in codes]
+
+        columns = {}
+        for field in fields:
+            if field == 'pct':
+                columns[field] = self.pct[lo:hi][:, cols]
+            elif field == 'money':
+                columns[field] = np.round(self.points[lo:hi][:, cols] * BAHT_PER_POINT).astype(np.int64)
+            else:
+                source = self.points if field == 'points' else self.added
+                columns[field] = np.round(source[lo:hi][:, cols]).astype(np.int64)
+
+        return {
+            'codes': codes,
+            'fields': fields,
+            'ts': self.ts[lo:hi].tolist(),
+            'time': format_times(self.ts[lo:hi]),
+            'data': {
+                code: {field: columns[field][:, j].tolist() for field in fields}
+                for j, code in enumerate(codes)
+            },
+        }
+
+    def cached(self, name: str, compute):
+        """
+        ผลคำนวณที่ผูกกับ version ของข้อมูล - คำนวณใหม่เฉพาะเมื่อมี snapshot ใหม่
+        version ใหม่ล้าง cache ทั้งหมด, ภายใน version เดียวเก็บไม่เกิน CACHE_SIZE รายการ (LRU)
+        """
+        version = self.refresh()
+        with self.lock:
+            if version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = version
+            entry = self._cache.get(name)
+            if entry and entry[0] == version:
+                self._cache.move_to_end(name)
+                return entry[1]
+
+            value = compute()
+            self._cache[name] = (version, value)
+            self._cache.move_to_end(name)
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return value
+
+    def latest_file(self) -> str | None:
+        return self.filenames[-1] if self.filenames else None
+
+    def latest_snapshot(self) -> tuple[str, dict] | None:
+        """
+        (ชื่อไฟล์, snapshot เต็ม) ล่าสุด - อ่านจาก latest.json ไฟล์เดียวถ้าชี้ไปที่ไฟล์ล่าสุด (หรือใหม่กว่า)
+        ไม่งั้น (ยังไม่มี pointer / ข้อมูลมาทางอื่น เช่น git pull) โหลดจากไฟล์ล่าสุดของ engine
+        """
+        latest_name = self.latest_file()
+        latest = read_latest(self.data_dir)
+        if latest and (latest_name is None or latest['filename'] >= latest_name):
+            return latest['filename'], latest['snapshot']
+        if latest_name is None:
+            return None
+        return latest_name, self.load_snapshot(latest_name)
+
+    def load_snapshot(self, filename: str) -> dict:
+        """ข้อมูลของ snapshot (ไฟล์เดี่ยวหรือใน segment) - delta เติม % ครบทุก code จากแถวใน engine"""
+        data = self.segments.load(filename)
+        if data.get('delta'):
+            with self.lock:
+                i = len(self.filenames) - 1 - self.filenames[::-1].index(filename)
+                data = dense_snapshot(data, dict(zip(self.codes, self.pct[i].tolist())))
+        return data
+
+    def diagnostics(self) -> dict:
+        """สถานะสำหรับ endpoint วินิจฉัย: จำนวน snapshot + ไฟล์ที่อ่านไม่ได้ (quarantine)"""
+        self.refresh()
+        with self.lock:
+            return {
+                'snapshots': len(self),
+                'latest_file': self.latest_file(),
+                'compacted': len(self._segment_names()),  # snapshot ที่อยู่ใน segment
+                'store': str(self.store.path) if self.store else None,
+                'quarantine': self.quarantine.report(),
+            }
+
+
+# Global engine instance
+engine = VoteEngine(store=VoteStore.from_env())
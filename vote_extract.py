@@ -0,0 +1,49 @@
+"""
+Vote Extract - ดึงข้อมูลโหวตจากหน้า HTML ของ YNA 2025 (ใช้ร่วมกันทุก scraper และ vote_backfill)
+
+- extract_chart_data: labels / data จาก script Chart.js
+- extract_couples:    ชื่อคู่/ซีรีส์จากรายการ 'YND01 : ชื่อ (ซีรีส์)'
+"""
+
+import re
+
+from bs4 import BeautifulSoup
+
+
+def extract_chart_data(soup: BeautifulSoup) -> dict:
+    """{'labels': [code], 'data': [%]} จาก script ที่มี Chart.js (ว่างถ้าไม่พบ)"""
+    result = {'labels': [], 'data': []}
+    for script in soup.find_all('script'):
+        if script.string and 'Chart' in script.string:
+            # labels: ["YND01","YND02",...]
+            labels_match = re.search(r'labels\s*:\s*\[(.*?)\]', script.string, re.DOTALL)
+            if labels_match:
+                result['labels'] = re.findall(r'["\']([^"\']+)["\']', labels_match.group(1))
+            # data: ["0.32","0.33",...] หรือ data: [0.32, 0.33,...]
+            data_match = re.search(r"data\s*:\s*\[(.*?)\]", script.string, re.DOTALL)
+            if data_match:
+                numbers = re.findall(r'["\']?([\d.]+)["\']?', data_match.group(1))
+                result['data'] = [float(x) for x in numbers if x]
+            if result['labels'] and result['data']:
+                break
+    return result
+
+
+def extract_couples(soup: BeautifulSoup) -> dict:
+    """{code: {'names', 'series'}} จาก li ก่อน ถ้าไม่พบค่อยหาจากข้อความทั้งหน้า"""
+    couples = {}
+    for li in soup.find_all('li'):
+        match = re.match(r'(YND\d+)\s*:\s*(.+?)(?:\s*\((.+?)\))?$', li.get_text(strip=True))
+        if match:
+            couples[match.group(1)] = {'names': match.group(2).strip(), 'series': match.group(3) or ''}
+    if couples:
+        return couples
+
+    for match in re.finditer(r'(YND\d+)\s*:\s*([^\n]+)', soup.get_text()):
+        rest = match.group(2).strip()
+        series_match = re.search(r'\(([^)]+)\)\s*$', rest)
+        if series_match:
+            couples[match.group(1)] = {'names': rest[:series_match.start()].strip(), 'series': series_match.group(1)}
+        else:
+            couples[match.group(1)] = {'names': rest, 'series': ''}
+    return couples
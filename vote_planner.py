@@ -0,0 +1,198 @@
+"""
+Vote Planner - วางแผนซื้อแพ็คเกจโหวตแบบคุ้มที่สุด (แทนการซื้อแพ็คแพงสุดก่อนแบบ greedy)
+
+- plan_budget(B):        ได้คะแนนมากที่สุดด้วยเงินไม่เกิน B บาท
+- plan_votes(N):         ใช้เงินน้อยที่สุดให้ได้ "พอดี" N คะแนน
+- plan_votes(N, exact=False): ใช้เงินน้อยที่สุดให้ได้ "อย่างน้อย" N คะแนน
+
+หลักการ: ในคำตอบที่ดีที่สุดจะมีแพ็คอื่นนอกจากแพ็คที่คุ้มที่สุดได้ไม่เกินจำนวนจำกัด
+(ถ้าเกิน จะสลับกลุ่มแพ็คนั้นเป็นแพ็คที่คุ้มที่สุดในราคา/คะแนนเท่ากันได้โดยไม่แย่ลง)
+จึงทำ DP เฉพาะส่วนเล็กๆ นั้นครั้งเดียว (memoized) แล้วเติมที่เหลือด้วยแพ็คที่คุ้มที่สุด
+ตอบได้ทันทีไม่ว่างบจะเป็นหลักล้าน
+"""
+
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+
+# แพ็คเกจโหวต (เหมือนหน้า dashboard)
+PACKAGES = (
+    {'name': 'แพ็ค 4,000 บาท', 'price': 4000, 'points': 1000},
+    {'name': 'แพ็ค 450 บาท', 'price': 450, 'points': 100},
+    {'name': 'แพ็ค 50 บาท', 'price': 50, 'points': 10},
+    {'name': 'แพ็ค 6 บาท', 'price': 6, 'points': 1},
+)
+
+MAX_BATCH = 1000  # จำนวนคำถามสูงสุดต่อ request
+MAX_AMOUNT = 10 ** 12  # งบ/คะแนนสูงสุดต่อคำถาม
+
+
+def _packs(packages=PACKAGES) -> tuple:
+    return tuple((p['price'], p['points']) for p in packages)
+
+
+@lru_cache(maxsize=8)
+def _budget_table(packs: tuple) -> tuple:
+    """
+    DP สำหรับโจทย์งบประมาณ: แพ็คที่คุ้มสุด (คะแนน/บาท) + ตารางของแพ็คที่เหลือ
+    votes[c] = คะแนนมากสุดจากแพ็คอื่นด้วยเงินไม่เกิน c, spent[c] = เงินที่ใช้จริง
+    """
+    best = max(range(len(packs)), key=lambda i: (packs[i][1] / packs[i][0], packs[i][0]))
+    best_price = packs[best][0]
+    others = [i for i in range(len(packs)) if i != best]
+
+    # เงินสูงสุดที่คำตอบที่ดีที่สุดจะใช้กับแพ็คอื่น
+    limit = sum((best_price // gcd(best_price, packs[i][0]) - 1) * packs[i][0] for i in others)
+
+    votes = np.zeros(limit + 1, dtype=np.int64)
+    spent = np.zeros(limit + 1, dtype=np.int64)
+    choice = np.full(limit + 1, -1, dtype=np.int64)  # -1 = เหมือน c - 1
+    for c in range(1, limit + 1):
+        votes[c], spent[c] = votes[c - 1], spent[c - 1]
+        for i in others:
+            price, points = packs[i]
+            if price <= c:
+                v, s = votes[c - price] + points, spent[c - price] + price
+                if v > votes[c] or (v == votes[c] and s < spent[c]):
+                    votes[c], spent[c], choice[c] = v, s, i
+
+    return best, votes, spent, choice
+
+
+@lru_cache(maxsize=8)
+def _votes_table(packs: tuple) -> tuple:
+    """
+    DP สำหรับโจทย์จำนวนคะแนน: แพ็คที่ถูกสุด (บาท/คะแนน) + ตารางของแพ็คที่เหลือ
+    cost[v] = เงินน้อยสุดที่ได้พอดี v คะแนนจากแพ็คอื่น (inf = ทำไม่ได้)
+    """
+    best = min(range(len(packs)), key=lambda i: (packs[i][0] / packs[i][1], -packs[i][1]))
+    best_points = packs[best][1]
+    others = [i for i in range(len(packs)) if i != best]
+
+    limit = sum((best_points // gcd(best_points, packs[i][1]) - 1) * packs[i][1] for i in others)
+
+    cost = np.full(limit + 1, np.inf)
+    cost[0] = 0
+    choice = np.full(limit + 1, -1, dtype=np.int64)
+    for v in range(1, limit + 1):
+        for i in others:
+            price, points = packs[i]
+            if points <= v and cost[v - points] + price < cost[v]:
+                cost[v], choice[v] = cost[v - points] + price, i
+
+    return best, cost, choice
+
+
+def _counts(choice: np.ndarray, start: int, unit, n_packs: int) -> list:
+    """ย้อนตาราง choice จาก index start -> จำนวนแพ็คแต่ละแบบ (unit = ราคาหรือคะแนนของแพ็ค)"""
+    counts = [0] * n_packs
+    i = start
+    while i > 0:
+        j = int(choice[i])
+        if j < 0:
+            i -= 1
+            continue
+        counts[j] += 1
+        i -= unit(j)
+    return counts
+
+
+def _result(counts: list, packages, **extra) -> dict:
+    purchases = []
+    for pkg, qty in zip(packages, counts):
+        if qty:
+            purchases.append({
+                'name': pkg['name'],
+                'price': pkg['price'],
+                'qty': qty,
+                'spent': qty * pkg['price'],
+                'points': qty * pkg['points'],
+            })
+    result = dict(extra)
+    result['points'] = sum(p['points'] for p in purchases)
+    result['spent'] = sum(p['spent'] for p in purchases)
+    result['purchases'] = purchases
+    return result
+
+
+def plan_budget(budget: int, packages=PACKAGES) -> dict:
+    """ได้คะแนนมากที่สุดด้วยเงิน budget บาท (เสมอกันเลือกที่ใช้เงินน้อยกว่า)"""
+    budget = max(0, int(budget))
+    packs = _packs(packages)
+    best, votes, spent, choice = _budget_table(packs)
+    best_price, best_points = packs[best]
+
+    # r = เงินที่ใช้กับแพ็คอื่น ที่เหลือซื้อแพ็คที่คุ้มสุดทั้งหมด
+    r = np.arange(min(budget, len(votes) - 1) + 1)
+    n_best = (budget - r) // best_price
+    total_votes = votes[r] + n_best * best_points
+    total_spent = spent[r] + n_best * best_price
+    pick = int(np.lexsort((total_spent, -total_votes))[0])
+
+    counts = _counts(choice, pick, lambda j: packs[j][0], len(packs))
+    counts[best] += int(n_best[pick])
+    result = _result(counts, packages, budget=budget)
+    result['remaining'] = budget - result['spent']
+    return result
+
+
+def _exact_cost(n: int, packs: tuple) -> tuple[float, int]:
+    """เงินน้อยสุดที่ได้พอดี n คะแนน -> (cost, v ที่ได้จากแพ็คอื่น)"""
+    best, cost, _ = _votes_table(packs)
+    best_price, best_points = packs[best]
+    v = np.arange(n % best_points, min(n, len(cost) - 1) + 1, best_points)
+    if not len(v):
+        return np.inf, -1
+    totals = cost[v] + (n - v) // best_points * best_price
+    pick = int(np.argmin(totals))
+    return float(totals[pick]), int(v[pick])
+
+
+def _at_least_cost(n: int, packs: tuple) -> tuple[float, int, int]:
+    """
+    เงินน้อยสุดที่ได้อย่างน้อย n คะแนน -> (cost, v ที่ได้จากแพ็คอื่น, จำนวนแพ็คที่ถูกสุด)
+    ทุก v ในตาราง DP ชุดเดียว เติมแพ็คที่ถูกสุดให้ครบ n (เสมอกันเลือกที่ได้คะแนนน้อยกว่า)
+    """
+    best, cost, _ = _votes_table(packs)
+    best_price, best_points = packs[best]
+    v = np.arange(len(cost))
+    n_best = np.maximum(0, -(-(n - v) // best_points))
+    totals = cost + n_best * best_price
+    pick = int(np.lexsort((v + n_best * best_points, totals))[0])
+    return float(totals[pick]), int(v[pick]), int(n_best[pick])
+
+
+def plan_votes(votes: int, exact: bool = True, packages=PACKAGES) -> dict:
+    """
+    ใช้เงินน้อยที่สุดให้ได้ votes คะแนน
+    exact=False: ยอมได้เกินถ้าถูกกว่า (เช่น 9 คะแนน ซื้อแพ็ค 10 คะแนน 50 บาท ถูกกว่า 9 x 6 บาท)
+    """
+    votes = max(0, int(votes))
+    packs = _packs(packages)
+    best, _, choice = _votes_table(packs)
+
+    if exact:
+        total, v = _exact_cost(votes, packs)
+        n_best = (votes - v) // packs[best][1]
+    else:
+        total, v, n_best = _at_least_cost(votes, packs)
+    if not np.isfinite(total):
+        return {'votes': votes, 'error': 'ไม่สามารถซื้อให้ได้คะแนนพอดีด้วยแพ็คที่มี'}
+
+    counts = _counts(choice, v, lambda j: packs[j][1], len(packs))
+    counts[best] += n_best
+    return _result(counts, packages, votes=votes, exact=exact)
+
+
+def plan_batch(budgets=(), votes=(), exact: bool = True, packages=PACKAGES) -> dict:
+    """ตอบหลายคำถามพร้อมกัน (ใช้ตาราง DP ชุดเดียวกัน)"""
+    budgets, votes = list(budgets), list(votes)
+    if len(budgets) + len(votes) > MAX_BATCH:
+        raise ValueError(f'ถามได้ไม่เกิน {MAX_BATCH} รายการต่อครั้ง')
+    if any(int(x) > MAX_AMOUNT for x in budgets + votes):
+        raise ValueError(f'จำนวนต้องไม่เกิน {MAX_AMOUNT:,}')
+    return {
+        'budgets': [plan_budget(b, packages) for b in budgets],
+        'votes': [plan_votes(v, exact, packages) for v in votes],
+    }
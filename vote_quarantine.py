@@ -0,0 +1,110 @@
+"""
+Vote Quarantine - จำไฟล์ที่อ่านไม่ได้ (JSON ถูกตัดกลางคัน / เขียนไม่เสร็จ / segment เสีย)
+ข้ามไฟล์นั้นด้วยการ stat ครั้งเดียวแทนการเปิดแล้ว parse ใหม่ทุก refresh
+อ่านใหม่เมื่อไฟล์เปลี่ยนเท่านั้น (key = path + mtime + ขนาด)
+
+บันทึกเป็น quarantine.json ใน STATE_DIR ของ engine (worker ที่เริ่มใหม่ไม่ต้องลองไฟล์เดิมซ้ำ)
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+QUARANTINE_FILE = 'quarantine.json'
+QUARANTINE_FORMAT = 1
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Quarantine:
+    """ไฟล์ที่อ่านไม่ได้ -> {'mtime_ns', 'size', 'error', 'since', 'attempts'} (บันทึกลง path ถ้ามี)"""
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self._entries = {}
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path) -> bool:
+        return str(path) in self._entries
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == QUARANTINE_FORMAT:
+                self._entries = dict(data['files'])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'format': QUARANTINE_FORMAT, 'files': self._entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # เขียนไม่ได้ -> จำไว้ในหน่วยความจำอย่างเดียว
+
+    def skip(self, path) -> bool:
+        """
+        True = ไฟล์อยู่ใน quarantine และยังไม่เปลี่ยน (ไม่ต้องอ่าน)
+        ไฟล์ที่เปลี่ยนหรือถูกลบไปแล้วออกจาก quarantine (ให้ลองอ่านใหม่)
+        ไฟล์ที่ไม่อยู่ใน quarantine ไม่ต้อง stat
+        """
+        key = str(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if _signature(Path(path)) == (entry['mtime_ns'], entry['size']):
+            return True
+        with self.lock:
+            self._entries.pop(key, None)
+            self._save()
+        return False
+
+    def add(self, path, error) -> bool:
+        """บันทึกไฟล์ที่อ่านไม่ได้ -> False ถ้าไฟล์หายไปแล้ว (ไม่ต้องจำ)"""
+        signature = _signature(Path(path))
+        if signature is None:
+            return False
+        key = str(path)
+        with self.lock:
+            previous = self._entries.get(key, {})
+            self._entries[key] = {
+                'mtime_ns': signature[0],
+                'size': signature[1],
+                'error': f'{type(error).__name__}: {error}' if isinstance(error, Exception) else str(error),
+                'since': previous.get('since', int(time.time())),
+                'attempts': previous.get('attempts', 0) + 1,
+            }
+            self._save()
+        return True
+
+    def discard(self, path):
+        with self.lock:
+            if self._entries.pop(str(path), None) is not None:
+                self._save()
+
+    def report(self) -> list:
+        """รายการไฟล์ใน quarantine สำหรับ endpoint วินิจฉัย (เรียงตาม path)"""
+        return [
+            {'path': path, **entry}
+            for path, entry in sorted(self._entries.items())
+        ]
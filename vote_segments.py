@@ -0,0 +1,535 @@
+"""
+Vote Segments - รวม snapshot ของวันที่ปิดแล้ว (vote_*.json + vote_*.csv) เป็นไฟล์บีบอัดไฟล์เดียวต่อวัน
+
+    data_yna2025/segments/vote_20260106.tar.gz   # ไฟล์เดิมทั้งวัน (bytes เดิมทุกไฟล์)
+    data_yna2025/segments/vote_20260106.vgb      # ts / % / gain ของทั้งวันแบบ Gorilla (vote_codec)
+    data_yna2025/segments/index.json             # segment -> sha256 ของ segment, series และของแต่ละไฟล์
+
+ผู้อ่านใช้ series (.vgb) เป็นหลัก ไม่ต้องแตก tar และ parse JSON ทีละไฟล์ (tar ใช้เมื่อไม่มี/เสีย)
+
+ลำดับการ compact (ไม่มีจังหวะไหนที่ข้อมูลหายถ้าหยุดกลางทาง):
+1. เขียน segment ลงไฟล์ชั่วคราว -> fsync -> rename
+2. อ่าน segment จากดิสก์อีกครั้ง เทียบ sha256 ของทุกไฟล์กับต้นฉบับ
+3. บันทึก index.json (atomic)
+4. ลบไฟล์ต้นฉบับ
+
+ผู้อ่าน (engine / dashboard) เห็นทั้ง segment และไฟล์ที่ยังไม่ compact เหมือนเป็นชุดเดียวกัน
+ชื่อไฟล์เดียวกันที่อยู่ทั้งสองที่ (ระหว่าง compact) นับครั้งเดียว
+
+    python vote_segments.py compact data_yna2025     # compact ทุกวันที่ปิดแล้ว
+    python vote_segments.py verify data_yna2025      # ตรวจ checksum ของทุก segment
+    python vote_segments.py retain data_yna2025 --raw-days 7 --hourly-days 90
+
+Retention (ไม่บังคับ - ตั้ง RETAIN_RAW_DAYS เพื่อเปิดใช้กับ scraper):
+- N วันล่าสุด (นับจากวันของ snapshot ล่าสุด): เก็บทุก snapshot
+- เก่ากว่านั้นถึง RETAIN_HOURLY_DAYS: เก็บ snapshot สุดท้ายของแต่ละชั่วโมง
+- เก่ากว่านั้น: เก็บ snapshot สุดท้ายของแต่ละวัน
+snapshot ที่เก็บไว้มี gain = % ที่เพิ่มขึ้นรวมของทุก snapshot ในช่วงนั้น (เฉพาะส่วนที่เพิ่ม)
+engine ใช้ gain แทนส่วนต่าง จึงได้คะแนนสะสมเท่ากับข้อมูลดิบ
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import tarfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from vote_codec import decode_block, encode_block
+from vote_store import dense_snapshot, fsync_dir, snapshot_rows
+
+SEGMENT_DIR = 'segments'
+INDEX_FILE = 'index.json'
+INDEX_FORMAT = 1
+SEGMENT_SUFFIX = '.tar.gz'
+SERIES_SUFFIX = '.vgb'
+SNAPSHOT_PATTERN = re.compile(r'^vote_(\d{8})_\d{6}\.(json|csv)$')
+
+# retention (วัน) - RETAIN_RAW_DAYS ว่าง = เก็บทุก snapshot
+RETAIN_RAW_DAYS = int(os.environ['RETAIN_RAW_DAYS']) if os.environ.get('RETAIN_RAW_DAYS') else None
+RETAIN_HOURLY_DAYS = int(os.environ.get('RETAIN_HOURLY_DAYS', '90'))
+TIERS = ('raw', 'hourly', 'daily')
+BUCKET_SECONDS = {'hourly': 3600, 'daily': 86400}
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_day(filename: str) -> str | None:
+    """วันของ snapshot จากชื่อไฟล์ vote_YYYYMMDD_HHMMSS.json/.csv -> 'YYYYMMDD'"""
+    match = SNAPSHOT_PATTERN.match(filename)
+    return match.group(1) if match else None
+
+
+def _json_members(files: dict) -> list:
+    """snapshot JSON ใน segment ที่อ่านได้ -> [(filename, data)]"""
+    snapshots = []
+    for name, content in sorted(files.items()):
+        if not name.endswith('.json'):
+            continue
+        try:
+            snapshots.append((name, json.loads(content.decode('utf-8'))))
+        except ValueError:
+            continue
+    return snapshots
+
+
+class SegmentStore:
+    """segment รายวันของ data_dir หนึ่ง - โหลด index ใหม่อัตโนมัติเมื่อไฟล์ถูกแก้ (เช่น compact จากอีก process)"""
+
+    def __init__(self, data_dir: str | Path):
+        self.data_dir = Path(data_dir)
+        self.dir = self.data_dir / SEGMENT_DIR
+        self.index_path = self.dir / INDEX_FILE
+        self._mtime = None
+        self._index = {}
+        self._members = {}  # ชื่อไฟล์ -> segment
+
+    # ---------- index ----------
+
+    def index(self) -> dict:
+        """{segment: {'day', 'sha256', 'size', 'files': {ชื่อไฟล์: sha256}}}"""
+        try:
+            mtime = self.index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._mtime, self._index, self._members = None, {}, {}
+            return self._index
+        if mtime != self._mtime:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('format') != INDEX_FORMAT:
+                raise ValueError(f'ไม่รองรับ index format {index.get("format")}')
+            self._index = index['segments']
+            self._members = {
+                name: segment for segment, entry in self._index.items() for name in entry['files']
+            }
+            self._mtime = mtime
+        return self._index
+
+    def filenames(self, suffix: str = '.json') -> set:
+        """ชื่อไฟล์ที่อยู่ใน segment แล้ว (default เฉพาะ snapshot JSON)"""
+        self.index()
+        return {name for name in self._members if name.endswith(suffix)}
+
+    def _write_index(self, index: dict):
+        data = json.dumps({'format': INDEX_FORMAT, 'segments': index}, ensure_ascii=False, indent=2, sort_keys=True)
+        self._write_file(INDEX_FILE, data.encode('utf-8'))
+        self._mtime = None  # โหลดใหม่ครั้งถัดไป
+
+    def _write_file(self, name: str, data: bytes):
+        """เขียนไฟล์ใน segments/ แบบ atomic (ไฟล์ชั่วคราว -> fsync -> rename)"""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / f'{name}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.dir / name)
+        fsync_dir(self.dir)
+
+    # ---------- อ่าน ----------
+
+    def read(self, segment: str, expected: dict | None = None) -> dict:
+        """
+        ไฟล์ทั้งหมดใน segment -> {ชื่อไฟล์: bytes}
+        ValueError ถ้า sha256 ของไฟล์ใดไม่ตรงกับ index (หรือ expected)
+        """
+        expected = expected if expected is not None else self.index()[segment]['files']
+        files = {}
+        with tarfile.open(self.dir / segment, 'r:gz') as tar:
+            for member in tar:
+                if member.isfile():
+                    files[member.name] = tar.extractfile(member).read()
+
+        missing = set(expected) - set(files)
+        if missing:
+            raise ValueError(f'{segment}: ไม่พบ {", ".join(sorted(missing))}')
+        bad = [name for name, digest in expected.items() if sha256(files[name]) != digest]
+        if bad:
+            raise ValueError(f'{segment}: checksum ไม่ตรง {", ".join(sorted(bad))}')
+        return files
+
+    def read_series(self, segment: str) -> dict | None:
+        """series ของ segment (ts, codes, filenames, pct, gain) - None ถ้าไม่มีหรือ checksum ไม่ตรง"""
+        entry = self.index()[segment].get('series')
+        if not entry:
+            return None
+        try:
+            data = (self.dir / entry['file']).read_bytes()
+            if sha256(data) != entry['sha256']:
+                return None
+            return decode_block(data)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def segment_of(self, filename: str) -> str | None:
+        """ชื่อ segment ที่มีไฟล์นี้ (None = ยังไม่ compact)"""
+        self.index()
+        return self._members.get(filename)
+
+    def rows(self, skip=(), on_error=None) -> list:
+        """
+        snapshot ใน segment ที่ชื่อไม่อยู่ใน skip -> [(epoch, filename, {code: pct}, gain)]
+        เปิดเฉพาะ segment ที่มีไฟล์ที่ยังไม่เคยอ่าน (ปกติ = ครั้งแรกที่โหลดเท่านั้น)
+        segment ที่เสีย/checksum ไม่ตรงข้ามไป (แจ้ง on_error(segment, exception) ถ้ามี)
+        """
+        skip = set(skip)
+        wanted = {}
+        for name in self.filenames() - skip:
+            wanted.setdefault(self._members[name], set()).add(name)
+
+        rows = []
+        for segment, names in sorted(wanted.items()):
+            block = self.read_series(segment)
+            if block is None:
+                try:
+                    files = self.read(segment)
+                except (OSError, ValueError, KeyError, tarfile.TarError) as e:
+                    if on_error:
+                        on_error(segment, e)
+                    continue
+                rows.extend(row for row in self._dense_rows(files) if row[1] in names)
+                continue
+
+            codes = block['codes']
+            gain = block['gain'].tolist() if block['gain'] is not None else None
+            for i, (ts, name, pct) in enumerate(zip(block['ts'].tolist(), block['filenames'], block['pct'].tolist())):
+                if name not in names:
+                    continue
+                row_gain = None
+                if gain is not None and not np.isnan(gain[i]).all():
+                    row_gain = dict(zip(codes, gain[i]))
+                rows.append((ts, name, dict(zip(codes, pct)), row_gain))
+        return rows
+
+    def _dense_rows(self, files: dict) -> list:
+        """snapshot JSON ใน segment -> แถวเต็มทุก code เรียงตามเวลา (delta เติมต่อจาก snapshot ก่อน segment)"""
+        snapshots = _json_members(files)
+        return snapshot_rows(snapshots, lambda ts: self._previous_pct(snapshots[0][0]))
+
+    def _write_series(self, segment: str, files: dict) -> dict | None:
+        """เขียน series (.vgb) ของไฟล์ใน segment แล้วถอดกลับมาตรวจ -> entry สำหรับ index"""
+        rows = self._dense_rows(files)
+        if not rows:
+            return None
+        codes = sorted({code for _, _, pct, gain in rows for code in (*pct, *(gain or ()))})
+        ts = np.array([r[0] for r in rows], dtype=np.int64)
+        pct = np.array([[r[2].get(code, 0) for code in codes] for r in rows], dtype=float)
+        gain = None
+        if any(r[3] is not None for r in rows):
+            gain = np.array([
+                [r[3].get(code, 0) for code in codes] if r[3] is not None else [np.nan] * len(codes)
+                for r in rows
+            ], dtype=float)
+
+        name = segment[:-len(SEGMENT_SUFFIX)] + SERIES_SUFFIX
+        data = encode_block(ts, codes, [r[1] for r in rows], pct, gain)
+        self._write_file(name, data)
+
+        block = decode_block((self.dir / name).read_bytes())
+        same = np.array_equal(block['ts'], ts) and np.array_equal(block['pct'], pct)
+        if gain is not None:
+            same = same and np.array_equal(block['gain'], gain, equal_nan=True)
+        if not same:
+            raise ValueError(f'{name}: ถอดกลับไม่ตรงกับต้นฉบับ')
+        return {'file': name, 'sha256': sha256(data), 'size': len(data), 'rows': len(rows)}
+
+    def load(self, filename: str) -> dict:
+        """อ่าน snapshot หนึ่งไฟล์ (ข้อมูลดิบ - delta ยังไม่เติม) ไม่ว่าจะยังเป็นไฟล์เดี่ยวหรืออยู่ใน segment แล้ว"""
+        path = self.data_dir / filename
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.index()
+            segment = self._members.get(filename)
+            if segment is None:
+                raise
+        return json.loads(self.read(segment)[filename].decode('utf-8'))
+
+    # ---------- compact ----------
+
+    def closed_days(self, today: str | None = None) -> list:
+        """
+        วันที่ปิดแล้ว: ก่อนวันของ snapshot ล่าสุด และก่อนวันนี้ (เวลาท้องถิ่นแบบเดียวกับชื่อไฟล์)
+        เฉพาะวันที่ยังมีไฟล์เดี่ยวเหลืออยู่
+        """
+        today = today or datetime.now().strftime('%Y%m%d')
+        loose = {snapshot_day(f.name) for f in self.data_dir.glob('vote_*')} - {None}
+        compacted = {entry['day'] for entry in self.index().values()}
+        days = loose | compacted
+        if not days:
+            return []
+        open_day = min(max(days), today)
+        return sorted(day for day in loose if day < open_day)
+
+    def compact(self, days=None, remove: bool = True) -> list:
+        """
+        รวมไฟล์ของแต่ละวัน (default = ทุกวันที่ปิดแล้ว) เป็น segment เดียว
+        วันที่มี segment อยู่แล้วรวมไฟล์เดิมใน segment กับไฟล์ใหม่เป็น segment ใหม่
+        -> [{'day', 'segment', 'files', 'bytes_before', 'bytes_after'}] หรือ {'day', 'error'}
+        """
+        days = self.closed_days() if days is None else list(days)
+        results = []
+        for day in days:
+            try:
+                results.append(self._compact_day(day, remove))
+            except (OSError, ValueError, tarfile.TarError) as e:
+                results.append({'day': day, 'error': str(e)})
+
+        # segment ที่สร้างก่อนมี series
+        for segment, entry in sorted(self.index().items()):
+            if 'series' in entry:
+                continue
+            try:
+                series = self._write_series(segment, self.read(segment))
+            except (OSError, ValueError, tarfile.TarError) as e:
+                results.append({'day': entry['day'], 'error': str(e)})
+                continue
+            index = dict(self.index())
+            index[segment] = {**entry, 'series': series}
+            self._write_index(index)
+        return results
+
+    def _compact_day(self, day: str, remove: bool) -> dict:
+        segment = f'vote_{day}{SEGMENT_SUFFIX}'
+        index = dict(self.index())
+        loose = sorted(f for f in self.data_dir.glob(f'vote_{day}_*') if snapshot_day(f.name) == day)
+        if not loose and segment not in index:
+            raise ValueError(f'ไม่พบไฟล์ของวัน {day}')
+
+        files = self.read(segment) if segment in index else {}
+        existing = set(files)
+        bytes_before = (self.dir / segment).stat().st_size if existing else 0
+        mtimes = {}
+        for path in loose:
+            data = path.read_bytes()
+            if path.name in existing and sha256(data) != sha256(files[path.name]):
+                raise ValueError(f'{path.name} ไม่ตรงกับไฟล์ชื่อเดียวกันใน {segment}')
+            if path.name not in existing:
+                bytes_before += len(data)
+            files[path.name] = data
+            mtimes[path.name] = int(path.stat().st_mtime)
+
+        checksums = {name: sha256(data) for name, data in files.items()}
+        if set(files) != existing:
+            self._write_segment(segment, files, mtimes)
+            # ตรวจจากไฟล์ที่อยู่บนดิสก์จริงก่อนลบต้นฉบับ
+            self.read(segment, expected=checksums)
+            index[segment] = {
+                'day': day,
+                'sha256': sha256((self.dir / segment).read_bytes()),
+                'size': (self.dir / segment).stat().st_size,
+                'files': checksums,
+                'series': self._write_series(segment, files),
+            }
+            self._write_index(index)
+
+        if remove:
+            for path in loose:
+                path.unlink(missing_ok=True)
+            fsync_dir(self.data_dir)
+
+        return {
+            'day': day,
+            'segment': segment,
+            'files': len(files),
+            'bytes_before': bytes_before,
+            'bytes_after': index[segment]['size'],
+        }
+
+    def _write_segment(self, segment: str, files: dict, mtimes: dict):
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode='w:gz') as tar:
+            for name in sorted(files):
+                info = tarfile.TarInfo(name)
+                info.size = len(files[name])
+                info.mtime = mtimes.get(name, 0)
+                tar.addfile(info, io.BytesIO(files[name]))
+        self._write_file(segment, buf.getvalue())
+
+    # ---------- retention ----------
+
+    def retain(self, raw_days: int | None = RETAIN_RAW_DAYS, hourly_days: int = RETAIN_HOURLY_DAYS) -> list:
+        """
+        downsample segment ที่เก่ากว่า raw_days (ชั่วโมงละ snapshot) และเก่ากว่า hourly_days (วันละ snapshot)
+        -> [{'day', 'segment', 'tier', 'before', 'after'}] หรือ {'day', 'error'}
+        """
+        if raw_days is None:
+            return []
+        hourly_days = max(hourly_days, raw_days)
+        index = self.index()
+        days = {snapshot_day(f.name) for f in self.data_dir.glob('vote_*')} - {None}
+        days |= {entry['day'] for entry in index.values()}
+        if not days:
+            return []
+        latest = datetime.strptime(max(days), '%Y%m%d')
+
+        results = []
+        for segment, entry in sorted(index.items(), key=lambda item: item[1]['day']):
+            age = (latest - datetime.strptime(entry['day'], '%Y%m%d')).days
+            tier = 'raw' if age < raw_days else 'hourly' if age < hourly_days else 'daily'
+            if TIERS.index(tier) <= TIERS.index(entry.get('tier', 'raw')):
+                continue
+            try:
+                results.append(self._downsample(segment, tier))
+            except (OSError, ValueError, KeyError, tarfile.TarError) as e:
+                results.append({'day': entry['day'], 'error': str(e)})
+        return results
+
+    def _previous_pct(self, before: str) -> dict:
+        """
+        % ครบทุก code ของ snapshot ล่าสุดก่อนไฟล์ before - {} ถ้าไม่มี
+        ย้อนหาจนเจอ keyframe (หรือแถวใน series ที่เต็มอยู่แล้ว) แล้ว forward-fill delta ที่ผ่านมา
+        """
+        names = self.filenames() | {f.name for f in self.data_dir.glob('vote_*.json')}
+        earlier = sorted(name for name in names if snapshot_day(name) and name < before)
+        chain, seed = [], None
+        for name in reversed(earlier):
+            segment = self._members.get(name)
+            block = self.read_series(segment) if segment else None
+            if block is not None and name in block['filenames']:
+                i = block['filenames'].index(name)
+                seed = dict(zip(block['codes'], block['pct'][i].tolist()))
+                break
+            try:
+                data = self.load(name)
+            except (OSError, ValueError, KeyError, tarfile.TarError):
+                continue
+            chain.append((name, data))
+            if not data.get('delta'):
+                break
+        rows = snapshot_rows(chain, seed)
+        return rows[-1][2] if rows else seed or {}
+
+    def _downsample(self, segment: str, tier: str) -> dict:
+        entry = self.index()[segment]
+        files = self.read(segment)
+
+        raw = dict(_json_members(files))  # ไฟล์ที่อ่านไม่ได้เก็บไว้ตามเดิม
+        rows = [(row, raw[row[1]]) for row in self._dense_rows(files)]
+        if not rows:
+            return {'day': entry['day'], 'segment': segment, 'tier': tier, 'before': 0, 'after': 0}
+
+        # gain ของแต่ละ snapshot (ส่วนต่างเฉพาะที่เพิ่ม หรือ gain เดิมถ้าเคย downsample แล้ว) รวมต่อ bucket
+        prev = self._previous_pct(rows[0][0][1])
+        buckets = {}
+        for (ts, name, pct, gain), data in rows:
+            if gain is None:
+                gain = {code: max(0.0, pct.get(code, 0) - prev.get(code, 0)) for code in {*pct, *prev}}
+            prev = pct
+            bucket = buckets.setdefault(ts // BUCKET_SECONDS[tier], {'gain': {}, 'count': 0})
+            for code, value in gain.items():
+                bucket['gain'][code] = bucket['gain'].get(code, 0) + value
+            bucket['count'] += 1
+            bucket['last'] = (name, data)
+
+        snapshots = {row[1] for row, _ in rows}
+        rows_pct = {row[1]: row[2] for row, _ in rows}
+        kept = {}
+        for bucket in buckets.values():
+            name, data = bucket['last']
+            # เขียนแบบเต็มเสมอ: snapshot ก่อนหน้าของ delta อาจถูกตัดไปแล้ว
+            data = dense_snapshot(data, rows_pct[name]) if data.get('delta') else data
+            kept[name] = {**data, 'gain': bucket['gain'], 'merged': bucket['count']}
+
+        new_files = {}
+        for name, content in files.items():
+            stem = name.rsplit('.', 1)[0]
+            if name in kept:
+                new_files[name] = json.dumps(kept[name], ensure_ascii=False, indent=2).encode('utf-8')
+            elif name not in snapshots and f'{stem}.json' not in snapshots:
+                new_files[name] = content  # ไฟล์ที่ไม่ใช่ snapshot ที่อ่านได้
+            elif name.endswith('.csv') and f'{stem}.json' in kept:
+                new_files[name] = content  # CSV ของ snapshot ที่เก็บไว้
+
+        checksums = {name: sha256(data) for name, data in new_files.items()}
+        self._write_segment(segment, new_files, {})
+        self.read(segment, expected=checksums)
+        index = dict(self.index())
+        index[segment] = {
+            **entry,
+            'tier': tier,
+            'sha256': sha256((self.dir / segment).read_bytes()),
+            'size': (self.dir / segment).stat().st_size,
+            'files': checksums,
+            'series': self._write_series(segment, new_files),
+        }
+        self._write_index(index)
+        return {'day': entry['day'], 'segment': segment, 'tier': tier, 'before': len(rows), 'after': len(kept)}
+
+    def verify(self) -> list:
+        """ตรวจทุก segment กับ index -> รายการปัญหา (ว่าง = ปกติ)"""
+        problems = []
+        for segment, entry in sorted(self.index().items()):
+            try:
+                if sha256((self.dir / segment).read_bytes()) != entry['sha256']:
+                    problems.append(f'{segment}: checksum ของ segment ไม่ตรง')
+                    continue
+                self.read(segment)
+                if entry.get('series') and self.read_series(segment) is None:
+                    problems.append(f"{entry['series']['file']}: checksum ไม่ตรงหรืออ่านไม่ได้")
+            except (OSError, ValueError, tarfile.TarError) as e:
+                problems.append(f'{segment}: {e}')
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vote Segments - compact snapshot รายวัน')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    comp = sub.add_parser('compact', help='รวมไฟล์ของวันที่ปิดแล้วเป็น segment')
+    comp.add_argument('data_dir', nargs='?', default='data_yna2025')
+    comp.add_argument('--day', action='append', help='เฉพาะวัน YYYYMMDD (ระบุซ้ำได้)')
+    comp.add_argument('--keep', action='store_true', help='ไม่ลบไฟล์ต้นฉบับ')
+
+    ver = sub.add_parser('verify', help='ตรวจ checksum ของทุก segment')
+    ver.add_argument('data_dir', nargs='?', default='data_yna2025')
+
+    ret = sub.add_parser('retain', help='downsample segment เก่าตาม retention tier')
+    ret.add_argument('data_dir', nargs='?', default='data_yna2025')
+    ret.add_argument('--raw-days', type=int, default=RETAIN_RAW_DAYS, required=RETAIN_RAW_DAYS is None,
+                     help='เก็บทุก snapshot กี่วันล่าสุด (default: RETAIN_RAW_DAYS)')
+    ret.add_argument('--hourly-days', type=int, default=RETAIN_HOURLY_DAYS,
+                     help='เก็บรายชั่วโมงถึงกี่วัน เก่ากว่านั้นเก็บรายวัน (default: RETAIN_HOURLY_DAYS หรือ 90)')
+
+    args = parser.parse_args()
+    segments = SegmentStore(args.data_dir)
+
+    if args.command == 'retain':
+        segments.compact()
+        results = segments.retain(args.raw_days, args.hourly_days)
+        for r in results:
+            if 'error' in r:
+                print(f"❌ {r['day']}: {r['error']}")
+            else:
+                print(f"🗜️ {r['segment']} -> {r['tier']}: {r['before']} -> {r['after']} snapshot")
+        if not results:
+            print("ℹ️ ไม่มี segment ที่ต้อง downsample")
+        return
+
+    if args.command == 'verify':
+        problems = segments.verify()
+        for problem in problems:
+            print(f"❌ {problem}")
+        print(f"✅ {len(segments.index())} segment" if not problems else f"พบปัญหา {len(problems)} รายการ")
+        raise SystemExit(1 if problems else 0)
+
+    results = segments.compact(args.day, remove=not args.keep)
+    for r in results:
+        if 'error' in r:
+            print(f"❌ {r['day']}: {r['error']}")
+        else:
+            print(f"📦 {r['segment']}: {r['files']} ไฟล์ {r['bytes_before']:,} -> {r['bytes_after']:,} bytes")
+    if not results:
+        print("ℹ️ ไม่มีวันที่ต้อง compact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Shared State - แชร์ array ที่คำนวณแล้วของ VoteEngine ระหว่าง gunicorn worker ผ่าน shared memory
+
+- ผู้เขียนมีได้ทีละ process (file lock): อ่าน snapshot ใหม่ คำนวณ แล้ว publish เป็น segment ใหม่
+- segment ของแต่ละ generation เขียนครั้งเดียวแล้วไม่แก้อีก (worker อื่น map แบบอ่านอย่างเดียว)
+- segment ควบคุมเก็บ (seq, generation) แบบ seqlock: เปลี่ยน generation = สลับข้อมูลทั้งชุดในครั้งเดียว
+  ผู้อ่านจึงไม่มีทางเห็นข้อมูลที่เขียนไม่ครบ
+- ทุก process ถือ shared lock ของไฟล์ .users ไว้ตลอดอายุ: process แรกที่เริ่มล้าง segment ค้างจากรอบก่อน
+  (worker ถูก kill) และ process สุดท้ายที่จบ unlink segment ทั้งหมด
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - ใช้แบบแยกหน่วยความจำต่อ worker
+    fcntl = None
+
+SHARED_ARRAYS = ('ts', 'pct', 'added', 'points', 'totals')
+ALIGN = 64
+KEEP_GENERATIONS = 2  # generation ก่อนหน้าที่ยังไม่ลบ (ผู้อ่านอาจกำลัง attach อยู่)
+SPIN_LIMIT = 1000  # seq คี่ค้างนานกว่านี้ (x SPIN_SLEEP) = ผู้เขียนตายกลางคัน -> OSError
+SPIN_SLEEP = 0.0005
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """เปิด/สร้าง segment โดยจัดการอายุเอง (ไม่ให้ resource_tracker ลบตอน worker ใด worker หนึ่งจบ)"""
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _unlink(name: str):
+    """ลบ segment ตามชื่อ (เปิดแบบให้ resource_tracker รู้จัก เพื่อให้ unlink ถอนชื่อออกได้พอดี)"""
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.unlink()
+    shm.close()
+
+
+class SharedState:
+    """segment ควบคุม + segment ข้อมูลต่อ generation ของ data_dir หนึ่ง"""
+
+    def __init__(self, data_dir: Path, lock_dir: Path | None = None):
+        if fcntl is None:
+            raise OSError('shared state ต้องใช้ fcntl (Unix)')
+        key = hashlib.sha1(str(Path(data_dir).resolve()).encode()).hexdigest()[:10]
+        self.prefix = f'vote_{key}'
+        lock_dir = Path(lock_dir) if lock_dir else Path(tempfile.gettempdir())
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_path = lock_dir / f'{self.prefix}.lock'
+
+        self._segments = {}  # generation -> SharedMemory ที่ map อยู่
+        self._retired = []  # segment ที่ยังมี array อ้างถึง รอ close
+        self._pid = os.getpid()
+        self._users = open(lock_dir / f'{self.prefix}.users', 'a')
+        try:
+            # ไม่มี process อื่นใช้อยู่ -> segment ที่เหลือเป็นของรอบก่อนที่จบไม่เรียบร้อย
+            fcntl.flock(self._users, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            with self.owner():
+                self._unlink_all()
+        except BlockingIOError:
+            pass
+        fcntl.flock(self._users, fcntl.LOCK_SH)
+
+        with self.owner():
+            try:
+                self._control = _segment(f'{self.prefix}_ctl')
+            except FileNotFoundError:
+                self._control = _segment(f'{self.prefix}_ctl', create=True, size=16)
+                self._control.buf[:16] = bytes(16)
+        self._ctl = np.ndarray((2,), dtype=np.int64, buffer=self._control.buf)
+        atexit.register(self.close)
+
+    def _unlink_all(self):
+        """ลบ segment ควบคุมและ generation ที่อาจยังเหลือ (ต้องถือ owner() และไม่มี process อื่นใช้)"""
+        try:
+            control = _segment(f'{self.prefix}_ctl')
+        except FileNotFoundError:
+            return
+        generation = int.from_bytes(bytes(control.buf[8:16]), 'little', signed=True)
+        control.close()
+        # +1 = generation ที่สร้างแล้วแต่ผู้เขียนตายก่อนสลับ
+        for stale in range(max(1, generation - KEEP_GENERATIONS), generation + 2):
+            _unlink(f'{self.prefix}_{stale}')
+        _unlink(f'{self.prefix}_ctl')
+
+    def close(self):
+        """ตอน process จบ: ปิด segment ที่ map อยู่ ถ้าเป็น process สุดท้ายให้ unlink ทั้งหมด"""
+        if self._users.closed or os.getpid() != self._pid:
+            return  # process ลูกที่ fork มาใช้ lock ร่วมกับ process แม่ -> ให้แม่เป็นผู้ล้าง
+        atexit.unregister(self.close)
+        for shm in [*self._segments.values(), *self._retired, self._control]:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # ยังมี array อ้างถึง - หน่วยความจำคืนเมื่อ process จบ
+        self._segments, self._retired = {}, []
+        try:
+            fcntl.flock(self._users, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            with self.owner():
+                self._unlink_all()
+        except BlockingIOError:
+            pass  # worker อื่นยังใช้อยู่
+        finally:
+            self._users.close()
+
+    @contextmanager
+    def owner(self):
+        """สิทธิ์เป็นผู้คำนวณ/ผู้เขียน (ครั้งละ process เดียว)"""
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def generation(self) -> int:
+        """อ่าน generation ปัจจุบันแบบ seqlock (seq คี่ = กำลังเขียน) - ค้างเกิน SPIN_LIMIT -> OSError"""
+        for _ in range(SPIN_LIMIT):
+            seq = int(self._ctl[0])
+            if not seq % 2:
+                generation = int(self._ctl[1])
+                if int(self._ctl[0]) == seq:
+                    return generation
+            time.sleep(SPIN_SLEEP)
+        raise OSError('shared state ค้างระหว่างเขียน')
+
+    def publish(self, codes: list, filenames: list, arrays: dict) -> int:
+        """เขียนข้อมูลชุดใหม่เป็น segment ใหม่ แล้วสลับ generation (ต้องถือ owner() อยู่)"""
+        generation = int(self._ctl[1]) + 1  # ถือ owner() แล้ว ไม่มีใครเขียนพร้อมกัน
+
+        layout, offset = {}, 0
+        for name in SHARED_ARRAYS:
+            array = np.ascontiguousarray(arrays[name])
+            layout[name] = [offset, list(array.shape), array.dtype.str]
+            offset = _align(offset + array.nbytes)
+        header = json.dumps({
+            'codes': codes,
+            'filenames': filenames,
+            'arrays': layout,
+        }, ensure_ascii=False).encode('utf-8')
+        base = _align(8 + len(header))
+
+        name = f'{self.prefix}_{generation}'
+        try:
+            shm = _segment(name, create=True, size=max(1, base + offset))
+        except FileExistsError:
+            # ผู้เขียนก่อนหน้าตายก่อนสลับ generation -> ไม่มีใครใช้ segment นี้
+            _unlink(name)
+            shm = _segment(name, create=True, size=max(1, base + offset))
+        shm.buf[:8] = len(header).to_bytes(8, 'little')
+        shm.buf[8:8 + len(header)] = header
+        for name in SHARED_ARRAYS:
+            start, shape, dtype = layout[name]
+            target = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=base + start)
+            target[...] = arrays[name]
+            del target
+        self._segments[generation] = shm
+
+        # atomic swap (| 1 = seq คี่ แม้ผู้เขียนก่อนหน้าจะตายค้างไว้ที่เลขคี่)
+        self._ctl[0] = int(self._ctl[0]) | 1
+        self._ctl[1] = generation
+        self._ctl[0] += 1
+
+        stale = generation - KEEP_GENERATIONS - 1
+        if stale > 0:
+            _unlink(f'{self.prefix}_{stale}')
+        return generation
+
+    def read(self, known: int = 0) -> tuple | None:
+        """
+        ข้อมูลของ generation ล่าสุด -> (generation, codes, filenames, {name: array อ่านอย่างเดียว})
+        None ถ้ายังไม่มีใคร publish หรือยังเป็น generation known เดิม
+        """
+        while True:
+            generation = self.generation()
+            if not generation or generation == known:
+                return None
+            try:
+                shm = self._segments.get(generation) or _segment(f'{self.prefix}_{generation}')
+                break
+            except FileNotFoundError:
+                if self.generation() == generation:
+                    return None  # segment หายไปแล้ว -> ให้ผู้เรียกคำนวณเองแล้ว publish ใหม่
+                # ถูกแทนที่ระหว่างอ่าน -> อ่าน generation ใหม่
+
+        self._segments[generation] = shm
+        length = int.from_bytes(bytes(shm.buf[:8]), 'little')
+        header = json.loads(bytes(shm.buf[8:8 + length]).decode('utf-8'))
+        base = _align(8 + length)
+
+        arrays = {}
+        for name, (start, shape, dtype) in header['arrays'].items():
+            array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=base + start)
+            array.flags.writeable = False
+            arrays[name] = array
+
+        self._retire(generation)
+        return generation, header['codes'], header['filenames'], arrays
+
+    def _retire(self, current: int):
+        """ปิด segment เก่าที่ไม่มี array อ้างถึงแล้ว"""
+        self._retired.extend(shm for g, shm in self._segments.items() if g != current)
+        self._segments = {current: self._segments[current]}
+
+        still_used = []
+        for shm in self._retired:
+            try:
+                shm.close()
+            except BufferError:
+                still_used.append(shm)
+        self._retired = still_used
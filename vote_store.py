@@ -0,0 +1,661 @@
+"""
+Vote Store - เก็บ snapshot ผลโหวตใน SQLite (WAL) แทนการเปิดไฟล์ JSON ทีละไฟล์ (ไม่บังคับใช้)
+
+เปิดใช้ด้วย VOTE_DB=votes.db
+- snapshots:   หนึ่งแถวต่อ snapshot (ts ไม่ซ้ำ)
+- codes:       ตาราง code
+- percentages: % ของแต่ละ code ต่อ snapshot (primary key = code_id, ts)
+               gain = % ที่เพิ่มขึ้นสะสมของ snapshot ที่ถูก downsample (NULL = คำนวณจาก snapshot ก่อนหน้า)
+WAL: ผู้อ่านหลาย worker ไม่บล็อกผู้เขียน (scraper) และกลับกัน
+
+ชื่อคู่/ซีรีส์ (ข้อความยาว ไม่ค่อยเปลี่ยน) เก็บครั้งเดียวใน candidates.json พร้อมประวัติเมื่อเปลี่ยน
+snapshot ใหม่จึงมีแค่ code กับตัวเลข แล้วค่อยเติมชื่อตอนตอบ request
+
+SnapshotEncoder: ไฟล์เต็ม (keyframe) ทุก KEYFRAME_EVERY snapshot ระหว่างนั้นเขียนเฉพาะ code ที่ % เปลี่ยน
+({'timestamp', 'delta': true, 'summary': [...]}) - ผู้อ่านเติมค่าที่ไม่เปลี่ยนด้วย snapshot_rows (forward-fill)
+
+write_snapshot: เขียนไฟล์ snapshot แบบ atomic (ไฟล์ชั่วคราว -> fsync -> rename) แล้วอัปเดต latest.json
+(snapshot ล่าสุดแบบเต็ม) - ผู้อ่านไม่เห็นไฟล์ที่เขียนไม่เสร็จ และได้ข้อมูลล่าสุดจากการอ่านไฟล์เล็กไฟล์เดียว
+delta อิง latest.json บนดิสก์ (อ่าน + เขียนภายใต้ flock) - หลาย writer เขียนโฟลเดอร์เดียวกันได้
+
+    python vote_store.py import data_yna2025      # นำเข้าไฟล์ vote_*.json เดิม
+    python vote_store.py series YND10 --from 2026-01-08T00:00 --to 2026-01-08T12:00
+    python vote_store.py candidates data_yna2025  # สร้าง candidates.json จากไฟล์เดิม (--compact = ตัดชื่อออกจากไฟล์)
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows - ล็อกไม่ได้ -> เขียน keyframe ทุกครั้ง
+    fcntl = None
+
+VOTE_DB = os.environ.get('VOTE_DB', '')  # ว่าง = ใช้ไฟล์ JSON อย่างเดียว
+KEYFRAME_EVERY = int(os.environ.get('SNAPSHOT_KEYFRAME_EVERY', '12'))  # 1 = เขียนไฟล์เต็มทุกครั้ง
+LATEST_FILE = 'latest.json'
+LATEST_FORMAT = 1
+WRITE_LOCK = '.write.lock'  # flock ของผู้เขียน snapshot ใน data_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    ts INTEGER NOT NULL UNIQUE,
+    filename TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS codes (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS percentages (
+    code_id INTEGER NOT NULL REFERENCES codes(id),
+    ts INTEGER NOT NULL,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    pct REAL NOT NULL,
+    gain REAL,
+    PRIMARY KEY (code_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS percentages_snapshot ON percentages(snapshot_id);
+"""
+
+
+def parse_timestamp(timestamp: str, filename: str) -> int | None:
+    """
+    แปลงเวลาของ snapshot เป็น epoch (วินาที)
+    ใช้เวลาท้องถิ่นตามที่ scraper บันทึก (naive) โดยไม่แปลง timezone
+    ถ้าไม่มี timestamp ในไฟล์ ใช้เวลาจากชื่อไฟล์ vote_YYYYMMDD_HHMMSS แทน
+    """
+    dt = None
+    if timestamp:
+        try:
+            dt = datetime.fromisoformat(timestamp)
+        except ValueError:
+            dt = None
+
+    if dt is None:
+        try:
+            dt = datetime.strptime(Path(filename).stem.replace('vote_', ''), '%Y%m%d_%H%M%S')
+        except ValueError:
+            return None
+
+    return int(dt.replace(tzinfo=timezone.utc).timestamp())
+
+
+def parse_snapshot(data: dict, filename: str) -> tuple[int, dict] | None:
+    """ข้อมูลจาก scraper (dict เดียวกับไฟล์ vote_*.json) -> (epoch, {code: percentage})"""
+    ts = parse_timestamp(data.get('timestamp', ''), filename)
+    if ts is None:
+        return None
+
+    vote_data = {}
+    for item in data.get('summary', []):
+        vote_data[item.get('code', '')] = item.get('percentage', 0)
+
+    return ts, vote_data
+
+
+def snapshot_row(data: dict, filename: str) -> tuple | None:
+    """
+    snapshot -> (epoch, filename, {code: pct}, gain)
+    gain: {code: % ที่เพิ่มขึ้นสะสม} ของ snapshot ที่แทนหลาย snapshot หลัง downsample (vote_segments.retain)
+          None = snapshot ดิบ (คำนวณจากส่วนต่างกับ snapshot ก่อนหน้า)
+    """
+    snapshot = parse_snapshot(data, filename)
+    if snapshot is None:
+        return None
+    gain = data.get('gain')
+    return snapshot[0], Path(filename).name, snapshot[1], dict(gain) if gain is not None else None
+
+
+def snapshot_rows(snapshots, previous=None) -> list:
+    """
+    [(filename, data)] -> แถวแบบเต็มทุก code เรียงตามเวลา (แบบเดียวกับ snapshot_row)
+    snapshot แบบ delta: code ที่ไม่อยู่ในไฟล์ใช้ค่าของแถวก่อนหน้า (forward-fill ทั้งชุดด้วย numpy)
+    previous: % ของ snapshot ก่อนแถวแรก หรือ callable(epoch ของแถวแรก) -> dict (None = ไม่มี)
+    snapshot ที่อ่านไม่ได้ข้ามไป
+    """
+    parsed = []
+    for filename, data in snapshots:
+        row = snapshot_row(data, filename)
+        if row is not None:
+            parsed.append((row, bool(data.get('delta'))))
+    if not any(delta for _, delta in parsed):
+        return sorted((row for row, _ in parsed), key=lambda r: r[0])
+
+    parsed.sort(key=lambda p: p[0][0])
+    seed = previous(parsed[0][0][0]) if callable(previous) else previous
+    seed = seed or {}
+    codes = sorted({code for row, _ in parsed for code in row[2]} | set(seed))
+    col = {code: j for j, code in enumerate(codes)}
+
+    # แถว 0 = ค่าก่อนหน้า; NaN = ไม่เปลี่ยน (เฉพาะ delta) -> เติมจากแถวล่าสุดที่มีค่า
+    values = np.full((len(parsed) + 1, len(codes)), np.nan)
+    values[0] = [seed.get(code, 0) for code in codes]
+    for i, (row, delta) in enumerate(parsed, start=1):
+        if not delta:
+            values[i] = 0.0
+        for code, pct in row[2].items():
+            values[i, col[code]] = pct
+    filled = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    np.maximum.accumulate(filled, axis=0, out=filled)
+    values = values[filled, np.arange(len(codes))]
+
+    return [
+        (ts, filename, dict(zip(codes, pct)), gain)
+        for ((ts, filename, _, gain), _), pct in zip(parsed, values[1:].tolist())
+    ]
+
+
+def dense_snapshot(data: dict, pct: dict) -> dict:
+    """snapshot delta -> รูปแบบเต็มแบบ keyframe (summary เรียงตาม % และ votes) จาก % ที่เติมครบแล้ว"""
+    dense = {key: value for key, value in data.items() if key not in ('delta', 'summary', 'votes')}
+    codes = sorted(pct)
+    dense['votes'] = {'labels': codes, 'data': [pct[code] for code in codes]}
+    dense['summary'] = sorted(
+        ({'code': code, 'percentage': pct[code]} for code in codes),
+        key=lambda item: item['percentage'], reverse=True,
+    )
+    return dense
+
+
+def _pct(snapshot: dict) -> dict:
+    return {item.get('code', ''): item.get('percentage', 0) for item in snapshot.get('summary', [])}
+
+
+class SnapshotEncoder:
+    """
+    เขียน snapshot แบบ keyframe + delta - ไม่มีสถานะในหน่วยความจำ
+    delta อิง snapshot ก่อนหน้าบนดิสก์ที่ write_snapshot ส่งมา (latest.json) ไม่ใช่สิ่งที่ process นี้เขียนล่าสุด
+    keyframe: ไม่มี base ที่เชื่อได้, ทุก keyframe_every snapshot และเมื่อชุด code เปลี่ยน
+    """
+
+    def __init__(self, keyframe_every: int = KEYFRAME_EVERY):
+        self.keyframe_every = max(1, keyframe_every)
+
+    def encode(self, data: dict, base: dict | None = None, age: int = 0) -> tuple[dict, int]:
+        """
+        ข้อมูลจาก scraper -> (dict ที่จะเขียนลงไฟล์ (ไม่มีชื่อ/ซีรีส์), จำนวน delta นับจาก keyframe)
+        base: snapshot เต็มที่อยู่ก่อนหน้าไฟล์นี้ทันที (None = keyframe), age: ค่าที่สองของ base
+        """
+        compact = compact_snapshot(data)
+        pct = _pct(compact)
+        last = _pct(base) if base is not None else None
+
+        age += 1
+        if last is None or set(pct) != set(last) or age >= self.keyframe_every:
+            return compact, 0
+
+        changed = [code for code in pct if pct[code] != last[code]]
+        delta = {key: value for key, value in compact.items() if key not in ('votes', 'summary')}
+        delta['delta'] = True
+        delta['summary'] = [{'code': code, 'percentage': pct[code]} for code in changed]
+        return delta, age
+
+
+def fsync_dir(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # เช่น Windows เปิด directory ไม่ได้
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_json(path: str | Path, data):
+    """
+    เขียน JSON แบบ atomic: ไฟล์ชั่วคราว -> fsync -> rename -> fsync โฟลเดอร์
+    ไฟล์ชั่วคราวขึ้นต้นด้วย '.' (ไม่ตรงกับ glob vote_*) ผู้อ่านจึงเห็นแค่ไฟล์เก่าหรือไฟล์ที่เขียนครบแล้ว
+    """
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    fsync_dir(path.parent)
+
+
+def read_latest(data_dir: str | Path) -> dict | None:
+    """
+    latest.json -> {'filename', 'snapshot', 'age'} - None ถ้ายังไม่มีหรืออ่านไม่ได้
+    snapshot เต็ม ไม่มีชื่อ/ซีรีส์, age = จำนวน delta นับจาก keyframe ของไฟล์นั้น
+    """
+    try:
+        with open(Path(data_dir) / LATEST_FILE, 'r', encoding='utf-8') as f:
+            latest = json.load(f)
+        if latest.get('format') != LATEST_FORMAT:
+            return None
+        return {'filename': latest['filename'], 'snapshot': latest['snapshot'], 'age': latest.get('age', KEYFRAME_EVERY)}
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+
+@contextmanager
+def _write_lock(data_dir: Path):
+    """flock ของ data_dir ระหว่างอ่าน latest.json จนเขียนไฟล์ใหม่เสร็จ -> True ถ้าล็อกได้"""
+    if fcntl is None:
+        yield False
+        return
+    with open(data_dir / WRITE_LOCK, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _is_newest(data_dir: Path, latest_name: str) -> bool:
+    """ไฟล์ที่ latest.json ชี้ยังเป็น snapshot ล่าสุดในโฟลเดอร์ (รวม segment) - ไม่มีไฟล์อื่นมาแทรก เช่นจาก git pull"""
+    names = {f.name for f in data_dir.glob('vote_*.json')}
+    try:
+        # vote_segments import vote_store จึง import ที่นี่
+        from vote_segments import SegmentStore
+        names |= SegmentStore(data_dir).filenames()
+    except (OSError, ValueError, KeyError):
+        return False
+    return latest_name in names and max(names) == latest_name
+
+
+def _densify_after(data_dir: Path, ts: int):
+    """
+    เขียนไฟล์ delta ที่ใหม่กว่า ts ใหม่เป็น keyframe (ใช้เมื่อมี snapshot ที่เก่ากว่าถูกเขียนแทรกเข้ามาทีหลัง)
+    ค่าเต็มของแต่ละไฟล์คำนวณจากสถานะก่อนแทรก (segment + ไฟล์เดี่ยว) แบบเดียวกับผู้อ่าน
+    """
+    from vote_segments import SegmentStore
+
+    try:
+        segment_rows = SegmentStore(data_dir).rows()
+    except (OSError, ValueError, KeyError):
+        segment_rows = []
+    snapshots = []
+    for file in sorted(data_dir.glob('vote_*.json')):
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                snapshots.append((file.name, json.load(f)))
+        except (OSError, ValueError):
+            continue
+
+    def previous(first: int) -> dict:
+        before = [row for row in segment_rows if row[0] < first]
+        return max(before, key=lambda row: row[0])[2] if before else {}
+
+    pct = {row[1]: row[2] for row in snapshot_rows(snapshots, previous) if row[0] > ts}
+    for name, data in snapshots:
+        if data.get('delta') and name in pct:
+            write_json(data_dir / name, dense_snapshot(data, pct[name]))
+
+
+def write_snapshot(data_dir: str | Path, filename: str, data: dict,
+                   encoder: SnapshotEncoder | None = None) -> Path:
+    """
+    บันทึก vote_*.json (encoder = keyframe + delta, None = ไฟล์เต็ม) แล้วชี้ latest.json มาที่ snapshot นี้
+    delta อิง latest.json เฉพาะเมื่อไฟล์ที่ชี้เป็นไฟล์ก่อนหน้าไฟล์นี้ตามเวลาจริง (แบบเดียวกับที่ผู้อ่าน forward-fill)
+    ไม่งั้นเขียน keyframe; ทั้งหมดอยู่ใต้ flock เดียวกันเพื่อไม่ให้ writer หลายตัวแทรกกัน
+    snapshot ที่เก่ากว่า latest.json (writer อีกตัวเขียนก่อน) -> keyframe และไฟล์ delta ที่ใหม่กว่ากลายเป็น keyframe
+    latest.json เก็บ snapshot เต็มเสมอ (ไม่ใช่ delta) และไม่ถอยกลับไปชี้ snapshot ที่เก่ากว่า
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / filename
+    ts = parse_timestamp(data.get('timestamp', ''), filename)
+    with _write_lock(data_dir) as locked:
+        current = read_latest(data_dir)
+        current_ts = parse_timestamp(current['snapshot'].get('timestamp', ''), current['filename']) if current else None
+        newer = current is None or (ts is not None and current_ts is not None and ts > current_ts)
+
+        encoded, age = compact_snapshot(data), 0
+        if encoder is not None:
+            base = None
+            if locked and current and newer and _is_newest(data_dir, current['filename']):
+                base = current
+            encoded, age = encoder.encode(data, base['snapshot'] if base else None, base['age'] if base else 0)
+        if not newer and ts is not None:
+            _densify_after(data_dir, ts)  # ก่อนเขียนไฟล์ที่แทรก (ค่าเต็มคำนวณจากสถานะเดิม)
+        write_json(path, encoded)
+
+        if newer:
+            write_json(data_dir / LATEST_FILE, {
+                'format': LATEST_FORMAT,
+                'filename': filename,
+                'age': age,
+                'snapshot': compact_snapshot(data),
+            })
+    return path
+
+
+class VoteStore:
+    """snapshot ใน SQLite - หนึ่ง connection ต่อ thread"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._known = None  # ชื่อไฟล์ที่อยู่ใน DB แล้ว (โหลดครั้งแรกที่ใช้)
+
+    @classmethod
+    def from_env(cls) -> 'VoteStore | None':
+        return cls(VOTE_DB) if VOTE_DB else None
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(percentages)')}
+            if 'gain' not in columns:  # DB ที่สร้างก่อนมี retention
+                conn.execute('ALTER TABLE percentages ADD COLUMN gain REAL')
+            self._local.conn = conn
+        return conn
+
+    # ---------- เขียน ----------
+
+    def save_rows(self, rows: list, on_duplicate=None) -> int:
+        """
+        บันทึก [(epoch, filename, {code: pct}, gain)] ใน transaction เดียว -> จำนวน snapshot ที่เพิ่มจริง
+        แถวที่เวลาซ้ำกับ snapshot อื่นใน DB ไม่ถูกบันทึก (แจ้ง on_duplicate(filename, ชื่อไฟล์ที่มีอยู่) ถ้ามี)
+        แต่ยังนับเป็นชื่อที่รู้จักแล้ว จะได้ไม่ถูกนำเข้าซ้ำทุกรอบ
+        """
+        conn = self.connect()
+        added = 0
+        with conn:
+            codes = sorted({code for _, _, data, gain in rows for code in (*data, *(gain or ()))})
+            conn.executemany('INSERT OR IGNORE INTO codes(code) VALUES (?)', [(c,) for c in codes])
+            code_ids = dict(conn.execute('SELECT code, id FROM codes'))
+
+            for ts, filename, data, gain in rows:
+                cur = conn.execute('INSERT OR IGNORE INTO snapshots(ts, filename) VALUES (?, ?)', (ts, filename))
+                if not cur.rowcount:
+                    if on_duplicate:  # ts หรือชื่อไฟล์ซ้ำ -> มีอยู่แล้ว
+                        existing = conn.execute('SELECT filename FROM snapshots WHERE ts = ?', (ts,)).fetchone()
+                        if existing and existing[0] != filename:
+                            on_duplicate(filename, existing[0])
+                    continue
+                conn.executemany(
+                    'INSERT INTO percentages(code_id, ts, snapshot_id, pct, gain) VALUES (?, ?, ?, ?, ?)',
+                    [
+                        (code_ids[code], ts, cur.lastrowid, float(data.get(code, 0)),
+                         float(gain.get(code, 0)) if gain is not None else None)
+                        for code in (data if gain is None else {**data, **gain})
+                    ],
+                )
+                added += 1
+
+        if self._known is not None:
+            self._known.update(row[1] for row in rows)
+        return added
+
+    def save_snapshot(self, data: dict, filename: str) -> bool:
+        """บันทึกข้อมูลที่ scraper ดึงมา (dict เดียวกับไฟล์ JSON) -> True ถ้าเป็น snapshot ใหม่"""
+        row = snapshot_row(data, filename)
+        if row is None:
+            return False
+        return self.save_rows([row]) > 0
+
+    def import_files(self, files, on_error=None) -> int:
+        """
+        นำเข้าไฟล์ vote_*.json ที่ยังไม่อยู่ใน DB
+        ไฟล์ที่อ่านไม่ได้ข้ามไป (แจ้ง on_error(path, exception หรือข้อความ) ถ้ามี)
+        """
+        known = self.filenames()
+        snapshots = []
+        paths = {}
+        for file in files:
+            file = Path(file)
+            if file.name in known:
+                continue
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    snapshots.append((file.name, json.load(f)))
+                paths[file.name] = file
+            except Exception as e:
+                if on_error:
+                    on_error(file, e)
+        rows = snapshot_rows(snapshots, self.pct_before)
+        if not on_error:
+            return self.save_rows(rows) if rows else 0
+        for name in paths.keys() - {r[1] for r in rows}:
+            on_error(paths[name], 'ไม่มีเวลาของ snapshot')
+        return self.save_rows(rows, lambda name, existing: on_error(
+            paths[name], f'เวลาซ้ำกับ {existing} (ไม่ได้บันทึกลง DB)')) if rows else 0
+
+    # ---------- อ่าน ----------
+
+    def filenames(self) -> set:
+        if self._known is None:
+            self._known = {name for (name,) in self.connect().execute('SELECT filename FROM snapshots')}
+        return self._known
+
+    def pct_before(self, ts: int) -> dict:
+        """% ของ snapshot ล่าสุดใน DB ที่เก่ากว่า ts (จุดเริ่มของ forward-fill)"""
+        query = """
+            SELECT c.code, p.pct FROM percentages p JOIN codes c ON c.id = p.code_id
+            WHERE p.snapshot_id = (SELECT id FROM snapshots WHERE ts < ? ORDER BY ts DESC LIMIT 1)
+        """
+        return dict(self.connect().execute(query, (ts,)).fetchall())
+
+    def last_id(self) -> int:
+        return self.connect().execute('SELECT COALESCE(MAX(id), 0) FROM snapshots').fetchone()[0]
+
+    def rows_since(self, snapshot_id: int = 0) -> tuple[int, list]:
+        """snapshot ที่ id > snapshot_id -> (id ล่าสุด, [(epoch, filename, {code: pct}, gain)] เรียงตามเวลา)"""
+        cursor = snapshot_id
+        rows = {}
+        query = """
+            SELECT s.id, s.ts, s.filename, c.code, p.pct, p.gain
+            FROM snapshots s
+            LEFT JOIN percentages p ON p.snapshot_id = s.id
+            LEFT JOIN codes c ON c.id = p.code_id
+            WHERE s.id > ?
+        """
+        gains = {}
+        for sid, ts, filename, code, pct, gain in self.connect().execute(query, (snapshot_id,)):
+            cursor = max(cursor, sid)
+            row = rows.setdefault(sid, (ts, filename, {}))
+            if code is not None:
+                row[2][code] = pct
+            if gain is not None:
+                gains.setdefault(sid, {})[code] = gain
+        rows = [(*row, gains.get(sid)) for sid, row in rows.items()]
+        return cursor, sorted(rows, key=lambda r: r[0])
+
+    def series(self, code: str, start: int | None = None, stop: int | None = None) -> list:
+        """% ของ code เดียวในช่วงเวลา (ใช้ index code_id, ts) -> [(epoch, pct)]"""
+        query = """
+            SELECT p.ts, p.pct FROM percentages p JOIN codes c ON c.id = p.code_id
+            WHERE c.code = ? AND p.ts >= ? AND p.ts <= ? ORDER BY p.ts
+        """
+        start = -2 ** 63 if start is None else start
+        stop = 2 ** 63 - 1 if stop is None else stop
+        return self.connect().execute(query, (code, start, stop)).fetchall()
+
+
+# ---------- Candidate dimension ----------
+
+CANDIDATES_FILE = 'candidates.json'
+CANDIDATE_FIELDS = ('names', 'series')
+TEXT_KEYS = ('couples', 'ranking')  # ส่วนที่เป็นข้อความชื่อซ้ำทุก snapshot
+
+
+def candidate_metadata(data: dict) -> dict:
+    """ชื่อคู่/ซีรีส์จากข้อมูล scraper -> {code: {'names', 'series'}}"""
+    meta = {}
+    for item in data.get('summary', []):
+        if any(field in item for field in CANDIDATE_FIELDS):
+            meta[item.get('code', '')] = {field: item.get(field, '') for field in CANDIDATE_FIELDS}
+    for code, info in (data.get('couples') or {}).items():
+        meta.setdefault(code, {field: info.get(field, '') for field in CANDIDATE_FIELDS})
+    return meta
+
+
+def compact_snapshot(data: dict) -> dict:
+    """snapshot ที่ไม่มีชื่อ/ซีรีส์ซ้ำ (ตัด couples, ranking และ names/series ใน summary)"""
+    compact = {key: value for key, value in data.items() if key not in TEXT_KEYS}
+    if 'summary' in data:
+        compact['summary'] = [
+            {key: value for key, value in item.items() if key not in CANDIDATE_FIELDS}
+            for item in data['summary']
+        ]
+    return compact
+
+
+class CandidateTable:
+    """
+    ชื่อคู่/ซีรีส์ของแต่ละ code (ไฟล์ candidates.json ใน data_dir)
+    {code: [{'since': epoch, 'names': ..., 'series': ...}, ...]} - เพิ่ม version ใหม่เมื่อข้อมูลเปลี่ยน
+    โหลดใหม่อัตโนมัติเมื่อไฟล์ถูกแก้ (เช่น scraper อีก process อัปเดต)
+    """
+
+    def __init__(self, data_dir: str | Path):
+        self.path = Path(data_dir) / CANDIDATES_FILE
+        self._mtime = None
+        self._versions = {}
+
+    def versions(self) -> dict:
+        """{code: [version]} - ไฟล์อ่านไม่ได้ (เสีย/กำลังถูกแทน) ใช้ชุดล่าสุดที่อ่านได้ แล้วลองใหม่ครั้งถัดไป"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime != self._mtime:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    versions = json.load(f)
+                if isinstance(versions, dict):
+                    self._versions = versions
+                    self._mtime = mtime
+        except (OSError, ValueError):
+            pass
+        return self._versions
+
+    @staticmethod
+    def _apply(versions: dict, ts: int, meta: dict) -> bool:
+        """เพิ่ม version ของ code ที่ชื่อเปลี่ยนลงใน versions (แก้ในที่) -> True ถ้ามีการเปลี่ยนแปลง"""
+        changed = False
+        for code, info in meta.items():
+            history = versions.setdefault(code, [])
+            pos = bisect_right([v['since'] for v in history], ts)
+            current = history[pos - 1] if pos else None
+            if current and all(current[field] == info[field] for field in CANDIDATE_FIELDS):
+                continue
+            # ข้อมูลเดียวกับ version ถัดไป (นำเข้าย้อนหลัง) -> เลื่อนเวลาเริ่มแทนการเพิ่ม version
+            if pos < len(history) and all(history[pos][field] == info[field] for field in CANDIDATE_FIELDS):
+                history[pos] = {**history[pos], 'since': ts}
+            else:
+                history.insert(pos, {'since': ts, **info})
+            changed = True
+        return changed
+
+    def update(self, data: dict, filename: str = '') -> bool:
+        """
+        เพิ่ม version ของ code ที่ชื่อเปลี่ยน (ตามเวลาของ snapshot) -> True ถ้ามีการเปลี่ยนแปลง
+        อ่าน-แก้-เขียนภายใต้ write lock ของ data_dir (scraper / auto push / backfill เขียนพร้อมกันได้)
+        """
+        ts = parse_timestamp(data.get('timestamp', ''), filename)
+        meta = candidate_metadata(data)
+        if ts is None or not meta:
+            return False
+        if not self._apply({code: list(history) for code, history in self.versions().items()}, ts, meta):
+            return False  # ไม่มีอะไรเปลี่ยน - ไม่ต้องล็อก
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _write_lock(self.path.parent):
+            # อ่านใหม่หลังได้ lock: process อื่นอาจเพิ่ม version ไปแล้ว
+            versions = {code: list(history) for code, history in self.versions().items()}
+            if not self._apply(versions, ts, meta):
+                return False
+            write_json(self.path, versions)
+            self._versions = versions
+            self._mtime = self.path.stat().st_mtime_ns
+        return True
+
+    def lookup(self, code: str, ts: int | None = None) -> dict | None:
+        """ชื่อ/ซีรีส์ของ code ณ เวลา ts (ไม่ระบุ = ล่าสุด)"""
+        history = self.versions().get(code)
+        if not history:
+            return None
+        if ts is None:
+            return history[-1]
+        pos = bisect_right([v['since'] for v in history], ts)
+        return history[max(pos - 1, 0)]
+
+    def latest(self) -> dict:
+        return {code: history[-1] for code, history in self.versions().items() if history}
+
+    def join(self, summary: list, ts: int | None = None) -> list:
+        """เติม names/series ให้ summary ตอนตอบ request (ไฟล์เก่าที่มีชื่ออยู่แล้วใช้ของเดิมถ้าไม่พบใน table)"""
+        joined = []
+        for item in summary:
+            info = self.lookup(item.get('code', ''), ts)
+            if info:
+                item = {**item, **{field: info[field] for field in CANDIDATE_FIELDS}}
+            joined.append(item)
+        return joined
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vote Store - SQLite snapshot backend')
+    parser.add_argument('--db', default=VOTE_DB or 'votes.db', help='ไฟล์ฐานข้อมูล (default: VOTE_DB หรือ votes.db)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    imp = sub.add_parser('import', help='นำเข้าไฟล์ vote_*.json')
+    imp.add_argument('data_dir', nargs='?', default='data_yna2025')
+
+    ser = sub.add_parser('series', help='%% ของ code ในช่วงเวลา')
+    ser.add_argument('code')
+    ser.add_argument('--from', dest='start', help='ISO เช่น 2026-01-08T00:00')
+    ser.add_argument('--to', dest='stop')
+
+    cand = sub.add_parser('candidates', help='สร้าง candidates.json จากไฟล์ vote_*.json')
+    cand.add_argument('data_dir', nargs='?', default='data_yna2025')
+    cand.add_argument('--compact', action='store_true', help='เขียนไฟล์ใหม่โดยตัดชื่อ/ซีรีส์ที่ซ้ำออก')
+
+    args = parser.parse_args()
+
+    if args.command == 'candidates':
+        table = CandidateTable(args.data_dir)
+        files = sorted(Path(args.data_dir).glob('vote_*.json'))
+        for file in files:
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except Exception:
+                continue
+            table.update(data, file.name)
+            if args.compact:
+                write_json(file, compact_snapshot(data))
+        print(f"✅ {len(table.versions())} code -> {table.path}")
+        return
+
+    store = VoteStore(args.db)
+
+    if args.command == 'import':
+        added = store.import_files(sorted(Path(args.data_dir).glob('vote_*.json')))
+        # snapshot ที่ compact เป็น segment รายวันแล้ว (vote_segments import vote_store จึง import ที่นี่)
+        from vote_segments import SegmentStore
+        rows = SegmentStore(args.data_dir).rows(store.filenames())
+        added += store.save_rows(rows) if rows else 0
+        print(f"✅ นำเข้า {added} snapshot -> {args.db}")
+    else:
+        start = parse_timestamp(args.start, '') if args.start else None
+        stop = parse_timestamp(args.stop, '') if args.stop else None
+        for ts, pct in store.series(args.code, start, stop):
+            print(datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), pct)
+
+
+if __name__ == "__main__":
+    main()
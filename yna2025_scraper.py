@@ -7,14 +7,16 @@ YNA2025 Vote Summary Scraper
 import requests
 from bs4 import BeautifulSoup
 import json
-import re
 import os
 import logging
 from datetime import datetime
 from pathlib import Path
 import schedule
+import sqlite3
 import time
 import csv
+from vote_extract import extract_chart_data, extract_couples
+from vote_store import CandidateTable, SnapshotEncoder, VoteStore, write_snapshot
 
 # ตั้งค่า logging
 logging.basicConfig(
@@ -49,6 +51,9 @@ class YNA2025Scraper:
         # สร้างโฟลเดอร์เก็บข้อมูล
         self.output_dir = Path(self.config.get('output_dir', 'data_yna2025'))
         self.output_dir.mkdir(exist_ok=True)
+        self.store = VoteStore.from_env()
+        self.candidates = CandidateTable(self.output_dir)
+        self.encoder = SnapshotEncoder()  # keyframe + delta
         
     def login(self) -> bool:
         """Login เข้าระบบ"""
@@ -113,10 +118,10 @@ class YNA2025Scraper:
             soup = BeautifulSoup(html, 'html.parser')
             
             # ดึงข้อมูลจาก Chart.js
-            vote_data = self._extract_chart_data(html)
+            vote_data = extract_chart_data(soup)
             
             # ดึงข้อมูลจาก list รายชื่อคู่
-            couples = self._extract_couple_names(soup)
+            couples = extract_couples(soup)
             
             # รวมข้อมูล
             result = {
@@ -170,86 +175,22 @@ class YNA2025Scraper:
             
         return "The Best Couple"
     
-    def _extract_chart_data(self, html: str) -> dict:
-        """ดึงข้อมูลจาก Chart.js script"""
-        result = {'labels': [], 'data': []}
-        
-        # หา script ที่มี Chart.js
-        soup = BeautifulSoup(html, 'html.parser')
-        scripts = soup.find_all('script')
-        
-        for script in scripts:
-            if script.string and 'Chart' in script.string:
-                script_text = script.string
-                
-                # หา labels: ["YND01","YND02",...]
-                labels_match = re.search(r'labels\s*:\s*\[(.*?)\]', script_text, re.DOTALL)
-                if labels_match:
-                    labels_str = labels_match.group(1)
-                    result['labels'] = re.findall(r'["\']([^"\']+)["\']', labels_str)
-                
-                # หา data: ["0.32","0.33",...] หรือ data: [0.32, 0.33,...]
-                # รองรับทั้งแบบ string และ number
-                data_match = re.search(r"data\s*:\s*\[(.*?)\]", script_text, re.DOTALL)
-                if data_match:
-                    data_str = data_match.group(1)
-                    # หาตัวเลขทั้งแบบ "0.32" และ 0.32
-                    numbers = re.findall(r'["\']?([\d.]+)["\']?', data_str)
-                    result['data'] = [float(x) for x in numbers if x]
-                
-                if result['labels'] and result['data']:
-                    break
-        
-        return result
-    
-    def _extract_couple_names(self, soup: BeautifulSoup) -> dict:
-        """ดึงรายชื่อคู่จาก list"""
-        couples = {}
-        
-        # หา list items ที่มีรหัส YND
-        for li in soup.find_all('li'):
-            text = li.get_text(strip=True)
-            # Pattern: YND01 : ชื่อ1 ชื่อ2 - series
-            match = re.match(r'(YND\d+)\s*:\s*(.+?)(?:\s*\((.+?)\))?$', text)
-            if match:
-                code = match.group(1)
-                names = match.group(2).strip()
-                series = match.group(3) if match.group(3) else ''
-                couples[code] = {
-                    'names': names,
-                    'series': series
-                }
-        
-        # ถ้าหาจาก li ไม่เจอ ลองหาจาก text ทั้งหมด
-        if not couples:
-            text = soup.get_text()
-            for match in re.finditer(r'(YND\d+)\s*:\s*([^\n]+)', text):
-                code = match.group(1)
-                rest = match.group(2).strip()
-                # แยก series ออก
-                series_match = re.search(r'\(([^)]+)\)\s*$', rest)
-                if series_match:
-                    series = series_match.group(1)
-                    names = rest[:series_match.start()].strip()
-                else:
-                    series = ''
-                    names = rest
-                
-                couples[code] = {
-                    'names': names,
-                    'series': series
-                }
-        
-        return couples
-    
     def save_data(self, data: dict) -> str:
         """บันทึกข้อมูล"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # บันทึก JSON
+        # บันทึก JSON (ชื่อคู่/ซีรีส์เก็บครั้งเดียวใน candidates.json)
         json_file = self.output_dir / f"vote_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self.candidates.update(data, json_file.name)
+        # เขียนแบบ atomic (ไฟล์ชั่วคราว -> fsync -> rename) แล้วอัปเดต latest.json
+        write_snapshot(self.output_dir, json_file.name, data, self.encoder)
+        
+        # บันทึกลง SQLite (ถ้าตั้ง VOTE_DB) - transaction เดียวต่อ snapshot
+        if self.store:
+            try:
+                self.store.save_snapshot(data, json_file.name)
+            except sqlite3.Error as e:
+                logger.error(f"❌ บันทึกลงฐานข้อมูลไม่สำเร็จ: {e}")
         
         # บันทึก CSV (summary)
         if 'summary' in data: